@@ -6,7 +6,9 @@ import logging
 from homeassistant import config_entries, core
 from homeassistant.const import Platform
 
-from .const import DOMAIN
+from .const import CONF_INTEGRATION, DOMAIN, INTEGRATION_WALLET
+from .sensor import async_remove_wallets
+from .utility import get_wallets
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,12 +21,27 @@ async def async_setup_entry(
 ) -> bool:
     """Set up the Helium Integration component."""
     hass.data.setdefault(DOMAIN, {})
-    hass_data = dict(entry.data)
+    # Options, like the wallets of a wallet entry, override the entry data
+    hass_data = {**entry.data, **entry.options}
     hass.data[DOMAIN][entry.entry_id] = hass_data
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
     return True
 
 
+async def async_update_options(
+    hass: core.HomeAssistant, entry: config_entries.ConfigEntry
+) -> None:
+    """Reload an entry to apply its new options, dropping the wallets it lost."""
+    old_config = hass.data[DOMAIN].get(entry.entry_id)
+    await hass.config_entries.async_reload(entry.entry_id)
+    if old_config is None or old_config.get(CONF_INTEGRATION) != INTEGRATION_WALLET:
+        return
+    wallets = get_wallets({**entry.data, **entry.options})
+    if removed := set(get_wallets(old_config)) - set(wallets):
+        async_remove_wallets(hass, entry, removed, wallets)
+
+
 async def async_unload_entry(
     hass: core.HomeAssistant, entry: config_entries.ConfigEntry
 ) -> bool:
@@ -2,49 +2,531 @@
 from __future__ import annotations
 
 import asyncio
+from collections import defaultdict
+from collections.abc import Callable, Mapping
+from http import HTTPStatus
+import json
 import logging
 import time
 from typing import Any
 
-import requests
+from aiohttp import ClientError, ClientResponseError, ClientTimeout, hdrs
+from yarl import URL
 
-from ..const import BACKEND_KEY, BACKEND_URL
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+
+from ..const import BACKEND_KEY, BACKEND_URL, DOMAIN
+from .cache import DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES, CacheEntry, PayloadCache
+from .client import DEFAULT_TIMEOUT, HttpClient, HttpResponse
+from .inflight import InflightRequests, TaskFactory, create_task
+from .limiter import async_get_rate_limiter
+from .metrics import EndpointStats, async_get_metrics, endpoint_of
+from .retry import STATE_CLOSED, CircuitBreaker, CircuitOpen, RetryPolicy, is_retryable
+from .snapshot import PayloadSnapshot
+from .stream import RecordStreamDecoder
+from .transport import async_get_transport
 
 _LOGGER = logging.getLogger(__name__)
 
+DATA_BACKEND_API = f"{DOMAIN}_backend_api"
+
+# The reward endpoints are slow to start sending their large bodies
+ENDPOINT_TIMEOUTS = {
+    "hotspot-rewards2": ClientTimeout(total=None, sock_connect=10, sock_read=60),
+    "staking-rewards": ClientTimeout(total=None, sock_connect=10, sock_read=60),
+    "batch": ClientTimeout(total=None, sock_connect=10, sock_read=60),
+}
+
+BATCH_PATH = "batch"
+
+# Paths asked for within this many seconds share one batch request
+BATCH_DELAY = 0.05
+
+# Paths sent in a single batch request
+MAX_BATCH_PATHS = 50
+
+# A backend answering the batch path with these has no batch support
+BATCH_UNSUPPORTED = {
+    HTTPStatus.NOT_FOUND,
+    HTTPStatus.METHOD_NOT_ALLOWED,
+    HTTPStatus.NOT_IMPLEMENTED,
+}
+
+# Deadline of a fetch, including background refreshes nobody waits for
+FETCH_DEADLINE = 120
+
+# Last good data this old is served while the circuit of the backend is open
+OPEN_CIRCUIT_MAX_AGE = 6 * 3600
+
+# Wallets without staking or hotspots rarely get them, so a 404 or an empty
+# payload is trusted for longer than regular data
+NEGATIVE_CACHE_TTL = 3600
+
+
+class NotFound(ClientError):
+    """The backend has nothing for a path."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize."""
+        super().__init__(f"Nothing found at {path}")
+        self.path = path
+
+
+def is_empty_payload(data: Any) -> bool:
+    """Return if a payload holds nothing, like a wallet without staking."""
+    if isinstance(data, dict):
+        return all(not value for value in data.values())
+    return not data
+
 
 class BackendAPI:
-    def __init__(self, cache_ttl: int = 600):
-        self._cache: dict[str, Any] = {}
-        self._cache_ttl = cache_ttl
+    def __init__(
+        self,
+        client: HttpClient,
+        base_url: str = BACKEND_URL,
+        cache_ttl: int = 600,
+        cache_max_entries: int = DEFAULT_MAX_ENTRIES,
+        cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        snapshot: PayloadSnapshot | None = None,
+        cache_stale_ttl: int | None = None,
+        fetch_deadline: float = FETCH_DEADLINE,
+        retry_policy: RetryPolicy | None = None,
+        breaker_threshold: int = 5,
+        breaker_reset_timeout: float = 60,
+        negative_ttl: int = NEGATIVE_CACHE_TTL,
+        batch_delay: float = BATCH_DELAY,
+        create_task: TaskFactory = create_task,
+    ):
+        self._client = client
+        self._base_url = base_url
+        self.cache = PayloadCache(
+            cache_ttl, cache_max_entries, cache_max_bytes, cache_stale_ttl
+        )
+        # 404s and empty payloads, kept for their own TTL
+        self.negative_cache = PayloadCache(negative_ttl, cache_max_entries)
+        self.fetch_deadline = fetch_deadline
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._breaker_threshold = breaker_threshold
+        self._breaker_reset_timeout = breaker_reset_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self.retries = 0
+        self.endpoints: defaultdict[str, EndpointStats] = defaultdict(EndpointStats)
+        self.served_open = 0
+        self.served_stale = 0
+        self.background_refreshes = 0
+        self.background_refresh_failures = 0
+        self.snapshot = snapshot
+        self._inflight = InflightRequests(create_task)
+        self.batch_delay = batch_delay
+        self._create_task = create_task
+        # Until the backend answers a batch request without support for it
+        self.batch_supported = True
+        self._batch_pending: dict[str, Callable[[], RecordStreamDecoder] | None] = {}
+        self._batch: asyncio.Task[None] | None = None
+        self._batches: set[asyncio.Task[None]] = set()
+        self.batches = 0
+        self.batched_paths = 0
+        self.batch_failures = 0
 
-    @staticmethod
-    def http_client(
+    @property
+    def coalesced(self) -> int:
+        """Return the number of callers that joined a request in flight."""
+        return self._inflight.coalesced
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        """Return the circuit breaker of a host."""
+        if (breaker := self._breakers.get(host)) is None:
+            breaker = self._breakers[host] = CircuitBreaker(
+                host, self._breaker_threshold, self._breaker_reset_timeout
+            )
+        return breaker
+
+    async def http_client(
+        self,
         path: str,
         payload: Any | None = None,
         method: str = "GET",
         headers: Any | None = None,
-    ) -> requests.Response:
-        """Make the HTTP request with the given URL, payload, method, and headers."""
-        response = requests.request(
-            method, BACKEND_URL + "/" + path, json=payload, headers=headers
+        decoder: RecordStreamDecoder | None = None,
+    ) -> HttpResponse:
+        """Make the HTTP request with the given path, payload, method, and headers."""
+        return await self._client.async_request(
+            self._base_url + "/" + path,
+            payload,
+            method,
+            headers,
+            decoder,
+            ENDPOINT_TIMEOUTS.get(endpoint_of(path), DEFAULT_TIMEOUT),
         )
-        response.raise_for_status()
-        return response
 
     async def get_data(
-        self, path: str, cache_key: str | None = None
-    ) -> requests.Response:
-        """Get the data from a path."""
+        self,
+        path: str,
+        cache_key: str | None = None,
+        decoder: Callable[[], RecordStreamDecoder] | None = None,
+    ) -> Any:
+        """Get the decoded data from a path.
+
+        Past the cache TTL but within the stale TTL, the cached data is returned
+        right away and a single refresh is started in the background.
+
+        A decoder factory streams the body into a new decoder instead of decoding
+        it in one go once it has been read.
+
+        While the circuit of the backend is open, the last good data is served
+        if there is any, and CircuitOpen is raised otherwise.
+
+        A 404 raises NotFound, and it as well as an empty payload are cached
+        for the negative TTL.
+
+        Expired payloads are revalidated with a conditional request, and reused
+        as they are when the backend answers 304.
+        """
         cache_key = cache_key or path  # use path as cache key if cache key not provided
         now = time.time()
-        cache_entry = self._cache.get(cache_key)
-        if cache_entry is None or now - cache_entry["time"] > self._cache_ttl:
-            _LOGGER.debug("Refreshing data from %s", path)
-            headers = {"Authorization": "bearer " + BACKEND_KEY}
-            response = await asyncio.to_thread(
-                self.http_client, path, None, "GET", headers
+        if (negative := self.negative_cache.get(cache_key, now)) is not None:
+            if negative.data is None:
+                raise NotFound(path)
+            return negative.data
+        # Looked up before the expired entry is dropped, for its validators
+        previous = self.cache.peek(cache_key)
+        if (cache_entry := self.cache.get(cache_key, now, stale=True)) is not None:
+            if now - cache_entry.time > self.cache.ttl:
+                self.served_stale += 1
+                if cache_key not in self._inflight:
+                    self.background_refreshes += 1
+                    refresh = self._inflight.start(
+                        cache_key,
+                        self._async_fetch(path, cache_key, decoder, previous),
+                        background=True,
+                    )
+                    refresh.add_done_callback(self._async_background_fetch_done)
+            return cache_entry.data
+
+        # Concurrent callers for the same key share a single in-flight request
+        try:
+            return await self._inflight.wait(
+                cache_key,
+                lambda: self._async_fetch(path, cache_key, decoder, previous),
             )
-            self._cache[cache_key] = {"data": response, "time": now}
+        except CircuitOpen:
+            if (data := self.get_snapshot(cache_key, OPEN_CIRCUIT_MAX_AGE)) is None:
+                raise
+            self.served_open += 1
+            return data
+
+    async def _async_fetch(
+        self,
+        path: str,
+        cache_key: str,
+        decoder: Callable[[], RecordStreamDecoder] | None,
+        previous: CacheEntry | None = None,
+    ) -> Any:
+        """Fetch and cache the decoded data from a path."""
+        now = time.time()
+        _LOGGER.debug("Refreshing data from %s", path)
+        try:
+            async with asyncio.timeout(self.fetch_deadline):
+                entry = await self._async_fetch_with_retry(path, decoder, previous)
+        except ClientResponseError as err:
+            if err.status != 404:
+                raise
+            self.cache.pop(cache_key)
+            self.negative_cache.set(cache_key, None, 0, now)
+            raise NotFound(path) from err
+        self._store(cache_key, entry, now)
+        return entry.data
+
+    def _store(self, cache_key: str, entry: CacheEntry, now: float) -> None:
+        """Cache fetched data, in the negative cache when it is empty."""
+        data = entry.data
+        if is_empty_payload(data):
+            self.cache.pop(cache_key)
+            self.negative_cache.set(cache_key, data, entry.size, now)
+        else:
+            self.negative_cache.pop(cache_key)
+            self.cache.set(
+                cache_key, data, entry.size, now, entry.etag, entry.last_modified
+            )
+        if self.snapshot is not None:
+            self.snapshot.async_set(cache_key, data)
+
+    async def _async_fetch_with_retry(
+        self,
+        path: str,
+        decoder: Callable[[], RecordStreamDecoder] | None,
+        previous: CacheEntry | None = None,
+    ) -> CacheEntry:
+        """Fetch the decoded data and its validators, retrying transient failures.
+
+        With a previous entry, the request is conditional and a 304 returns it.
+        """
+        breaker = self.breaker(URL(self._base_url).host or "")
+        stats = self.endpoints[endpoint_of(path)]
+        headers = {"Authorization": "bearer " + BACKEND_KEY}
+        if previous is not None:
+            headers.update(previous.conditional_headers())
+        attempt = 0
+        while True:
+            breaker.before_request()
+            try:
+                stream_decoder = None if decoder is None else decoder()
+                start = time.perf_counter()
+                response = await self.http_client(
+                    path, None, "GET", headers, stream_decoder
+                )
+                if response.not_modified and previous is not None:
+                    stats.record_not_modified(previous.size)
+                    data, size = previous.data, previous.size
+                elif stream_decoder is None:
+                    decode_start = time.perf_counter()
+                    data, size = response.json(), len(response.content)
+                    stats.decode_time.observe(time.perf_counter() - decode_start)
+                    stats.record_body(response.wire_size, size)
+                else:
+                    data, size = stream_decoder.result, stream_decoder.bytes_read
+                    stats.decode_time.observe(stream_decoder.decode_time)
+                    stats.record_body(response.wire_size, size)
+                stats.latency.observe(time.perf_counter() - start)
+            except (ClientError, TimeoutError) as err:
+                if not is_retryable(err):
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                attempt += 1
+                if (
+                    attempt >= self.retry_policy.attempts
+                    or breaker.state != STATE_CLOSED
+                ):
+                    raise
+                self.retries += 1
+                delay = self.retry_policy.delay(attempt)
+                _LOGGER.debug("Retrying %s in %.1fs: %s", path, delay, err)
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+            breaker.record_success()
+            etag = response.headers.get(hdrs.ETAG)
+            last_modified = response.headers.get(hdrs.LAST_MODIFIED)
+            if response.not_modified and previous is not None:
+                etag = etag or previous.etag
+                last_modified = last_modified or previous.last_modified
+            return CacheEntry(data, size, time.time(), etag, last_modified)
+
+    async def async_prefetch(
+        self, paths: Mapping[str, Callable[[], RecordStreamDecoder] | None]
+    ) -> None:
+        """Fetch the data of many paths into the cache with batch requests.
+
+        Paths map to the decoder factory get_data is called with for them.
+        Paths asked for within the batch delay of each other, by any caller,
+        share the batch requests. Each path is cached under its own key, so the
+        get_data calls that follow are served from the cache. Paths that are
+        fresh or in flight are left out.
+
+        Nothing is raised: a path that could not be fetched is left to get_data,
+        which then requests it on its own. That is also what happens for every
+        path once the backend answered without batch support.
+        """
+        now = time.time()
+        if not self.batch_supported or not (
+            wanted := {
+                path: decoder
+                for path, decoder in paths.items()
+                if self._needs_fetch(path, now)
+            }
+        ):
+            return
+        self._batch_pending.update(wanted)
+        if self._batch is None:
+            self._batch = self._create_task(
+                self._async_send_batch(), "Helium backend batch"
+            )
+            self._batches.add(self._batch)
+            self._batch.add_done_callback(self._batches.discard)
+        # The batch goes on for the other callers when this one is cancelled
+        await asyncio.wait({self._batch})
+
+    def _needs_fetch(self, path: str, now: float) -> bool:
+        """Return if a path is neither fresh in a cache nor in flight."""
+        if path in self._inflight:
+            return False
+        for cache in (self.negative_cache, self.cache):
+            entry = cache.peek(path)
+            if entry is not None and now - entry.time <= cache.ttl:
+                return False
+        return True
+
+    async def _async_send_batch(self) -> None:
+        """Fetch the paths asked for during the batch delay."""
+        try:
+            await asyncio.sleep(self.batch_delay)
+        finally:
+            pending, self._batch_pending = self._batch_pending, {}
+            self._batch = None
+        paths = list(pending)
+        for start in range(0, len(paths), MAX_BATCH_PATHS):
+            chunk = {
+                path: pending[path] for path in paths[start : start + MAX_BATCH_PATHS]
+            }
+            try:
+                async with asyncio.timeout(self.fetch_deadline):
+                    await self._async_fetch_batch(chunk)
+            except ClientResponseError as err:
+                self.batch_failures += 1
+                if err.status in BATCH_UNSUPPORTED:
+                    _LOGGER.debug("Backend has no batch support, fetching paths alone")
+                    self.batch_supported = False
+                    return
+                _LOGGER.debug("Batch request failed: %s", err)
+            except (ClientError, TimeoutError, ValueError) as err:
+                self.batch_failures += 1
+                _LOGGER.debug("Batch request failed: %s", err)
+
+    async def _async_fetch_batch(
+        self, paths: Mapping[str, Callable[[], RecordStreamDecoder] | None]
+    ) -> None:
+        """Fetch paths in one batch request and cache each of them.
+
+        Paths with cached data are sent with its ETag, and reuse it when the
+        backend answers them with a 304. A 404 is cached as a negative entry,
+        other failed paths are left out.
+        """
+        breaker = self.breaker(URL(self._base_url).host or "")
+        stats = self.endpoints[BATCH_PATH]
+        previous = {path: self.cache.peek(path) for path in paths}
+        requests = []
+        for path in paths:
+            request = {"path": path}
+            if (entry := previous[path]) is not None and entry.etag is not None:
+                request["etag"] = entry.etag
+            requests.append(request)
+        headers = {"Authorization": "bearer " + BACKEND_KEY}
+
+        breaker.before_request()
+        try:
+            start = time.perf_counter()
+            response = await self.http_client(
+                BATCH_PATH, {"requests": requests}, "POST", headers
+            )
+            decode_start = time.perf_counter()
+            if not isinstance(results := response.json().get("responses"), dict):
+                raise ValueError("Batch response without responses")
+            stats.decode_time.observe(time.perf_counter() - decode_start)
+            stats.record_body(response.wire_size, len(response.content))
+            stats.latency.observe(time.perf_counter() - start)
+        except (ClientError, TimeoutError) as err:
+            if is_retryable(err):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_success()
+        self.batches += 1
+        self.batched_paths += len(paths)
+
+        now = time.time()
+        for path, decoder in paths.items():
+            if not isinstance(result := results.get(path), dict):
+                continue
+            status = result.get("status")
+            etag = result.get("etag")
+            if status == HTTPStatus.NOT_FOUND:
+                self.cache.pop(path)
+                self.negative_cache.set(path, None, 0, now)
+            elif status == HTTPStatus.NOT_MODIFIED and (entry := previous[path]):
+                self.endpoints[endpoint_of(path)].record_not_modified(entry.size)
+                entry = CacheEntry(
+                    entry.data,
+                    entry.size,
+                    now,
+                    etag or entry.etag,
+                    entry.last_modified,
+                )
+                self._store(path, entry, now)
+            elif status == HTTPStatus.OK and isinstance(
+                body := result.get("body"), dict
+            ):
+                data = body if decoder is None else decoder().decode(body)
+                # The length of the body on its own, as for a request of the path
+                size = len(json.dumps(body, separators=(",", ":")))
+                self._store(path, CacheEntry(data, size, now, etag), now)
+
+    def get_snapshot(self, cache_key: str, max_age: float) -> Any | None:
+        """Get the last good data saved before a restart, if recent enough."""
+        if self.snapshot is None:
+            return None
+        return self.snapshot.get(cache_key, max_age)
+
+    @callback
+    def async_track_snapshot(self, cache_key: str) -> CALLBACK_TYPE:
+        """Keep saving the last good data of a key until the callback is called."""
+        if self.snapshot is None:
+            return lambda: None
+        return self.snapshot.async_track(cache_key)
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancel every request in flight."""
+        self._inflight.cancel_all()
+        for batch in self._batches:
+            batch.cancel()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters of the API."""
+        return {
+            "cache": self.cache.as_dict(),
+            "negative_cache": self.negative_cache.as_dict(),
+            "coalesced": self.coalesced,
+            "served_stale": self.served_stale,
+            "served_open": self.served_open,
+            "background_refreshes": self.background_refreshes,
+            "background_refresh_failures": self.background_refresh_failures,
+            "retries": self.retries,
+            "batch": {
+                "supported": self.batch_supported,
+                "batches": self.batches,
+                "paths": self.batched_paths,
+                "failures": self.batch_failures,
+            },
+            "endpoints": {
+                endpoint: stats.as_dict() for endpoint, stats in self.endpoints.items()
+            },
+            "breakers": {
+                host: breaker.as_dict() for host, breaker in self._breakers.items()
+            },
+        }
+
+    def _async_background_fetch_done(self, task: asyncio.Task[Any]) -> None:
+        """Count a failed background refresh."""
+        if task.cancelled() or task.exception() is not None:
+            self.background_refresh_failures += 1
+
+
+@singleton(DATA_BACKEND_API)
+async def async_get_backend_api(hass: HomeAssistant) -> BackendAPI:
+    """Get the backend API shared by all config entries."""
+    snapshot = PayloadSnapshot(hass, "backend")
+    await snapshot.async_load()
+    client = HttpClient(async_get_transport(hass), async_get_rate_limiter(hass))
+    api = BackendAPI(
+        client,
+        BACKEND_URL,
+        snapshot=snapshot,
+        create_task=hass.async_create_background_task,
+    )
+    async_get_metrics(hass).async_add_source("backend", api.as_dict)
+
+    @callback
+    def _async_cancel(event: Event) -> None:
+        api.async_cancel()
 
-        return self._cache[cache_key]["data"]
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_cancel)
+    return api
@@ -0,0 +1,163 @@
+"""Bounded cache for decoded API payloads."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import logging
+import time
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+@dataclass
+class CacheEntry:
+    """Cached payload."""
+
+    data: Any
+    size: int
+    time: float
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Return the headers to revalidate the payload with."""
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PayloadCache:
+    """LRU cache with TTL expiry, bounded by entry count and payload bytes.
+
+    The size of an entry is the length of the raw body it was decoded from,
+    which is a cheap and stable estimate of the memory the payload holds.
+
+    A payload larger than the whole byte budget is not stored, and counted as
+    oversized.
+
+    Entries are fresh up to ttl seconds old. With a stale_ttl, they are kept
+    until stale_ttl seconds old and can still be looked up as stale.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        stale_ttl: float | None = None,
+    ) -> None:
+        """Initialize."""
+        self.ttl = ttl
+        self.stale_ttl = ttl if stale_ttl is None else max(ttl, stale_ttl)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.oversized = 0
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return len(self._entries)
+
+    @property
+    def bytes(self) -> int:
+        """Return the total size of the cached payloads."""
+        return self._bytes
+
+    def get(
+        self, key: str, now: float | None = None, stale: bool = False
+    ) -> CacheEntry | None:
+        """Return a fresh, or if allowed stale, entry.
+
+        The lookup is counted as a hit or a miss.
+        """
+        if (entry := self._entries.get(key)) is None:
+            self.misses += 1
+            return None
+        age = (time.time() if now is None else now) - entry.time
+        if age > self.stale_ttl:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        if age > self.ttl and not stale:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def peek(self, key: str) -> CacheEntry | None:
+        """Return an entry of any age, without counting the lookup."""
+        return self._entries.get(key)
+
+    def set(
+        self,
+        key: str,
+        data: Any,
+        size: int,
+        now: float | None = None,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """Store a payload and evict the least recently used entries over budget.
+
+        The ETag and Last-Modified of the response are kept to revalidate the
+        payload once it expired.
+        """
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            _LOGGER.debug(
+                "Not caching %s, its %s bytes exceed the cache of %s bytes",
+                key,
+                size,
+                self.max_bytes,
+            )
+            self.oversized += 1
+            return
+        self._entries[key] = CacheEntry(
+            data, size, time.time() if now is None else now, etag, last_modified
+        )
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def pop(self, key: str) -> None:
+        """Remove an entry, if there is one."""
+        if key in self._entries:
+            self._remove(key)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Return the share of lookups that were hits."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the cache counters."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hit_ratio, 3),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "oversized": self.oversized,
+        }
+
+    def _remove(self, key: str) -> None:
+        self._bytes -= self._entries.pop(key).size
@@ -0,0 +1,159 @@
+"""HTTP client."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any
+
+from aiohttp import ClientError, ClientTimeout, ServerTimeoutError, hdrs
+from aiohttp.compression_utils import HAS_BROTLI
+from yarl import URL
+
+from homeassistant.util.json import json_loads
+
+from .limiter import RateLimited, RateLimiter, parse_retry_after
+from .stream import RecordStreamDecoder
+from .transport import BodyReader, Transport
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Streamed bodies past this size are decoded in the executor
+STREAM_OFFLOAD_SIZE = 256 * 1024
+
+# aiohttp decompresses brotli bodies when a brotli package is installed
+ACCEPT_ENCODING = "gzip, deflate, br" if HAS_BROTLI else "gzip, deflate"
+
+# Requests fail when connecting, or waiting for the next read, takes longer
+DEFAULT_TIMEOUT = ClientTimeout(total=None, sock_connect=10, sock_read=30)
+
+
+@dataclass(frozen=True)
+class HttpResponse:
+    """HTTP response with a fully read body.
+
+    The content is empty when the body was streamed into a decoder, or the
+    response is a 304. The wire size is the Content-Length, which is the
+    compressed size of a compressed body.
+    """
+
+    status_code: int
+    headers: Mapping[str, str]
+    content: bytes
+    wire_size: int | None = None
+
+    @property
+    def not_modified(self) -> bool:
+        """Return if the response is a 304 to a conditional request."""
+        return self.status_code == HTTPStatus.NOT_MODIFIED
+
+    def json(self) -> Any:
+        """Decode the body as JSON."""
+        return json_loads(self.content)
+
+
+class HttpClient:
+    """HTTP client running on the event loop.
+
+    Requests go through a transport. The session transport uses the shared
+    aiohttp session, so connections are kept alive and pooled per host
+    instead of being opened for every call. With a rate
+    limiter, requests wait for their turn at the host, and a 429 response
+    blocks the host for its Retry-After.
+
+    Requests are bounded by connect and read timeouts, and cancelling the
+    calling task closes the connection right away.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        limiter: RateLimiter | None = None,
+        timeout: ClientTimeout = DEFAULT_TIMEOUT,
+    ) -> None:
+        """Initialize."""
+        self.transport = transport
+        self.limiter = limiter
+        self.timeout = timeout
+
+    async def async_request(
+        self,
+        url: str,
+        payload: Any | None = None,
+        method: str = "GET",
+        headers: Mapping[str, str] | None = None,
+        decoder: RecordStreamDecoder | None = None,
+        timeout: ClientTimeout | None = None,
+    ) -> HttpResponse:
+        """Make the HTTP request with the given URL, payload, method, and headers.
+
+        Compressed transfer is negotiated and bodies are decompressed on read.
+        With a decoder, the body is fed to it chunk by chunk as it arrives.
+        Raises RateLimited while the host is throttled and ServerTimeoutError
+        when the request times out.
+        """
+        host = URL(url).host or ""
+        if self.limiter is not None:
+            await self.limiter.host(host).acquire()
+        try:
+            return await self._async_request(
+                host, url, payload, method, headers, decoder, timeout or self.timeout
+            )
+        except asyncio.TimeoutError as err:
+            if isinstance(err, ClientError):
+                raise
+            raise ServerTimeoutError(f"Timeout requesting {url}") from err
+
+    async def _async_request(
+        self,
+        host: str,
+        url: str,
+        payload: Any | None,
+        method: str,
+        headers: Mapping[str, str] | None,
+        decoder: RecordStreamDecoder | None,
+        timeout: ClientTimeout,
+    ) -> HttpResponse:
+        headers = {hdrs.ACCEPT_ENCODING: ACCEPT_ENCODING, **(headers or {})}
+        async with self.transport.request(
+            method, url, payload, headers, timeout
+        ) as response:
+            if response.status == HTTPStatus.TOO_MANY_REQUESTS:
+                retry_after = parse_retry_after(response.headers.get(hdrs.RETRY_AFTER))
+                if self.limiter is not None:
+                    self.limiter.host(host).throttle(retry_after)
+                raise RateLimited(host, retry_after)
+            response.raise_for_status()
+            if response.status == HTTPStatus.NOT_MODIFIED:
+                content = b""
+            elif decoder is None:
+                content = await response.read()
+            else:
+                await self._async_stream(
+                    response.content, response.content_length, decoder
+                )
+                content = b""
+            return HttpResponse(
+                response.status, response.headers, content, response.content_length
+            )
+
+    async def _async_stream(
+        self,
+        content: BodyReader,
+        content_length: int | None,
+        decoder: RecordStreamDecoder,
+    ) -> None:
+        """Feed a body to a decoder, off the event loop once it is large."""
+        loop = asyncio.get_running_loop()
+        offload = (content_length or 0) > STREAM_OFFLOAD_SIZE
+        async for chunk in content.iter_chunked(STREAM_CHUNK_SIZE):
+            if offload or decoder.bytes_read > STREAM_OFFLOAD_SIZE:
+                offload = True
+                await loop.run_in_executor(None, decoder.feed, chunk)
+            else:
+                decoder.feed(chunk)
+        if offload:
+            await loop.run_in_executor(None, decoder.finish)
+        else:
+            decoder.finish()
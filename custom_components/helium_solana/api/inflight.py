@@ -0,0 +1,95 @@
+"""In-flight requests shared by concurrent callers."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Callable, Coroutine
+from typing import Any
+
+# Starts a named task, like hass.async_create_background_task
+TaskFactory = Callable[[Coroutine[Any, Any, Any], str], asyncio.Task[Any]]
+
+
+def create_task(coro: Coroutine[Any, Any, Any], name: str) -> asyncio.Task[Any]:
+    """Start a named task on the running loop, without Home Assistant tracking it."""
+    return asyncio.get_running_loop().create_task(coro, name=name)
+
+
+class InflightRequests:
+    """Requests in flight by key, awaited by every caller of the same key.
+
+    A request is cancelled, closing its connection, once all callers waiting
+    for it were cancelled. Background requests run until done or cancelled
+    with cancel_all. Requests run as tasks of the task factory.
+    """
+
+    def __init__(self, create_task: TaskFactory = create_task) -> None:
+        """Initialize."""
+        self._create_task = create_task
+        self._tasks: dict[str, asyncio.Task[Any]] = {}
+        self._waiters: Counter[str] = Counter()
+        self._background: set[str] = set()
+        self.coalesced = 0
+        self.cancelled = 0
+
+    def __contains__(self, key: str) -> bool:
+        """Return if a request for the key is in flight."""
+        return key in self._tasks
+
+    def __len__(self) -> int:
+        """Return the number of requests in flight."""
+        return len(self._tasks)
+
+    def start(
+        self,
+        key: str,
+        coro: Coroutine[Any, Any, Any],
+        background: bool = False,
+    ) -> asyncio.Task[Any]:
+        """Start a request and track it as in flight."""
+        task = self._create_task(coro, f"Request {key}")
+        self._tasks[key] = task
+        if background:
+            self._background.add(key)
+        task.add_done_callback(lambda done: self._done(key, done))
+        return task
+
+    async def wait(
+        self, key: str, factory: Callable[[], Coroutine[Any, Any, Any]]
+    ) -> Any:
+        """Wait for the request of a key, starting it if none is in flight."""
+        if (task := self._tasks.get(key)) is not None:
+            self.coalesced += 1
+        else:
+            task = self.start(key, factory())
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if (
+                self._waiters[key] == 1
+                and key not in self._background
+                and not task.done()
+            ):
+                self.cancelled += 1
+                task.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def cancel_all(self) -> None:
+        """Cancel every request in flight."""
+        for task in self._tasks.values():
+            if not task.done():
+                self.cancelled += 1
+                task.cancel()
+
+    def _done(self, key: str, task: asyncio.Task[Any]) -> None:
+        """Forget a finished request."""
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+            self._background.discard(key)
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller went away
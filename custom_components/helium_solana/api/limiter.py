@@ -0,0 +1,179 @@
+"""Per host rate limiting."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+import time
+from typing import Any
+
+from aiohttp import ClientError
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+
+from ..const import DOMAIN
+from .metrics import async_get_metrics
+
+DATA_RATE_LIMITER = f"{DOMAIN}_rate_limiter"
+
+# Used when a 429 response has no usable Retry-After header
+DEFAULT_RETRY_AFTER = 60.0
+
+# Callers fail right away instead of queueing when the wait would be longer
+DEFAULT_MAX_WAIT = 30.0
+
+# The public CoinGecko API allows a handful of calls per minute
+COINGECKO_HOST = "api.coingecko.com"
+COINGECKO_RATE = 5 / 60
+COINGECKO_BURST = 3
+
+
+class RateLimited(ClientError):
+    """Requests to a host are throttled."""
+
+    def __init__(self, host: str, retry_after: float) -> None:
+        """Initialize."""
+        super().__init__(f"Requests to {host} throttled for {retry_after:.0f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float:
+    """Return the seconds to wait from a Retry-After header value."""
+    if value is None:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(0.0, retry_at.timestamp() - now)
+
+
+class HostLimit:
+    """Token bucket of a host, blocked entirely while a Retry-After runs.
+
+    Callers queue in order on a lock and wait for a token. Without a rate
+    only Retry-After is honored.
+    """
+
+    def __init__(self, host: str, rate: float | None = None, burst: int = 1) -> None:
+        """Initialize with the tokens added per second and the bucket size."""
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self.requests = 0
+        self.queued = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.wait_time = 0.0
+
+    def blocked_for(self, now: float | None = None) -> float:
+        """Return the seconds left of the last Retry-After."""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._blocked_until - now)
+
+    def _delay(self, now: float) -> float:
+        """Refill the bucket and return how long the next caller has to wait."""
+        if self.rate is not None:
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+        self._updated = now
+        delay = self.blocked_for(now)
+        if self.rate is not None and self._tokens < 1:
+            delay = max(delay, (1 - self._tokens) / self.rate)
+        return delay
+
+    async def acquire(self, max_wait: float = DEFAULT_MAX_WAIT) -> None:
+        """Wait for the turn of the caller, failing if it is too far away."""
+        start = time.monotonic()
+        self._check_blocked(max_wait)
+        if not self._lock.locked() and self._delay(start) == 0:
+            self._take()
+            return
+
+        self.queued += 1
+        async with self._lock:
+            while (delay := self._delay(time.monotonic())) > 0:
+                # A Retry-After may have come in while queued
+                self._check_blocked(max_wait)
+                await asyncio.sleep(delay)
+            self._take()
+        self.wait_time += time.monotonic() - start
+
+    def _check_blocked(self, max_wait: float) -> None:
+        if (blocked := self.blocked_for()) > max_wait:
+            self.rejected += 1
+            raise RateLimited(self.host, blocked)
+
+    def _take(self) -> None:
+        self.requests += 1
+        if self.rate is not None:
+            self._tokens -= 1
+
+    @callback
+    def throttle(self, retry_after: float) -> None:
+        """Block the host after a 429 response."""
+        self.throttled += 1
+        self._tokens = min(self._tokens, 0.0)
+        self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters of the host."""
+        return {
+            "requests": self.requests,
+            "queued": self.queued,
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+            "wait_time": round(self.wait_time, 3),
+            "blocked_for": round(self.blocked_for(), 3),
+        }
+
+
+class RateLimiter:
+    """Rate limits of all hosts, shared by every HTTP client."""
+
+    def __init__(self, rates: dict[str, tuple[float, int]] | None = None) -> None:
+        """Initialize with the rate and burst of limited hosts."""
+        self._rates = dict(rates or {})
+        self._hosts: dict[str, HostLimit] = {}
+
+    def set_rate(self, host: str, rate: float | None, burst: int = 1) -> None:
+        """Set the rate of a host."""
+        if rate is None:
+            self._rates.pop(host, None)
+        else:
+            self._rates[host] = (rate, burst)
+        self._hosts.pop(host, None)
+
+    def host(self, host: str) -> HostLimit:
+        """Return the limit of a host."""
+        if (limit := self._hosts.get(host)) is None:
+            rate, burst = self._rates.get(host, (None, 1))
+            limit = self._hosts[host] = HostLimit(host, rate, burst)
+        return limit
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        """Return the counters of every host."""
+        return {host: limit.as_dict() for host, limit in self._hosts.items()}
+
+
+@singleton(DATA_RATE_LIMITER)
+@callback
+def async_get_rate_limiter(hass: HomeAssistant) -> RateLimiter:
+    """Get the rate limiter shared by all config entries."""
+    limiter = RateLimiter({COINGECKO_HOST: (COINGECKO_RATE, COINGECKO_BURST)})
+    async_get_metrics(hass).async_add_source("rate_limiter", limiter.as_dict)
+    return limiter
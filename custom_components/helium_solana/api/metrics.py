@@ -0,0 +1,253 @@
+"""Performance metrics of the integration."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Callable
+import math
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+
+from ..const import DOMAIN
+
+if TYPE_CHECKING:
+    from ..coordinator import HeliumDataUpdateCoordinator
+
+DATA_METRICS = f"{DOMAIN}_metrics"
+
+# Upper bounds in seconds of the histogram buckets
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """Histogram of durations in fixed buckets."""
+
+    __slots__ = ("buckets", "counts", "count", "total", "max")
+
+    def __init__(self, buckets: tuple[float, ...] = TIME_BUCKETS) -> None:
+        """Initialize with the upper bounds of the buckets."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Count a value."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, quantile: float) -> float:
+        """Return the upper bound of the bucket holding a quantile."""
+        rank = math.ceil(quantile * self.count)
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the summary and buckets."""
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else 0.0,
+            "p50": round(self.quantile(0.5), 4),
+            "p95": round(self.quantile(0.95), 4),
+            "max": round(self.max, 4),
+            "buckets": {
+                f"le_{bound}": count
+                for bound, count in zip(self.buckets, self.counts)
+                if count
+            }
+            | ({"le_inf": self.counts[-1]} if self.counts[-1] else {}),
+        }
+
+
+class EndpointStats:
+    """Counters of the requests to an endpoint.
+
+    Bytes saved are the decoded size of a payload reused after a 304, plus
+    what compression took off the decoded size of a body. Latency covers a
+    whole request including its body, decode time only the decoding.
+    """
+
+    __slots__ = (
+        "requests",
+        "not_modified",
+        "bytes_received",
+        "bytes_decoded",
+        "bytes_saved",
+        "latency",
+        "decode_time",
+    )
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_received = 0
+        self.bytes_decoded = 0
+        self.bytes_saved = 0
+        self.latency = Histogram()
+        self.decode_time = Histogram()
+
+    @property
+    def not_modified_ratio(self) -> float:
+        """Return the share of requests answered with a 304."""
+        return self.not_modified / self.requests if self.requests else 0.0
+
+    def record_body(self, wire_size: int | None, decoded_size: int) -> None:
+        """Count a response with a body."""
+        self.requests += 1
+        received = decoded_size if wire_size is None else wire_size
+        self.bytes_received += received
+        self.bytes_decoded += decoded_size
+        self.bytes_saved += max(0, decoded_size - received)
+
+    def record_not_modified(self, cached_size: int) -> None:
+        """Count a 304 reusing a cached payload."""
+        self.requests += 1
+        self.not_modified += 1
+        self.bytes_saved += cached_size
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters."""
+        return {
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "not_modified_ratio": round(self.not_modified_ratio, 3),
+            "bytes_received": self.bytes_received,
+            "bytes_decoded": self.bytes_decoded,
+            "bytes_saved": self.bytes_saved,
+            "latency": self.latency.as_dict(),
+            "decode_time": self.decode_time.as_dict(),
+        }
+
+
+class UpdateStats:
+    """Counters of the updates of a coordinator and the state writes they cause."""
+
+    __slots__ = (
+        "updates",
+        "failures",
+        "duration",
+        "last_duration",
+        "cycles",
+        "entities_written",
+        "entities_skipped",
+        "last_entities_written",
+        "_cycle_written",
+    )
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.updates = 0
+        self.failures = 0
+        self.duration = Histogram()
+        self.last_duration = 0.0
+        self.cycles = 0
+        self.entities_written = 0
+        self.entities_skipped = 0
+        self.last_entities_written = 0
+        self._cycle_written = 0
+
+    def record_update(self, duration: float, success: bool) -> None:
+        """Count an update and its duration."""
+        self.updates += 1
+        if not success:
+            self.failures += 1
+        self.duration.observe(duration)
+        self.last_duration = duration
+
+    def start_cycle(self) -> None:
+        """Start counting the state writes of a listener update."""
+        self._cycle_written = 0
+
+    def record_write(self, written: bool) -> None:
+        """Count an entity state written, or skipped as unchanged."""
+        if written:
+            self.entities_written += 1
+            self._cycle_written += 1
+        else:
+            self.entities_skipped += 1
+
+    def end_cycle(self) -> None:
+        """Finish counting the state writes of a listener update."""
+        self.cycles += 1
+        self.last_entities_written = self._cycle_written
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters."""
+        return {
+            "updates": self.updates,
+            "failures": self.failures,
+            "duration": self.duration.as_dict(),
+            "last_duration": round(self.last_duration, 4),
+            "cycles": self.cycles,
+            "entities_written": self.entities_written,
+            "entities_skipped": self.entities_skipped,
+            "last_entities_written": self.last_entities_written,
+            "entities_written_per_cycle": (
+                round(self.entities_written / self.cycles, 2) if self.cycles else 0.0
+            ),
+        }
+
+
+class MetricsRegistry:
+    """Metrics of the shared APIs and of the coordinators of every entry."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._sources: dict[str, Callable[[], dict[str, Any]]] = {}
+        self._coordinators: dict[str, list[HeliumDataUpdateCoordinator]] = {}
+
+    @callback
+    def async_add_source(self, name: str, source: Callable[[], dict[str, Any]]) -> None:
+        """Add metrics shared by all entries, like those of an API."""
+        self._sources[name] = source
+
+    @callback
+    def async_add_coordinator(
+        self, entry_id: str, coordinator: HeliumDataUpdateCoordinator
+    ) -> CALLBACK_TYPE:
+        """Add a coordinator of an entry, returning a callback to remove it."""
+        coordinators = self._coordinators.setdefault(entry_id, [])
+        coordinators.append(coordinator)
+
+        @callback
+        def _async_remove() -> None:
+            coordinators.remove(coordinator)
+            if not coordinators:
+                self._coordinators.pop(entry_id, None)
+
+        return _async_remove
+
+    def coordinators(self, entry_id: str) -> list[HeliumDataUpdateCoordinator]:
+        """Return the coordinators of an entry."""
+        return list(self._coordinators.get(entry_id, ()))
+
+    def as_dict(self, entry_id: str | None = None) -> dict[str, Any]:
+        """Return the shared metrics, and those of an entry's coordinators."""
+        metrics = {name: source() for name, source in self._sources.items()}
+        if entry_id is not None:
+            metrics["coordinators"] = {
+                coordinator.name: coordinator.metrics()
+                for coordinator in self.coordinators(entry_id)
+            }
+        return metrics
+
+
+@singleton(DATA_METRICS)
+@callback
+def async_get_metrics(hass: HomeAssistant) -> MetricsRegistry:
+    """Get the metrics registry shared by all config entries."""
+    return MetricsRegistry()
+
+
+def endpoint_of(path: str) -> str:
+    """Return the endpoint of a path, without its address."""
+    return path.split("/", 1)[0]
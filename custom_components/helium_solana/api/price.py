@@ -0,0 +1,167 @@
+"""CoinGecko price API."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+import logging
+import time
+from typing import Any
+
+from aiohttp import ClientTimeout, hdrs
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.singleton import singleton
+
+from ..const import COINGECKO_PRICE_URL, DOMAIN
+from .cache import CacheEntry
+from .client import HttpClient
+from .inflight import InflightRequests, TaskFactory, create_task
+from .limiter import RateLimited, async_get_rate_limiter
+from .metrics import EndpointStats, async_get_metrics
+from .snapshot import PayloadSnapshot
+from .transport import async_get_transport
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_PRICE_API = f"{DOMAIN}_price_api"
+
+# Prices this recent are shared instead of fetched again
+PRICE_CACHE_TTL = 60
+
+PRICE_TIMEOUT = ClientTimeout(total=30, sock_connect=10, sock_read=15)
+
+
+class PriceAPI:
+    """CoinGecko simple price API shared by all price consumers.
+
+    Concurrent and recent requests for the same prices share one fetch, and
+    while CoinGecko throttles us the last good prices are served instead,
+    starting from the ones saved before a restart. Older prices are
+    revalidated with a conditional request.
+    """
+
+    def __init__(
+        self,
+        client: HttpClient,
+        url: str = COINGECKO_PRICE_URL,
+        cache_ttl: float = PRICE_CACHE_TTL,
+        snapshot: PayloadSnapshot | None = None,
+        create_task: TaskFactory = create_task,
+    ) -> None:
+        """Initialize."""
+        self._client = client
+        self._url = url
+        self.cache_ttl = cache_ttl
+        self.snapshot = snapshot
+        self._last_good: dict[str, CacheEntry] = {}
+        if snapshot is not None:
+            # Without validators, restored prices are fetched again in full
+            self._last_good = {
+                query: CacheEntry(data, 0, fetched)
+                for query, (data, fetched) in snapshot.payloads().items()
+            }
+        self._inflight = InflightRequests(create_task)
+        self.served_cached = 0
+        self.served_throttled = 0
+        self.stats = EndpointStats()
+
+    @property
+    def coalesced(self) -> int:
+        """Return the number of callers that joined a request in flight."""
+        return self._inflight.coalesced
+
+    @staticmethod
+    def _query(ids: Iterable[str], currencies: Iterable[str]) -> str:
+        return f"ids={','.join(ids)}&vs_currencies={','.join(sorted(currencies))}"
+
+    async def get_prices(
+        self, ids: Iterable[str], currencies: Iterable[str]
+    ) -> dict[str, dict[str, float]]:
+        """Get the prices of tokens in the given currencies."""
+        query = self._query(ids, currencies)
+        last_good = self._last_good.get(query)
+        if last_good is not None and time.time() - last_good.time <= self.cache_ttl:
+            self.served_cached += 1
+            return last_good.data
+
+        try:
+            return await self._inflight.wait(
+                query, lambda: self._async_fetch(query, last_good)
+            )
+        except RateLimited as err:
+            if last_good is None:
+                raise
+            _LOGGER.debug("Serving the last good prices: %s", err)
+            self.served_throttled += 1
+            return last_good.data
+
+    async def _async_fetch(
+        self, query: str, previous: CacheEntry | None
+    ) -> dict[str, dict[str, float]]:
+        """Fetch and remember prices."""
+        headers = {} if previous is None else previous.conditional_headers()
+        start = time.perf_counter()
+        response = await self._client.async_request(
+            f"{self._url}?{query}", headers=headers, timeout=PRICE_TIMEOUT
+        )
+        if response.not_modified and previous is not None:
+            self.stats.latency.observe(time.perf_counter() - start)
+            self.stats.record_not_modified(previous.size)
+            previous.time = time.time()
+            return previous.data
+        decode_start = time.perf_counter()
+        data = response.json()
+        self.stats.decode_time.observe(time.perf_counter() - decode_start)
+        self.stats.latency.observe(time.perf_counter() - start)
+        self.stats.record_body(response.wire_size, len(response.content))
+        self._last_good[query] = CacheEntry(
+            data,
+            len(response.content),
+            time.time(),
+            response.headers.get(hdrs.ETAG),
+            response.headers.get(hdrs.LAST_MODIFIED),
+        )
+        if self.snapshot is not None:
+            self.snapshot.async_set(query, data)
+        return data
+
+    def get_snapshot(
+        self, ids: Iterable[str], currencies: Iterable[str], max_age: float
+    ) -> dict[str, dict[str, float]] | None:
+        """Get the last good prices saved before a restart, if recent enough."""
+        if self.snapshot is None:
+            return None
+        return self.snapshot.get(self._query(ids, currencies), max_age)
+
+    @callback
+    def async_track_snapshot(
+        self, ids: Iterable[str], currencies: Iterable[str]
+    ) -> CALLBACK_TYPE:
+        """Keep saving the last good prices until the returned callback is called."""
+        if self.snapshot is None:
+            return lambda: None
+        return self.snapshot.async_track(self._query(ids, currencies))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters of the API."""
+        return {
+            "coalesced": self.coalesced,
+            "served_cached": self.served_cached,
+            "served_throttled": self.served_throttled,
+            "transfer": self.stats.as_dict(),
+        }
+
+
+@singleton(DATA_PRICE_API)
+async def async_get_price_api(hass: HomeAssistant) -> PriceAPI:
+    """Get the price API shared by all config entries."""
+    snapshot = PayloadSnapshot(hass, "price")
+    await snapshot.async_load()
+    client = HttpClient(async_get_transport(hass), async_get_rate_limiter(hass))
+    api = PriceAPI(
+        client,
+        COINGECKO_PRICE_URL,
+        snapshot=snapshot,
+        create_task=hass.async_create_background_task,
+    )
+    async_get_metrics(hass).async_add_source("price", api.as_dict)
+    return api
@@ -0,0 +1,112 @@
+"""Retries and circuit breaking of failing hosts."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import random
+import time
+from typing import Any
+
+from aiohttp import ClientConnectionError, ClientError, ClientResponseError
+
+from .limiter import RateLimited
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpen(ClientError):
+    """Requests to a host fail fast while its circuit is open."""
+
+    def __init__(self, host: str, retry_in: float) -> None:
+        """Initialize."""
+        super().__init__(f"Circuit of {host} open, probing in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+def is_retryable(err: BaseException) -> bool:
+    """Return if a request failed in a way that may pass when retried."""
+    if isinstance(err, (RateLimited, CircuitOpen)):
+        return False
+    if isinstance(err, ClientResponseError):
+        return err.status >= 500
+    return isinstance(err, (ClientConnectionError, TimeoutError))
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Capped exponential backoff with full jitter."""
+
+    attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 10.0
+
+    def delay(self, attempt: int) -> float:
+        """Return the delay before retrying after the given failed attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class CircuitBreaker:
+    """Circuit breaker of a host.
+
+    After failure_threshold consecutive failures the circuit opens and
+    requests fail fast. Once reset_timeout has passed, a single probe request
+    is let through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self, host: str, failure_threshold: int = 5, reset_timeout: float = 60
+    ) -> None:
+        """Initialize."""
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self.opened = 0
+        self.rejected = 0
+        self.probes = 0
+
+    def before_request(self, now: float | None = None) -> None:
+        """Let a request through, or raise CircuitOpen."""
+        if self.state == STATE_CLOSED:
+            return
+        now = time.monotonic() if now is None else now
+        retry_in = self._opened_at + self.reset_timeout - now
+        if self.state == STATE_OPEN and retry_in <= 0:
+            self.state = STATE_HALF_OPEN
+            self.probes += 1
+            return
+        self.rejected += 1
+        raise CircuitOpen(self.host, max(0.0, retry_in))
+
+    def record_success(self) -> None:
+        """Record a response from the host."""
+        self.failures = 0
+        self.state = STATE_CLOSED
+
+    def record_failure(self, now: float | None = None) -> None:
+        """Record a failed request, opening the circuit when needed."""
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != STATE_OPEN:
+                self.opened += 1
+            self.state = STATE_OPEN
+            self._opened_at = time.monotonic() if now is None else now
+
+    def release(self) -> None:
+        """Let another request probe when a probe ended without a result."""
+        if self.state == STATE_HALF_OPEN:
+            self.state = STATE_OPEN
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state and counters of the breaker."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "probes": self.probes,
+        }
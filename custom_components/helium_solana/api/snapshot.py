@@ -0,0 +1,95 @@
+"""Persistent snapshot of the last good API payloads."""
+from __future__ import annotations
+
+from collections import Counter
+import time
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from ..const import DOMAIN
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+# Snapshots older than this are dropped when loading
+MAX_SNAPSHOT_AGE = 7 * 24 * 3600
+
+
+class PayloadSnapshot:
+    """Last good payloads with their fetch time, saved across restarts.
+
+    Only the payloads of keys some coordinator tracks are saved, so the keys
+    of removed wallets are dropped from the store at the next save.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize."""
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{key}"
+        )
+        self._payloads: dict[str, dict[str, Any]] = {}
+        # Number of coordinators using each key
+        self._tracked: Counter[str] = Counter()
+
+    async def async_load(self) -> None:
+        """Load the payloads saved before the last restart."""
+        if (payloads := await self._store.async_load()) is None:
+            return
+        now = time.time()
+        self._payloads = {
+            key: payload
+            for key, payload in payloads.items()
+            if now - payload["time"] <= MAX_SNAPSHOT_AGE
+        }
+
+    def get(self, key: str, max_age: float) -> Any | None:
+        """Return a payload if it is not older than max_age seconds."""
+        if (payload := self._payloads.get(key)) is None:
+            return None
+        if time.time() - payload["time"] > max_age:
+            return None
+        return payload["data"]
+
+    def payloads(self) -> dict[str, tuple[Any, float]]:
+        """Return every payload with the time it was fetched at."""
+        return {
+            key: (payload["data"], payload["time"])
+            for key, payload in self._payloads.items()
+        }
+
+    @callback
+    def async_set(self, key: str, data: Any) -> None:
+        """Remember a good payload and schedule saving it."""
+        self._payloads[key] = {"data": data, "time": time.time()}
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_track(self, key: str) -> CALLBACK_TYPE:
+        """Keep saving the payload of a key until the returned callback is called.
+
+        The payload of a key no longer tracked stays in memory, so a reloaded
+        entry still starts from it, but is left out of the next save.
+        """
+        self._tracked[key] += 1
+
+        @callback
+        def _untrack() -> None:
+            self._tracked[key] -= 1
+            if self._tracked[key] > 0:
+                return
+            del self._tracked[key]
+            if key in self._payloads:
+                self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+        return _untrack
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        """Return the payloads of the tracked keys."""
+        return {
+            key: payload
+            for key, payload in self._payloads.items()
+            if key in self._tracked
+        }
@@ -0,0 +1,297 @@
+"""Wallet balances read directly from a Solana JSON-RPC node."""
+from __future__ import annotations
+
+import asyncio
+from functools import lru_cache
+import hashlib
+from typing import Any
+
+from aiohttp import ClientError
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.singleton import singleton
+
+from ..const import (
+    DOMAIN,
+    SOLANA_ASSOCIATED_TOKEN_PROGRAM_ID,
+    SOLANA_TOKEN_PROGRAM_ID,
+    TOKEN_MINTS,
+)
+from .client import HttpClient
+from .inflight import TaskFactory, create_task
+from .limiter import async_get_rate_limiter
+from .metrics import async_get_metrics
+from .transport import async_get_transport
+
+DATA_SOLANA_RPC = f"{DOMAIN}_solana_rpc"
+
+# Wallets asked for within this many seconds share one batch request
+BATCH_DELAY = 0.05
+
+# Most RPC nodes accept at most this many accounts per getMultipleAccounts
+MAX_ACCOUNTS = 100
+
+LAMPORTS_PER_SOL = 1_000_000_000
+
+_BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_BASE58_INDEX = {char: index for index, char in enumerate(_BASE58_ALPHABET)}
+
+# Field and curve constants of ed25519
+_P = 2**255 - 19
+_D = -121665 * pow(121666, -1, _P) % _P
+
+
+class RPCError(ClientError):
+    """A JSON-RPC request failed."""
+
+
+def b58decode(value: str) -> bytes:
+    """Decode a base58 string."""
+    number = 0
+    for char in value:
+        try:
+            number = number * 58 + _BASE58_INDEX[char]
+        except KeyError:
+            raise ValueError(f"Invalid base58 character {char!r}") from None
+    pad = len(value) - len(value.lstrip("1"))
+    return b"\0" * pad + number.to_bytes((number.bit_length() + 7) // 8, "big")
+
+
+def b58encode(value: bytes) -> str:
+    """Encode bytes as a base58 string."""
+    number = int.from_bytes(value, "big")
+    chars = []
+    while number:
+        number, remainder = divmod(number, 58)
+        chars.append(_BASE58_ALPHABET[remainder])
+    pad = len(value) - len(value.lstrip(b"\0"))
+    return "1" * pad + "".join(reversed(chars))
+
+
+def public_key(address: str) -> bytes:
+    """Return the 32 bytes of a base58 address."""
+    if len(key := b58decode(address)) != 32:
+        raise ValueError(f"Invalid Solana address {address}")
+    return key
+
+
+def is_on_curve(key: bytes) -> bool:
+    """Return if 32 bytes are the compressed form of an ed25519 point.
+
+    The point exists when x² = (y² - 1) / (d·y² + 1) has a solution, which
+    is when that ratio is zero or a square of the field.
+    """
+    y = int.from_bytes(key, "little") & ((1 << 255) - 1)
+    u = (y * y - 1) % _P
+    v = (_D * y * y + 1) % _P
+    return u == 0 or pow(u * pow(v, -1, _P), (_P - 1) // 2, _P) == 1
+
+
+def find_program_address(seeds: list[bytes], program_id: bytes) -> tuple[bytes, int]:
+    """Return the program derived address of seeds and its bump seed."""
+    for bump in range(255, -1, -1):
+        address = hashlib.sha256(
+            b"".join(seeds) + bytes([bump]) + program_id + b"ProgramDerivedAddress"
+        ).digest()
+        if not is_on_curve(address):
+            return address, bump
+    raise ValueError("No program derived address for the seeds")
+
+
+@lru_cache(maxsize=1024)
+def associated_token_address(wallet: str, mint: str) -> str:
+    """Return the associated token account of a wallet for a mint."""
+    address, _ = find_program_address(
+        [public_key(wallet), public_key(SOLANA_TOKEN_PROGRAM_ID), public_key(mint)],
+        public_key(SOLANA_ASSOCIATED_TOKEN_PROGRAM_ID),
+    )
+    return b58encode(address)
+
+
+def token_accounts(wallet: str) -> dict[str, str]:
+    """Return the associated token accounts of a wallet by token."""
+    return {
+        token: associated_token_address(wallet, mint)
+        for token, mint in TOKEN_MINTS.items()
+    }
+
+
+def _token_amount(account: dict[str, Any] | None) -> float:
+    """Return the balance of a jsonParsed token account, 0 if there is none."""
+    if account is None:
+        return 0.0
+    amount = account["data"]["parsed"]["info"]["tokenAmount"]
+    return float(amount["uiAmountString"])
+
+
+def _rpc_request(request_id: int, method: str, *params: Any) -> dict[str, Any]:
+    """Return a JSON-RPC request."""
+    return {
+        "jsonrpc": "2.0", "id": request_id, "method": method, "params": list(params)
+    }
+
+
+class SolanaRPC:
+    """Wallet balances from a Solana JSON-RPC node.
+
+    Balances are read from the associated token accounts of the known mints
+    and the SOL balance of the wallet. Wallets asked for within BATCH_DELAY
+    of each other share a single JSON-RPC batch, holding getMultipleAccounts
+    for all their token accounts and getBalance for each wallet. The result
+    has the shape of the backend wallet payload.
+    """
+
+    def __init__(
+        self,
+        client: HttpClient,
+        url: str,
+        batch_delay: float = BATCH_DELAY,
+        create_task: TaskFactory = create_task,
+    ) -> None:
+        """Initialize."""
+        self._client = client
+        self.url = url
+        self.batch_delay = batch_delay
+        self._create_task = create_task
+        self._pending: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        self._batch: asyncio.Task[None] | None = None
+        self.batches = 0
+        self.wallets = 0
+        self.failures = 0
+
+    async def get_balances(self, wallet: str) -> dict[str, Any]:
+        """Get the balances of a wallet."""
+        # Checked here so an invalid address only fails its own caller
+        token_accounts(wallet)
+        if (future := self._pending.get(wallet)) is None:
+            future = self._pending[wallet] = asyncio.get_running_loop().create_future()
+            if self._batch is None:
+                self._batch = self._create_task(
+                    self._async_send_batch(), "Solana RPC batch"
+                )
+        # A cancelled caller leaves the result to the others in the batch
+        return await asyncio.shield(future)
+
+    async def _async_send_batch(self) -> None:
+        """Send the wallets asked for during the batch delay in one request."""
+        pending: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        try:
+            await asyncio.sleep(self.batch_delay)
+            pending, self._pending = self._pending, {}
+            self._batch = None
+            await self._async_fetch(pending)
+        finally:
+            if self._batch is asyncio.current_task():
+                pending, self._pending = self._pending, {}
+                self._batch = None
+            # Only left undone when the batch was cancelled
+            for future in pending.values():
+                if not future.done():
+                    future.cancel()
+
+    async def _async_fetch(
+        self, pending: dict[str, asyncio.Future[dict[str, Any]]]
+    ) -> None:
+        """Fetch the balances of wallets, setting the result of their futures."""
+        wallets = list(pending)
+        accounts = [
+            (wallet, token, address)
+            for wallet in wallets
+            for token, address in token_accounts(wallet).items()
+        ]
+        chunks = [
+            accounts[start : start + MAX_ACCOUNTS]
+            for start in range(0, len(accounts), MAX_ACCOUNTS)
+        ]
+        requests = [
+            _rpc_request(
+                index,
+                "getMultipleAccounts",
+                [address for _, _, address in chunk],
+                {"encoding": "jsonParsed"},
+            )
+            for index, chunk in enumerate(chunks)
+        ]
+        requests.extend(
+            _rpc_request(len(chunks) + index, "getBalance", wallet)
+            for index, wallet in enumerate(wallets)
+        )
+        self.batches += 1
+        self.wallets += len(wallets)
+
+        try:
+            response = await self._client.async_request(self.url, requests, "POST")
+            results = {item["id"]: item for item in response.json()}
+        except (ClientError, TimeoutError, ValueError) as err:
+            self.failures += len(wallets)
+            if not isinstance(err, ClientError):
+                err = RPCError(f"Invalid JSON-RPC response: {err}")
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        balances = {wallet: {"address": wallet, "balance": {}} for wallet in wallets}
+        errors: dict[str, Any] = {}
+        for index, chunk in enumerate(chunks):
+            item = results.get(index, {})
+            if (result := item.get("result")) is None:
+                errors.update((wallet, item.get("error")) for wallet, _, _ in chunk)
+                continue
+            for (wallet, token, _), account in zip(chunk, result["value"]):
+                balances[wallet]["balance"][token] = _token_amount(account)
+        for index, wallet in enumerate(wallets):
+            item = results.get(len(chunks) + index, {})
+            if (result := item.get("result")) is None:
+                errors[wallet] = item.get("error")
+                continue
+            balances[wallet]["balance"]["solana"] = result["value"] / LAMPORTS_PER_SOL
+
+        # A failing request only fails the wallets it was for
+        for wallet, future in pending.items():
+            if future.done():
+                continue
+            if wallet in errors:
+                self.failures += 1
+                future.set_exception(
+                    RPCError(f"Balances of {wallet} failed: {errors[wallet]}")
+                )
+            else:
+                future.set_result(balances[wallet])
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters of the RPC client."""
+        return {
+            "batches": self.batches,
+            "wallets": self.wallets,
+            "wallets_per_batch": (
+                round(self.wallets / self.batches, 2) if self.batches else 0.0
+            ),
+            "failures": self.failures,
+        }
+
+
+@singleton(DATA_SOLANA_RPC)
+async def _async_get_solana_rpcs(hass: HomeAssistant) -> dict[str, SolanaRPC]:
+    """Get the Solana RPC clients by URL."""
+    rpcs: dict[str, SolanaRPC] = {}
+    # Numbered rather than keyed by URL, which usually holds an API key
+    async_get_metrics(hass).async_add_source(
+        "solana_rpc",
+        lambda: {
+            f"rpc_{index}": rpc.as_dict()
+            for index, rpc in enumerate(rpcs.values(), start=1)
+        },
+    )
+    return rpcs
+
+
+async def async_get_solana_rpc(hass: HomeAssistant, url: str) -> SolanaRPC:
+    """Get the Solana RPC client of a URL, shared by all config entries."""
+    rpcs = await _async_get_solana_rpcs(hass)
+    if (rpc := rpcs.get(url)) is None:
+        client = HttpClient(async_get_transport(hass), async_get_rate_limiter(hass))
+        rpc = rpcs[url] = SolanaRPC(
+            client, url, create_task=hass.async_create_background_task
+        )
+    return rpc
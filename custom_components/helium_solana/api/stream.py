@@ -0,0 +1,183 @@
+"""Streaming JSON decoding of large reward payloads."""
+from __future__ import annotations
+
+from codecs import getincrementaldecoder
+from collections.abc import Collection, Mapping
+import json
+import time
+from typing import Any
+
+_WHITESPACE = " \t\n\r"
+
+_TOP_START = 0
+_TOP_KEY = 1
+_TOP_VALUE = 2
+_RECORD_KEY = 3
+_RECORD_VALUE = 4
+_DONE = 5
+
+
+def _select_fields(record: Any, fields: Collection[str] | None) -> Any:
+    """Return a record with only the listed fields, all of them for None."""
+    if fields is None or not isinstance(record, dict):
+        return record
+    return {field: record[field] for field in fields if field in record}
+
+
+class _Incomplete(Exception):
+    """More data is needed to decode the next token."""
+
+
+class RecordStreamDecoder:
+    """Incremental decoder for a JSON object of record sections.
+
+    Payloads like hotspot-rewards2 and staking-rewards are an object whose
+    sections map keys to records. Records are decoded one by one as the body
+    arrives, and only the listed fields of a record are kept, so neither the
+    whole body nor the unused fields are held in memory. Other top level
+    values are decoded whole.
+    """
+
+    def __init__(self, sections: Mapping[str, Collection[str] | None]) -> None:
+        """Initialize with the fields to keep per section, None to keep all."""
+        self._sections = sections
+        self._text = getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _TOP_START
+        self._key: str | None = None
+        self._record_key: str | None = None
+        self._section: dict[str, Any] | None = None
+        self._fields: Collection[str] | None = None
+        self.bytes_read = 0
+        # Seconds spent decoding, excluding the wait for the body
+        self.decode_time = 0.0
+        self.result: dict[str, Any] = {}
+
+    def feed(self, chunk: bytes) -> None:
+        """Decode the records completed by a chunk of the body."""
+        start = time.perf_counter()
+        self.bytes_read += len(chunk)
+        self._buffer = self._buffer[self._pos :] + self._text.decode(chunk)
+        self._pos = 0
+        self._parse(final=False)
+        self.decode_time += time.perf_counter() - start
+
+    def finish(self) -> dict[str, Any]:
+        """Decode what is left of the body and return the payload."""
+        start = time.perf_counter()
+        self._buffer = self._buffer[self._pos :] + self._text.decode(b"", final=True)
+        self._pos = 0
+        self._parse(final=True)
+        self.decode_time += time.perf_counter() - start
+        if self._state != _DONE or self._buffer[self._pos :].strip(_WHITESPACE):
+            raise ValueError("Incomplete or invalid JSON payload")
+        return self.result
+
+    def decode(self, payload: Mapping[str, Any]) -> dict[str, Any]:
+        """Keep what streaming would of a payload that was decoded whole."""
+        start = time.perf_counter()
+        for key, value in payload.items():
+            if key in self._sections and isinstance(value, dict):
+                fields = self._sections[key]
+                value = {
+                    record_key: _select_fields(record, fields)
+                    for record_key, record in value.items()
+                }
+            self.result[key] = value
+        self._state = _DONE
+        self.decode_time += time.perf_counter() - start
+        return self.result
+
+    def _parse(self, final: bool) -> None:
+        try:
+            while self._state != _DONE:
+                self._step(final)
+        except _Incomplete:
+            pass
+
+    def _step(self, final: bool) -> None:
+        if self._state == _TOP_START:
+            self._expect("{")
+            self._state = _TOP_KEY
+        elif self._state == _TOP_KEY:
+            if self._peek_end("}", ","):
+                self._state = _DONE
+                return
+            self._key = self._read_key()
+            self._state = _TOP_VALUE
+        elif self._state == _TOP_VALUE:
+            if self._key in self._sections and self._peek() == "{":
+                self._pos += 1
+                self._section = self.result[self._key] = {}
+                self._fields = self._sections[self._key]
+                self._state = _RECORD_KEY
+            else:
+                self.result[self._key] = self._read_value(final)
+                self._state = _TOP_KEY
+        elif self._state == _RECORD_KEY:
+            if self._peek_end("}", ","):
+                self._state = _TOP_KEY
+                return
+            self._record_key = self._read_key()
+            self._state = _RECORD_VALUE
+        else:
+            record = _select_fields(self._read_value(final), self._fields)
+            self._section[self._record_key] = record
+            self._state = _RECORD_KEY
+
+    def _skip(self, *separators: str) -> None:
+        """Skip whitespace and the given separators."""
+        buffer = self._buffer
+        while self._pos < len(buffer) and (
+            buffer[self._pos] in _WHITESPACE or buffer[self._pos] in separators
+        ):
+            self._pos += 1
+        if self._pos >= len(buffer):
+            raise _Incomplete
+
+    def _peek(self) -> str:
+        self._skip()
+        return self._buffer[self._pos]
+
+    def _peek_end(self, end: str, separator: str) -> bool:
+        """Consume the end of an object, or the separator before the next key."""
+        self._skip(separator)
+        if self._buffer[self._pos] == end:
+            self._pos += 1
+            return True
+        return False
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} at position {self._pos}")
+        self._pos += 1
+
+    def _read_key(self) -> str:
+        """Read an object key and the colon after it."""
+        start = self._pos
+        key = self._read_value(final=False)
+        try:
+            self._expect(":")
+        except _Incomplete:
+            self._pos = start
+            raise
+        if not isinstance(key, str):
+            raise ValueError(f"Expected an object key at position {start}")
+        return key
+
+    def _read_value(self, final: bool) -> Any:
+        """Read a complete JSON value."""
+        self._skip()
+        try:
+            value, end = self._json.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError as err:
+            if final:
+                raise ValueError(str(err)) from err
+            raise _Incomplete from err
+        # A number at the end of the buffer may continue in the next chunk
+        if end >= len(self._buffer) and not final:
+            raise _Incomplete
+        self._pos = end
+        return value
@@ -0,0 +1,429 @@
+"""Transports sending the HTTP requests of the APIs.
+
+The HTTP client sends its requests through a transport. The session transport
+goes to the network, the recording transport saves what another transport
+returns to a fixture archive, and the replay transport serves an archive back
+without a network, at the recorded latency, scaled, or without any.
+"""
+from __future__ import annotations
+
+import asyncio
+import base64
+from collections import Counter, defaultdict
+from collections.abc import AsyncIterator, Iterable, Mapping
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from dataclasses import dataclass
+import gzip
+from http import HTTPStatus
+import json
+from pathlib import Path
+import time
+from typing import Any, Protocol
+
+from aiohttp import (
+    ClientConnectionError,
+    ClientResponseError,
+    ClientSession,
+    ClientTimeout,
+    RequestInfo,
+    hdrs,
+)
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.singleton import singleton
+
+from ..const import DOMAIN
+
+DATA_TRANSPORT = f"{DOMAIN}_transport"
+
+ARCHIVE_VERSION = 1
+
+# Recorded bodies are stored decoded, so their encoding headers no longer apply
+_BODY_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class BodyReader(Protocol):
+    """Body of a response, read in chunks."""
+
+    def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        """Iterate over the body in chunks of at most n bytes."""
+
+
+class TransportResponse(Protocol):
+    """Response of a transport, the part of an aiohttp response the client uses."""
+
+    status: int
+    reason: str | None
+    headers: Mapping[str, str]
+    content_length: int | None
+    content: BodyReader
+
+    async def read(self) -> bytes:
+        """Read the whole body."""
+
+    def raise_for_status(self) -> None:
+        """Raise ClientResponseError for an error status."""
+
+
+class Transport(Protocol):
+    """Sends a request and returns its response."""
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        payload: Any | None,
+        headers: Mapping[str, str],
+        timeout: ClientTimeout,
+    ) -> AbstractAsyncContextManager[TransportResponse]:
+        """Send a request, the response is open within the context."""
+
+
+class SessionTransport:
+    """Transport sending requests through an aiohttp session."""
+
+    def __init__(self, session: ClientSession) -> None:
+        """Initialize."""
+        self._session = session
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        payload: Any | None,
+        headers: Mapping[str, str],
+        timeout: ClientTimeout,
+    ) -> AbstractAsyncContextManager[TransportResponse]:
+        """Send a request, the response is open within the context."""
+        return self._session.request(
+            method, url, json=payload, headers=headers, timeout=timeout
+        )
+
+
+@dataclass
+class Exchange:
+    """A recorded request and its response.
+
+    Latency is the time until the response headers arrived, duration the
+    time the body took after that.
+    """
+
+    method: str
+    url: str
+    payload: Any | None
+    status: int
+    reason: str | None
+    headers: dict[str, str]
+    body: bytes
+    wire_size: int | None
+    latency: float
+    duration: float
+
+    @property
+    def key(self) -> tuple[str, str, str | None]:
+        """Return the key a replayed request is matched on."""
+        return request_key(self.method, self.url, self.payload)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the exchange as JSON-serializable data."""
+        try:
+            body = {"body": self.body.decode()}
+        except UnicodeDecodeError:
+            body = {"body_base64": base64.b64encode(self.body).decode()}
+        return {
+            "method": self.method,
+            "url": self.url,
+            "payload": self.payload,
+            "status": self.status,
+            "reason": self.reason,
+            "headers": self.headers,
+            **body,
+            "wire_size": self.wire_size,
+            "latency": self.latency,
+            "duration": self.duration,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Exchange:
+        """Return an exchange from its JSON-serializable data."""
+        if "body_base64" in data:
+            body = base64.b64decode(data["body_base64"])
+        else:
+            body = data["body"].encode()
+        return cls(
+            data["method"],
+            data["url"],
+            data["payload"],
+            data["status"],
+            data["reason"],
+            data["headers"],
+            body,
+            data["wire_size"],
+            data["latency"],
+            data["duration"],
+        )
+
+
+def request_key(
+    method: str, url: str, payload: Any | None
+) -> tuple[str, str, str | None]:
+    """Return the key a request is matched on, its payload included."""
+    return (
+        method.upper(),
+        url,
+        None if payload is None else json.dumps(payload, sort_keys=True),
+    )
+
+
+def save_archive(path: Path, exchanges: Iterable[Exchange]) -> None:
+    """Write exchanges to an archive, gzipped when the name ends in .gz.
+
+    Blocking, so run it in the executor.
+    """
+    text = json.dumps(
+        {
+            "version": ARCHIVE_VERSION,
+            "exchanges": [exchange.as_dict() for exchange in exchanges],
+        }
+    )
+    if path.suffix == ".gz":
+        path.write_bytes(gzip.compress(text.encode()))
+    else:
+        path.write_text(text)
+
+
+def load_archive(path: Path) -> list[Exchange]:
+    """Read the exchanges of an archive.
+
+    Blocking, so run it in the executor.
+    """
+    data = path.read_bytes()
+    if path.suffix == ".gz":
+        data = gzip.decompress(data)
+    archive = json.loads(data)
+    if archive.get("version") != ARCHIVE_VERSION:
+        raise ValueError(f"Unsupported archive version {archive.get('version')}")
+    return [Exchange.from_dict(exchange) for exchange in archive["exchanges"]]
+
+
+class _RecordingBody:
+    """Body of a response, kept as it is read."""
+
+    def __init__(self, content: BodyReader, chunks: list[bytes]) -> None:
+        self._content = content
+        self._chunks = chunks
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        async for chunk in self._content.iter_chunked(n):
+            self._chunks.append(chunk)
+            yield chunk
+
+
+class _RecordingResponse:
+    """Response whose body is kept as it is read."""
+
+    def __init__(self, response: TransportResponse) -> None:
+        self._response = response
+        self.chunks: list[bytes] = []
+        self.content = _RecordingBody(response.content, self.chunks)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._response, name)
+
+    async def read(self) -> bytes:
+        body = await self._response.read()
+        self.chunks.append(body)
+        return body
+
+
+class RecordingTransport:
+    """Transport recording the exchanges of another transport."""
+
+    def __init__(self, transport: Transport) -> None:
+        """Initialize."""
+        self._transport = transport
+        self.exchanges: list[Exchange] = []
+
+    @asynccontextmanager
+    async def request(
+        self,
+        method: str,
+        url: str,
+        payload: Any | None,
+        headers: Mapping[str, str],
+        timeout: ClientTimeout,
+    ) -> AsyncIterator[TransportResponse]:
+        """Send a request through the transport and record the exchange."""
+        start = time.perf_counter()
+        async with self._transport.request(
+            method, url, payload, headers, timeout
+        ) as response:
+            headers_time = time.perf_counter()
+            recording = _RecordingResponse(response)
+            complete = False
+            try:
+                yield recording
+                complete = True
+            finally:
+                # Error responses are kept even though their body was not read
+                if complete or response.status >= 400:
+                    self.exchanges.append(
+                        Exchange(
+                            method.upper(),
+                            url,
+                            payload,
+                            response.status,
+                            response.reason,
+                            {
+                                key: value
+                                for key, value in response.headers.items()
+                                if key.lower() not in _BODY_HEADERS
+                            },
+                            b"".join(recording.chunks),
+                            response.content_length,
+                            headers_time - start,
+                            time.perf_counter() - headers_time,
+                        )
+                    )
+
+    def save(self, path: Path) -> None:
+        """Write the recorded exchanges to an archive.
+
+        Blocking, so run it in the executor.
+        """
+        save_archive(path, self.exchanges)
+
+
+class _ReplayBody:
+    """Recorded body, served in chunks spread over its recorded duration."""
+
+    def __init__(self, body: bytes, duration: float) -> None:
+        self._body = body
+        self._duration = duration
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        chunks = range(0, len(self._body), n)
+        for start in chunks:
+            if self._duration:
+                await asyncio.sleep(self._duration / len(chunks))
+            yield self._body[start : start + n]
+
+
+class _ReplayResponse:
+    """Recorded response."""
+
+    def __init__(
+        self,
+        request_info: RequestInfo,
+        exchange: Exchange,
+        status: int,
+        body: bytes,
+        duration: float,
+    ) -> None:
+        self._request_info = request_info
+        self._body = body
+        self._duration = duration
+        self.status = status
+        self.reason = HTTPStatus(status).phrase
+        self.headers = CIMultiDictProxy(CIMultiDict(exchange.headers))
+        self.content_length = exchange.wire_size if body else None
+        self.content = _ReplayBody(body, duration)
+
+    async def read(self) -> bytes:
+        if self._duration:
+            await asyncio.sleep(self._duration)
+        return self._body
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise ClientResponseError(
+                self._request_info,
+                (),
+                status=self.status,
+                message=self.reason,
+                headers=self.headers,
+            )
+
+
+class ReplayTransport:
+    """Transport serving recorded exchanges without a network.
+
+    Requests are matched on method, URL and payload. Repeated requests get the
+    recorded responses in order, and the last one once they run out. A
+    conditional request matching the validators of its response gets a 304.
+    Latencies are the recorded ones times latency_scale, so 0 replays as fast
+    as possible. Unmatched requests fail like an unreachable host.
+    """
+
+    def __init__(
+        self, exchanges: Iterable[Exchange], latency_scale: float = 1.0
+    ) -> None:
+        """Initialize."""
+        self.latency_scale = latency_scale
+        self._exchanges: defaultdict[tuple, list[Exchange]] = defaultdict(list)
+        for exchange in exchanges:
+            # Not modified answers are derived from the validators instead
+            if exchange.status != HTTPStatus.NOT_MODIFIED:
+                self._exchanges[exchange.key].append(exchange)
+        self.requests: Counter[tuple] = Counter()
+        self.not_modified = 0
+        self.unmatched = 0
+
+    @classmethod
+    def from_archive(cls, path: Path, latency_scale: float = 1.0) -> ReplayTransport:
+        """Return a transport replaying an archive.
+
+        Blocking, so run it in the executor.
+        """
+        return cls(load_archive(path), latency_scale)
+
+    @asynccontextmanager
+    async def request(
+        self,
+        method: str,
+        url: str,
+        payload: Any | None,
+        headers: Mapping[str, str],
+        timeout: ClientTimeout,
+    ) -> AsyncIterator[TransportResponse]:
+        """Serve the recorded response to a request."""
+        key = request_key(method, url, payload)
+        if not (exchanges := self._exchanges.get(key)):
+            self.unmatched += 1
+            raise ClientConnectionError(f"No recorded response to {method} {url}")
+        exchange = exchanges[min(self.requests[key], len(exchanges) - 1)]
+        self.requests[key] += 1
+
+        status, body = exchange.status, exchange.body
+        duration = exchange.duration * self.latency_scale
+        if _is_not_modified(exchange, CIMultiDict(headers)):
+            self.not_modified += 1
+            status, body, duration = HTTPStatus.NOT_MODIFIED, b"", 0
+        if latency := exchange.latency * self.latency_scale:
+            await asyncio.sleep(latency)
+        request_info = RequestInfo(
+            URL(url), method, CIMultiDictProxy(CIMultiDict(headers)), URL(url)
+        )
+        yield _ReplayResponse(request_info, exchange, status, body, duration)
+
+
+def _is_not_modified(exchange: Exchange, headers: CIMultiDict[str]) -> bool:
+    """Return if a conditional request matches the validators of a response."""
+    if exchange.status != HTTPStatus.OK:
+        return False
+    recorded = CIMultiDict(exchange.headers)
+    if (etag := headers.get(hdrs.IF_NONE_MATCH)) is not None:
+        return etag == recorded.get(hdrs.ETAG)
+    if (since := headers.get(hdrs.IF_MODIFIED_SINCE)) is not None:
+        return since == recorded.get(hdrs.LAST_MODIFIED)
+    return False
+
+
+@singleton(DATA_TRANSPORT)
+@callback
+def async_get_transport(hass: HomeAssistant) -> Transport:
+    """Get the transport shared by the APIs, the network unless set beforehand."""
+    return SessionTransport(async_get_clientsession(hass))
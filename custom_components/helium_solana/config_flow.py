@@ -1,25 +1,54 @@
 """Config flow for Helium Solana integration."""
 from __future__ import annotations
 
+import re
 from typing import Any
 
-from homeassistant.config_entries import ConfigFlow
-from homeassistant.data_entry_flow import FlowResult
 import voluptuous as vol
 
+from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.data_entry_flow import FlowResult
+
 from .const import (
     CONF_INTEGRATION,
     CONF_INTEGRATION_OPTIONS,
+    CONF_MAX_CONCURRENCY,
+    CONF_RPC_URL,
     CONF_VERSION,
     CONF_WALLET,
+    CONF_WALLETS,
     DOMAIN,
     INTEGRATION_WALLET,
 )
+from .coordinator import FLEET_CONCURRENCY
+from .utility import get_wallets
 
 USER_SCHEMA = vol.Schema(
     {vol.Required(CONF_INTEGRATION): vol.In(CONF_INTEGRATION_OPTIONS)}
 )
-WALLET_SCHEMA = vol.Schema({vol.Required(CONF_WALLET): str})
+WALLET_SCHEMA = vol.Schema(
+    {vol.Required(CONF_WALLET): str, vol.Optional(CONF_RPC_URL): str}
+)
+
+
+def parse_wallets(value: str) -> list[str]:
+    """Parse wallet addresses separated by commas or whitespace."""
+    return list(dict.fromkeys(filter(None, re.split(r"[\s,;]+", value))))
+
+
+@callback
+def configured_wallets(
+    hass: HomeAssistant, exclude_entry_id: str | None = None
+) -> set[str]:
+    """Return the wallets in the data and options of every other wallet entry."""
+    return {
+        wallet
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.entry_id != exclude_entry_id
+        and entry.data.get(CONF_INTEGRATION) == INTEGRATION_WALLET
+        for wallet in (*get_wallets(entry.data), *entry.options.get(CONF_WALLETS, ()))
+    }
 
 
 class HeliumSolanaConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -30,6 +59,18 @@ class HeliumSolanaConfigFlow(ConfigFlow, domain=DOMAIN):
     data: dict[str, int | str] | None = None
     title: str | None = None
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Get the options flow of an entry."""
+        return HeliumSolanaOptionsFlow()
+
+    @classmethod
+    @callback
+    def async_supports_options_flow(cls, config_entry: ConfigEntry) -> bool:
+        """Return if an entry has options, only wallet entries do."""
+        return config_entry.data.get(CONF_INTEGRATION) == INTEGRATION_WALLET
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -55,8 +96,58 @@ class HeliumSolanaConfigFlow(ConfigFlow, domain=DOMAIN):
     async def async_step_wallet(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Handle the wallet flow."""
-        self.data[CONF_WALLET] = user_input[CONF_WALLET]
-        self._async_abort_entries_match(self.data)
+        """Handle the wallet flow, taking one wallet or a list of them."""
+        if not (wallets := parse_wallets(user_input[CONF_WALLET])):
+            return self.async_show_form(
+                step_id="wallet",
+                data_schema=WALLET_SCHEMA,
+                errors={CONF_WALLET: "no_wallet"},
+            )
+        if not configured_wallets(self.hass).isdisjoint(wallets):
+            return self.async_abort(reason="already_configured")
+        self.data[CONF_WALLET] = wallets[0]
         self.title = f"{self.title} {self.data[CONF_WALLET][0:4]}"
+        if len(wallets) > 1:
+            self.data[CONF_WALLETS] = wallets
+            self.title = f"{self.title} +{len(wallets) - 1}"
+        if rpc_url := user_input.get(CONF_RPC_URL):
+            self.data[CONF_RPC_URL] = rpc_url
         return self.async_create_entry(title=self.title, data=self.data)
+
+
+class HeliumSolanaOptionsFlow(OptionsFlow):
+    """Options of a wallet entry: its wallets, and how many are fetched at once."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        config = {**self.config_entry.data, **self.config_entry.options}
+        errors = {}
+        if user_input is not None:
+            if not (wallets := parse_wallets(user_input[CONF_WALLETS])):
+                errors[CONF_WALLETS] = "no_wallet"
+            elif not configured_wallets(
+                self.hass, self.config_entry.entry_id
+            ).isdisjoint(wallets):
+                errors[CONF_WALLETS] = "wallet_configured"
+            else:
+                return self.async_create_entry(
+                    data={
+                        CONF_WALLETS: wallets,
+                        CONF_MAX_CONCURRENCY: user_input[CONF_MAX_CONCURRENCY],
+                    }
+                )
+
+        schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_WALLETS, default=", ".join(get_wallets(config))
+                ): str,
+                vol.Required(
+                    CONF_MAX_CONCURRENCY,
+                    default=config.get(CONF_MAX_CONCURRENCY, FLEET_CONCURRENCY),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
@@ -7,6 +7,9 @@ INTEGRATION_WALLET = "wallet"
 
 CONF_VERSION = "version"
 CONF_WALLET = "wallet"
+CONF_WALLETS = "wallets"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+CONF_RPC_URL = "rpc_url"
 CONF_INTEGRATION = "integration"
 CONF_INTEGRATION_OPTIONS = {
     INTEGRATION_GENERAL_STATS: "General Helium Stats",
@@ -19,9 +22,19 @@ COINGECKO_PRICE_URL = "https://api.coingecko.com/api/v3/simple/price"
 BACKEND_URL = "http://solana.oerdek.com"
 BACKEND_KEY = "JEcbtHfDsWYmIlnOBrtn"
 
+SOLANA_TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+SOLANA_ASSOCIATED_TOKEN_PROGRAM_ID = "ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL"
+
 CURRENCY_USD = "USD"
 
 TOKEN_HELIUM = "HNT"
 TOKEN_IOT = "IOT"
 TOKEN_MOBILE = "MOBILE"
 TOKEN_SOL = "SOL"
+
+# Token mints, keyed by the balance names of the wallet payload
+TOKEN_MINTS = {
+    "hnt": "hntyVP6YFm1Hg25TN9WGLqM12b8TQmcknKrdu1oxWux",
+    "iot": "iotEVVZLEywoTn1QdwNPddxPWszn3zFhEot3MfL9fns",
+    "mobile": "mb1eu7TzEc71KxDpsmsKoucSSuuoGLv1drys1oP2jh6",
+}
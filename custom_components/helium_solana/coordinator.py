@@ -2,27 +2,200 @@
 
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
 import asyncio
+from collections.abc import Callable
 from datetime import timedelta
+from functools import partial
 import logging
+import math
+import time
+from typing import Any, TypeVar
 
-from requests.exceptions import RequestException
+from aiohttp import ClientError
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+import homeassistant.util.dt as dt_util
 
-from .api.backend import BackendAPI
-from .const import COINGECKO_PRICE_URL, CURRENCY_USD
-from .utility import http_client
+from .api.backend import BackendAPI, NotFound
+from .api.metrics import UpdateStats, async_get_metrics
+from .api.price import PriceAPI
+from .api.solana import SolanaRPC
+from .api.stream import RecordStreamDecoder
+from .const import CURRENCY_USD
+from .rewards import REWARD_FIELDS, SECTION_HOTSPOTS, HotspotRewards
+from .schedule import AdaptiveSchedule, EpochSchedule, UpdateSchedule
 
 _LOGGER = logging.getLogger(__name__)
 
 UPDATE_INTERVAL = timedelta(minutes=10)
+MAX_STALE_AGE = timedelta(hours=6)
+
+# Total time an update may take, across all the requests it makes
+UPDATE_DEADLINE = timedelta(seconds=60)
+REWARDS_UPDATE_DEADLINE = timedelta(seconds=150)
+
+# Wallets of a fleet fetched at the same time
+FLEET_CONCURRENCY = 4
 
 TOKEN_IDS = ("helium", "helium-iot", "helium-mobile", "wrapped-solana")
 
+# Large reward payloads are streamed, keeping only the fields the sensors use
+HOTSPOT_REWARDS_DECODER = partial(
+    RecordStreamDecoder, {SECTION_HOTSPOTS: ("name", "token", *REWARD_FIELDS)}
+)
+STAKING_REWARDS_DECODER = partial(RecordStreamDecoder, {"rewards": None})
+
+BackendDecoder = Callable[[], RecordStreamDecoder]
+
+_DataT = TypeVar("_DataT")
+
+
+class HeliumDataUpdateCoordinator(DataUpdateCoordinator[_DataT], ABC):
+    """Helium data update coordinator with a warm start from the last good data.
+
+    The update interval is set by the schedule after every fetch, so
+    update_interval is always the effective interval of the coordinator.
+    Coordinators of a config entry add themselves to the metrics registry,
+    and keep their last good data saved until the entry is unloaded.
+    """
+
+    # Sets the update interval after each fetch when given
+    schedule: UpdateSchedule | None = None
+
+    # Requests still running when the deadline passes are cancelled
+    update_deadline: timedelta = UPDATE_DEADLINE
+
+    # Updates the coordinator instead of its own timer when set
+    fleet: HeliumFleetDataUpdateCoordinator | None = None
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize."""
+        super().__init__(*args, **kwargs)
+        self.stats = UpdateStats()
+        if self.config_entry is not None:
+            self.config_entry.async_on_unload(
+                async_get_metrics(self.hass).async_add_coordinator(
+                    self.config_entry.entry_id, self
+                )
+            )
+            self.config_entry.async_on_unload(self._async_track_snapshot())
+
+    def metrics(self) -> dict[str, Any]:
+        """Return the update counters and the schedule of the coordinator."""
+        return {
+            **self.stats.as_dict(),
+            "update_interval": (
+                self.update_interval.total_seconds() if self.update_interval else None
+            ),
+            "schedule": self.schedule.as_dict() if self.schedule else None,
+        }
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates, keeping the timer of the fleet running."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        if self.fleet is None:
+            return remove_listener
+        # The fleet only schedules updates while it has listeners of its own
+        remove_fleet_listener = self.fleet.async_add_listener(lambda: None)
+
+        @callback
+        def _remove() -> None:
+            remove_listener()
+            remove_fleet_listener()
+
+        return _remove
 
-class HeliumStatsDataUpdateCoordinator(DataUpdateCoordinator[dict]):
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners, counting the entity state writes."""
+        self.stats.start_cycle()
+        try:
+            super().async_update_listeners()
+        finally:
+            self.stats.end_cycle()
+
+    def _schedule_key(self) -> str:
+        """Return the key the jitter of the schedule is derived from."""
+        entry_id = self.config_entry.entry_id if self.config_entry else ""
+        return f"{entry_id}:{self.name}"
+
+    @abstractmethod
+    async def _async_fetch_data(self) -> _DataT:
+        """Fetch data from the API."""
+
+    async def _async_update_data(self) -> _DataT:
+        """Fetch data within the deadline and adjust the update interval to it."""
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.update_deadline.total_seconds()):
+                data = await self._async_fetch_data()
+        except Exception as err:
+            self.stats.record_update(time.perf_counter() - start, success=False)
+            if self.schedule is not None:
+                self.update_interval = self.schedule.failed_interval(dt_util.utcnow())
+                _LOGGER.debug(
+                    "Retrying %s update in %s", self.name, self.update_interval
+                )
+            if isinstance(err, TimeoutError):
+                raise UpdateFailed(
+                    f"{self.name} update timed out after {self.update_deadline}"
+                ) from err
+            raise
+        self.stats.record_update(time.perf_counter() - start, success=True)
+        self._async_schedule_next(data)
+        return data
+
+    @callback
+    def _async_schedule_next(self, data: _DataT) -> None:
+        """Adjust the update interval to the fetched data."""
+        if self.schedule is None:
+            return
+        changed = self.data is not None and data != self.data
+        self.update_interval = self.schedule.next_interval(changed, dt_util.utcnow())
+        _LOGGER.debug("Next %s update in %s", self.name, self.update_interval)
+
+    def _get_snapshot(self, max_age: timedelta) -> _DataT | None:
+        """Get the last good data saved before a restart, if recent enough."""
+        return None
+
+    @callback
+    def _async_track_snapshot(self) -> CALLBACK_TYPE:
+        """Keep saving the last good data, until the returned callback is called."""
+        return lambda: None
+
+    def backend_request(self) -> tuple[str, BackendDecoder | None] | None:
+        """Return the backend path an update gets and its decoder, if any."""
+        return None
+
+    async def async_config_entry_warm_start(
+        self, max_stale_age: timedelta = MAX_STALE_AGE, required: bool = True
+    ) -> None:
+        """Refresh data for the first time, starting from the last good data.
+
+        With a snapshot no older than max_stale_age, entities are created from it
+        right away and the refresh runs in the background. Otherwise this waits
+        for the refresh, which must succeed if required.
+        """
+        if (data := self._get_snapshot(max_stale_age)) is None:
+            if required:
+                await self.async_config_entry_first_refresh()
+            else:
+                await self.async_refresh()
+            return
+
+        _LOGGER.debug("Starting %s from saved data", self.name)
+        self.async_set_updated_data(data)
+        self.config_entry.async_create_background_task(
+            self.hass, self.async_refresh(), f"{self.name} warm start refresh"
+        )
+
+
+class HeliumStatsDataUpdateCoordinator(HeliumDataUpdateCoordinator[dict]):
     """Helium stats data update coordinator."""
 
     def __init__(self, hass: HomeAssistant, api: BackendAPI) -> None:
@@ -31,72 +204,123 @@ class HeliumStatsDataUpdateCoordinator(DataUpdateCoordinator[dict]):
         super().__init__(
             hass, _LOGGER, name="Helium stats", update_interval=UPDATE_INTERVAL
         )
+        self.schedule = AdaptiveSchedule(UPDATE_INTERVAL, self._schedule_key())
+
+    def _get_snapshot(self, max_age: timedelta) -> dict | None:
+        """Get the last good data saved before a restart, if recent enough."""
+        return self.api.get_snapshot("heliumstats", max_age.total_seconds())
 
-    async def _async_update_data(self) -> dict | None:
+    @callback
+    def _async_track_snapshot(self) -> CALLBACK_TYPE:
+        """Keep saving the last good data, until the returned callback is called."""
+        return self.api.async_track_snapshot("heliumstats")
+
+    async def _async_fetch_data(self) -> dict | None:
         """Fetch data from API endpoint."""
         _LOGGER.debug("Requesting Helium stats data")
         try:
-            response = await self.api.get_data("heliumstats")
-            if response.status_code == 200:
-                return response.json()
-        except RequestException as ex:
+            return await self.api.get_data("heliumstats")
+        except ClientError as ex:
             _LOGGER.exception("Error retrieving helium stats")
             raise UpdateFailed(ex) from ex
 
 
 class HeliumPriceDataUpdateCoordinator(
-    DataUpdateCoordinator[dict[str, dict[str, float]]]
+    HeliumDataUpdateCoordinator[dict[str, dict[str, float]]]
 ):
     """Helium price data update coordinator."""
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    def __init__(self, hass: HomeAssistant, api: PriceAPI) -> None:
         """Initialize."""
+        self.api = api
         super().__init__(
             hass, _LOGGER, name="Helium price", update_interval=UPDATE_INTERVAL
         )
+        self.schedule = AdaptiveSchedule(UPDATE_INTERVAL, self._schedule_key())
+
+    @property
+    def currencies(self) -> set[str]:
+        """Return the currencies to get prices in."""
+        return {self.hass.config.currency, CURRENCY_USD}
+
+    def _get_snapshot(self, max_age: timedelta) -> dict | None:
+        """Get the last good data saved before a restart, if recent enough."""
+        return self.api.get_snapshot(
+            TOKEN_IDS, self.currencies, max_age.total_seconds()
+        )
 
-    async def _async_update_data(self) -> dict | None:
+    @callback
+    def _async_track_snapshot(self) -> CALLBACK_TYPE:
+        """Keep saving the last good data, until the returned callback is called."""
+        return self.api.async_track_snapshot(TOKEN_IDS, self.currencies)
+
+    async def _async_fetch_data(self) -> dict | None:
         """Fetch data from API endpoint."""
         _LOGGER.debug("Requesting token prices from CoinGecko")
-        currencies = set((self.hass.config.currency, CURRENCY_USD))
         try:
-            response = await asyncio.to_thread(
-                http_client,
-                f"{COINGECKO_PRICE_URL}?ids={','.join(TOKEN_IDS)}&vs_currencies={','.join(currencies)}",
-            )
-            if response.status_code == 200:
-                return response.json()
-        except RequestException as ex:
+            return await self.api.get_prices(TOKEN_IDS, self.currencies)
+        except ClientError as ex:
             _LOGGER.exception("Error retrieving token prices from CoinGecko")
             raise UpdateFailed(ex) from ex
 
 
-class HeliumWalletDataUpdateCoordinator(DataUpdateCoordinator[dict]):
-    """Helium wallet data update coordinator."""
+class HeliumWalletDataUpdateCoordinator(HeliumDataUpdateCoordinator[dict]):
+    """Helium wallet data update coordinator.
 
-    def __init__(self, hass: HomeAssistant, api: BackendAPI, address: str) -> None:
+    With a Solana RPC client, balances are read from the chain instead of the
+    backend.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: BackendAPI,
+        address: str,
+        rpc: SolanaRPC | None = None,
+    ) -> None:
         """Initialize."""
         self.api = api
+        self.rpc = rpc
         self.address = address
         super().__init__(
             hass, _LOGGER, name="Helium wallet", update_interval=UPDATE_INTERVAL
         )
+        self.schedule = AdaptiveSchedule(UPDATE_INTERVAL, self._schedule_key())
+
+    def _get_snapshot(self, max_age: timedelta) -> dict | None:
+        """Get the last good data saved before a restart, if recent enough."""
+        if self.rpc is not None:
+            return None
+        return self.api.get_snapshot(f"wallet/{self.address}", max_age.total_seconds())
 
-    async def _async_update_data(self) -> dict | None:
+    @callback
+    def _async_track_snapshot(self) -> CALLBACK_TYPE:
+        """Keep saving the last good data, until the returned callback is called."""
+        if self.rpc is not None:
+            return lambda: None
+        return self.api.async_track_snapshot(f"wallet/{self.address}")
+
+    def backend_request(self) -> tuple[str, BackendDecoder | None] | None:
+        """Return the backend path an update gets, none with an RPC client."""
+        return None if self.rpc is not None else (f"wallet/{self.address}", None)
+
+    async def _async_fetch_data(self) -> dict | None:
         """Fetch data from API endpoint."""
         _LOGGER.debug("Requesting Helium stats data")
         try:
-            response = await self.api.get_data(f"wallet/{self.address}")
-            if response.status_code == 200:
-                return response.json()
-        except RequestException as ex:
+            if self.rpc is not None:
+                return await self.rpc.get_balances(self.address)
+            return await self.api.get_data(f"wallet/{self.address}")
+        except ClientError as ex:
             _LOGGER.exception("Error retrieving helium wallet balances")
             raise UpdateFailed(ex) from ex
 
 
-class HeliumHotspotDataUpdateCoordinator(DataUpdateCoordinator[dict]):
+class HeliumHotspotDataUpdateCoordinator(HeliumDataUpdateCoordinator[HotspotRewards]):
     """Helium hotspot data update coordinator."""
 
+    update_deadline = REWARDS_UPDATE_DEADLINE
+
     def __init__(self, hass: HomeAssistant, api: BackendAPI, address: str) -> None:
         """Initialize."""
         self.api = api
@@ -104,14 +328,179 @@ class HeliumHotspotDataUpdateCoordinator(DataUpdateCoordinator[dict]):
         super().__init__(
             hass, _LOGGER, name="Helium hotspot", update_interval=UPDATE_INTERVAL
         )
+        self.schedule = EpochSchedule(key=self._schedule_key())
+        self._payload: dict | None = None
+
+    def _get_snapshot(self, max_age: timedelta) -> HotspotRewards | None:
+        """Get the last good data saved before a restart, if recent enough."""
+        if (
+            payload := self.api.get_snapshot(
+                f"hotspot-rewards2/{self.address}", max_age.total_seconds()
+            )
+        ) is None:
+            return None
+        return HotspotRewards.from_payload(payload)
+
+    @callback
+    def _async_track_snapshot(self) -> CALLBACK_TYPE:
+        """Keep saving the last good data, until the returned callback is called."""
+        return self.api.async_track_snapshot(f"hotspot-rewards2/{self.address}")
 
-    async def _async_update_data(self) -> dict | None:
+    def backend_request(self) -> tuple[str, BackendDecoder | None] | None:
+        """Return the backend path an update gets and its decoder."""
+        return f"hotspot-rewards2/{self.address}", HOTSPOT_REWARDS_DECODER
+
+    async def _async_fetch_data(self) -> HotspotRewards:
         """Fetch data from API endpoint."""
         _LOGGER.debug("Requesting Helium stats data")
         try:
-            response = await self.api.get_data(f"hotspot-rewards2/{self.address}")
-            if response.status_code == 200:
-                return response.json()
-        except RequestException as ex:
+            payload = await self.api.get_data(
+                f"hotspot-rewards2/{self.address}", decoder=HOTSPOT_REWARDS_DECODER
+            )
+        except NotFound:
+            _LOGGER.debug("No hotspots found for %s", self.address)
+            payload = {}
+        except ClientError as ex:
             _LOGGER.exception("Error retrieving helium hotspot rewards")
             raise UpdateFailed(ex) from ex
+        # A cached or not modified payload is the same object as last time
+        if payload is self._payload and self.data is not None:
+            return self.data
+        self._payload = payload
+        return HotspotRewards.from_payload(payload, self.data)
+
+
+class HeliumStakingDataUpdateCoordinator(HeliumDataUpdateCoordinator[dict]):
+    """Helium staking data update coordinator."""
+
+    update_deadline = REWARDS_UPDATE_DEADLINE
+
+    def __init__(self, hass: HomeAssistant, api: BackendAPI, address: str) -> None:
+        """Initialize."""
+        self.api = api
+        self.address = address
+        super().__init__(
+            hass, _LOGGER, name="Helium staking", update_interval=UPDATE_INTERVAL
+        )
+        self.schedule = EpochSchedule(key=self._schedule_key())
+
+    def _get_snapshot(self, max_age: timedelta) -> dict | None:
+        """Get the last good data saved before a restart, if recent enough."""
+        return self.api.get_snapshot(
+            f"staking-rewards/{self.address}", max_age.total_seconds()
+        )
+
+    @callback
+    def _async_track_snapshot(self) -> CALLBACK_TYPE:
+        """Keep saving the last good data, until the returned callback is called."""
+        return self.api.async_track_snapshot(f"staking-rewards/{self.address}")
+
+    def backend_request(self) -> tuple[str, BackendDecoder | None] | None:
+        """Return the backend path an update gets and its decoder."""
+        return f"staking-rewards/{self.address}", STAKING_REWARDS_DECODER
+
+    async def _async_fetch_data(self) -> dict | None:
+        """Fetch data from API endpoint."""
+        _LOGGER.debug("Requesting Helium staking rewards")
+        try:
+            return await self.api.get_data(
+                f"staking-rewards/{self.address}", decoder=STAKING_REWARDS_DECODER
+            )
+        except NotFound:
+            _LOGGER.debug("No staking positions found for %s", self.address)
+            return {"rewards": {}, "rewards_aggregated": {}}
+        except ClientError as ex:
+            _LOGGER.exception("Error retrieving helium staking rewards")
+            raise UpdateFailed(ex) from ex
+
+
+class HeliumFleetDataUpdateCoordinator(HeliumDataUpdateCoordinator[dict[str, Any]]):
+    """Helium data update coordinator of the same data for many wallets.
+
+    The wallet coordinators keep their data and sensors, but are updated on
+    the timer of the fleet instead of their own. Each update fetches every
+    wallet, at most concurrency at a time, after a batch prefetch from the
+    backend. A failing wallet only fails its own coordinator, and the update
+    fails once every wallet failed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        members: list[HeliumDataUpdateCoordinator],
+        concurrency: int = FLEET_CONCURRENCY,
+    ) -> None:
+        """Initialize."""
+        self.members = members
+        self.concurrency = concurrency
+        template = members[0]
+        self.api: BackendAPI | None = getattr(template, "api", None)
+        super().__init__(
+            hass, _LOGGER, name=name, update_interval=template.update_interval
+        )
+        # The fleet takes over the schedule, and a deadline for all the rounds
+        self.schedule = template.schedule
+        self.update_deadline = template.update_deadline * math.ceil(
+            len(members) / concurrency
+        )
+        for member in members:
+            member.fleet = self
+            member.schedule = None
+            member.update_interval = None
+            member.name = f"{member.name} {member.address[:4]}"
+
+    def _get_snapshot(self, max_age: timedelta) -> dict[str, Any] | None:
+        """Get the last good data of every wallet, if all are recent enough."""
+        snapshots = {}
+        for member in self.members:
+            if (snapshot := member._get_snapshot(max_age)) is None:
+                return None
+            snapshots[member.address] = snapshot
+        return snapshots
+
+    @callback
+    def async_set_updated_data(self, data: dict[str, Any]) -> None:
+        """Set the data of the fleet and of its wallets."""
+        for member in self.members:
+            if member.address in data:
+                member.async_set_updated_data(data[member.address])
+        super().async_set_updated_data(data)
+
+    async def _async_fetch_data(self) -> dict[str, Any]:
+        """Update every wallet, at most concurrency at a time.
+
+        The backend paths of the wallets are first fetched together in batch
+        requests, so the wallets are then mostly served from the cache.
+        """
+        if self.api is not None:
+            await self.api.async_prefetch(
+                dict(
+                    request
+                    for member in self.members
+                    if (request := member.backend_request()) is not None
+                )
+            )
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _async_update(member: HeliumDataUpdateCoordinator) -> Any:
+            async with semaphore:
+                return await member._async_update_data()
+
+        results = await asyncio.gather(
+            *(_async_update(member) for member in self.members),
+            return_exceptions=True,
+        )
+        data = {}
+        for member, result in zip(self.members, results):
+            if not isinstance(result, BaseException):
+                member.async_set_updated_data(result)
+                data[member.address] = result
+            elif isinstance(result, Exception):
+                _LOGGER.debug("Updating %s failed: %s", member.name, result)
+                member.async_set_update_error(result)
+            else:
+                raise result
+        if not data:
+            raise UpdateFailed(f"Updating every wallet of {self.name} failed")
+        return data
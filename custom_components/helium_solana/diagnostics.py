@@ -0,0 +1,27 @@
+"""Diagnostics support for Helium Solana."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .api.metrics import async_get_metrics
+from .const import CONF_RPC_URL, CONF_WALLET, CONF_WALLETS
+
+# Hosted RPC URLs usually hold an API key
+TO_REDACT = {CONF_RPC_URL, CONF_WALLET, CONF_WALLETS}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    # The shared APIs only add their metrics once used by an entry
+    return {
+        "entry": async_redact_data(entry.data, TO_REDACT),
+        # The options flow stores the wallets of a wallet entry
+        "options": async_redact_data(entry.options, TO_REDACT),
+        **async_get_metrics(hass).as_dict(entry.entry_id),
+    }
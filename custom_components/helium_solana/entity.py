@@ -0,0 +1,99 @@
+"""Helium Solana entity."""
+from __future__ import annotations
+
+from typing import Any, TypeVar
+
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import HeliumDataUpdateCoordinator
+from .statistics import (
+    SUM_NONE,
+    SUM_TOTAL,
+    SUM_TOTAL_INCREASING,
+    StatisticSeries,
+    StatisticsImporter,
+    async_get_statistics,
+)
+
+SUM_MODES = {
+    SensorStateClass.TOTAL: SUM_TOTAL,
+    SensorStateClass.TOTAL_INCREASING: SUM_TOTAL_INCREASING,
+}
+
+_CoordinatorT = TypeVar("_CoordinatorT", bound=HeliumDataUpdateCoordinator)
+
+
+class HeliumCoordinatorEntity(CoordinatorEntity[_CoordinatorT], SensorEntity):
+    """Helium coordinator sensor entity.
+
+    Most values only move once per reward epoch, so a coordinator update only
+    writes the state of entities whose value, unit, attributes or availability
+    changed since their last write.
+
+    With daily statistics, the value of every day is also kept as an external
+    long-term statistic. A sensor with a state class derives it from the
+    statistics the recorder compiles for the sensor; one without is backfilled
+    from its recorded states and follows its value.
+    """
+
+    _last_written: tuple[Any, ...] | None = None
+
+    # Keep the daily value in long-term statistics
+    _daily_statistics = False
+    # Only set when the series follows the value rather than the recorder
+    _statistics: StatisticsImporter | None = None
+    _statistic_series: StatisticSeries | None = None
+
+    def _set_native_value(self) -> None:
+        """Set native value."""
+
+    def _written_state(self) -> tuple[Any, ...]:
+        """Return what a state write would publish."""
+        return (
+            self.available,
+            self.native_value,
+            self.native_unit_of_measurement,
+            self.extra_state_attributes,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to hass."""
+        await super().async_added_to_hass()
+        self._last_written = self._written_state()
+        if (
+            self._daily_statistics
+            and self.unique_id is not None
+            and (statistics := async_get_statistics(self.hass)) is not None
+        ):
+            device_name = self.device_info.get("name") if self.device_info else None
+            self._statistic_series = StatisticSeries.for_sensor(
+                self.unique_id,
+                " ".join(filter(None, (device_name, self.name))),
+                self.native_unit_of_measurement,
+                SUM_MODES.get(self.state_class, SUM_NONE),
+            )
+            if self.state_class is not None:
+                statistics.async_derive(self._statistic_series, self.entity_id)
+                return
+            self._statistics = statistics
+            statistics.async_backfill(self._statistic_series, self.entity_id)
+            self._add_statistic_point()
+
+    def _add_statistic_point(self) -> None:
+        """Queue the value of today for long-term statistics."""
+        if self._statistics is None or not self.available:
+            return
+        if isinstance(value := self.native_value, (int, float)):
+            self._statistics.async_add_point(self._statistic_series, float(value))
+
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._set_native_value()
+        if (state := self._written_state()) == self._last_written:
+            self.coordinator.stats.record_write(False)
+            return
+        self.coordinator.stats.record_write(True)
+        self._last_written = state
+        self._add_statistic_point()
+        super()._handle_coordinator_update()
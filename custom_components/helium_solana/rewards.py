@@ -0,0 +1,103 @@
+"""Compact hotspot rewards."""
+from __future__ import annotations
+
+from array import array
+from typing import Any
+
+REWARD_TYPES = ("claimed", "unclaimed", "total")
+REWARD_FIELDS = tuple(f"{reward_type}_rewards" for reward_type in REWARD_TYPES)
+
+SECTION_HOTSPOTS = "rewards"
+SECTION_AGGREGATED = "rewards_aggregated"
+
+
+class HotspotRewardsIndex:
+    """Slot of every hotspot and aggregated token in the reward arrays."""
+
+    __slots__ = ("hotspots", "aggregated", "names", "tokens")
+
+    def __init__(self, rewards: dict[str, Any], aggregated: dict[str, Any]) -> None:
+        """Initialize."""
+        self.hotspots = {key: slot for slot, key in enumerate(rewards)}
+        self.aggregated = {
+            token: slot for slot, token in enumerate(aggregated, len(self.hotspots))
+        }
+        self.names = [hotspot["name"] for hotspot in rewards.values()]
+        self.tokens = [hotspot["token"] for hotspot in rewards.values()]
+
+    def __len__(self) -> int:
+        """Return the number of slots."""
+        return len(self.hotspots) + len(self.aggregated)
+
+    def matches(self, rewards: dict[str, Any], aggregated: dict[str, Any]) -> bool:
+        """Return if the index has the same hotspots and tokens as a payload."""
+        return (
+            rewards.keys() == self.hotspots.keys()
+            and aggregated.keys() == self.aggregated.keys()
+        )
+
+    def slot(self, section: str, key: str) -> int | None:
+        """Return the slot of a hotspot or aggregated token."""
+        if section == SECTION_AGGREGATED:
+            return self.aggregated.get(key)
+        return self.hotspots.get(key)
+
+
+class HotspotRewards:
+    """Hotspot rewards normalized into one value array per reward field.
+
+    Values are stored in tokens rather than in the base units of the payload.
+    The index is reused while the set of hotspots and tokens stays the same, so
+    entities can keep their slot across updates.
+    """
+
+    __slots__ = ("index", "values")
+
+    def __init__(
+        self, index: HotspotRewardsIndex, values: dict[str, array[float]]
+    ) -> None:
+        """Initialize."""
+        self.index = index
+        self.values = values
+
+    def __eq__(self, other: object) -> bool:
+        """Return if both hold the same hotspots and values."""
+        if not isinstance(other, HotspotRewards):
+            return NotImplemented
+        return (
+            self.index.hotspots.keys() == other.index.hotspots.keys()
+            and self.index.aggregated.keys() == other.index.aggregated.keys()
+            and self.values == other.values
+        )
+
+    @property
+    def hotspots(self) -> dict[str, int]:
+        """Return the slot of every hotspot."""
+        return self.index.hotspots
+
+    @property
+    def aggregated(self) -> dict[str, int]:
+        """Return the slot of every aggregated token."""
+        return self.index.aggregated
+
+    @classmethod
+    def from_payload(
+        cls, payload: dict[str, Any], previous: HotspotRewards | None = None
+    ) -> HotspotRewards:
+        """Normalize a hotspot-rewards2 payload."""
+        rewards = payload.get(SECTION_HOTSPOTS) or {}
+        aggregated = payload.get(SECTION_AGGREGATED) or {}
+        if previous is not None and previous.index.matches(rewards, aggregated):
+            index = previous.index
+        else:
+            index = HotspotRewardsIndex(rewards, aggregated)
+
+        records = [
+            *(rewards[key] for key in index.hotspots),
+            *(aggregated[token] for token in index.aggregated),
+        ]
+        values = {
+            field: array("d", [record[field] / 10**6 for record in records])
+            for field in REWARD_FIELDS
+        }
+        return cls(index, values)
@@ -0,0 +1,184 @@
+"""Fetch scheduling for Helium coordinators."""
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime, time, timedelta
+import math
+from typing import Any
+from zlib import crc32
+
+DAY = timedelta(days=1)
+
+MAX_BACKOFF = timedelta(hours=1)
+
+ADAPTIVE_MAX_INTERVAL = timedelta(hours=1)
+ADAPTIVE_WIDEN_FACTOR = 1.5
+
+EPOCH_FAST_INTERVAL = timedelta(minutes=10)
+# Bounds how late an epoch outside the window is seen, and learned from
+EPOCH_SLOW_INTERVAL = timedelta(hours=1)
+EPOCH_WINDOW = timedelta(hours=1)
+EPOCH_MIN_SAMPLES = 2
+EPOCH_MAX_SAMPLES = 7
+
+
+class UpdateSchedule:
+    """Fetch schedule with deterministic jitter and backoff on errors.
+
+    The jitter is derived from a key, like the config entry and coordinator,
+    and delays the first scheduled fetch by a stable fraction of the interval.
+    Entries set up together are spread across the interval instead of
+    fetching in lockstep, and keep their phase across restarts.
+    """
+
+    def __init__(
+        self,
+        interval: timedelta,
+        key: str | None = None,
+        max_backoff: timedelta = MAX_BACKOFF,
+    ) -> None:
+        """Initialize with the base interval and an optional jitter key."""
+        self.base_interval = interval
+        self.phase = crc32(key.encode()) / 2**32 if key is not None else 0.0
+        self.max_backoff = max_backoff
+        self.interval = interval
+        self.failures = 0
+        self._jittered = False
+
+    @property
+    def jitter(self) -> timedelta:
+        """Return the delay of the first fetch."""
+        return self.base_interval * self.phase
+
+    def next_interval(self, changed: bool, now: datetime) -> timedelta:
+        """Record a successful fetch and return the next interval."""
+        self.failures = 0
+        return self._set_interval(self._next_interval(changed, now))
+
+    def failed_interval(self, now: datetime) -> timedelta:
+        """Record a failed fetch and return the backed off interval."""
+        self.failures += 1
+        return self._set_interval(
+            min(self.base_interval * 2**self.failures, self.max_backoff)
+        )
+
+    def _next_interval(self, changed: bool, now: datetime) -> timedelta:
+        """Return the interval after a successful fetch."""
+        return self.base_interval
+
+    def _set_interval(self, interval: timedelta) -> timedelta:
+        if not self._jittered:
+            self._jittered = True
+            interval += self.jitter
+        self.interval = interval
+        return interval
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the schedule state."""
+        return {
+            "interval": self.interval.total_seconds(),
+            "base_interval": self.base_interval.total_seconds(),
+            "jitter": self.jitter.total_seconds(),
+            "failures": self.failures,
+        }
+
+
+class AdaptiveSchedule(UpdateSchedule):
+    """Fetch schedule adapting to how often data changes.
+
+    The interval widens while fetched data stays the same, up to the maximum
+    interval, and is halved again, down to the base interval, once it changes.
+    """
+
+    def __init__(
+        self,
+        interval: timedelta,
+        key: str | None = None,
+        max_interval: timedelta = ADAPTIVE_MAX_INTERVAL,
+        max_backoff: timedelta = MAX_BACKOFF,
+    ) -> None:
+        """Initialize with the base and maximum interval."""
+        super().__init__(interval, key, max_backoff)
+        self.max_interval = max_interval
+        self._adaptive_interval = interval
+
+    def _next_interval(self, changed: bool, now: datetime) -> timedelta:
+        """Return the interval after a successful fetch."""
+        if changed:
+            interval = max(self.base_interval, self._adaptive_interval / 2)
+        else:
+            interval = min(
+                self.max_interval, self._adaptive_interval * ADAPTIVE_WIDEN_FACTOR
+            )
+        self._adaptive_interval = interval
+        return interval
+
+
+class EpochSchedule(UpdateSchedule):
+    """Fetch schedule following the daily reward epoch.
+
+    Rewards only change once an epoch settles. Right after the epoch boundary
+    data is fetched at the fast interval; between boundaries it is only
+    confirmed at the slow interval, while never sleeping past the next window.
+    Without a configured boundary, the boundary is learned from the time of
+    day at which fetched data changed, and the fast interval is used until
+    enough changes were seen. The jitter also shifts the window, so entries
+    do not all fetch right at the boundary.
+    """
+
+    def __init__(
+        self,
+        boundary: time | None = None,
+        window: timedelta = EPOCH_WINDOW,
+        fast_interval: timedelta = EPOCH_FAST_INTERVAL,
+        slow_interval: timedelta = EPOCH_SLOW_INTERVAL,
+        key: str | None = None,
+        max_backoff: timedelta = MAX_BACKOFF,
+    ) -> None:
+        """Initialize with an optional UTC time of day of the epoch boundary."""
+        super().__init__(fast_interval, key, max_backoff)
+        self._boundary = boundary
+        self.window = window
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self._changes: deque[float] = deque(maxlen=EPOCH_MAX_SAMPLES)
+
+    @property
+    def boundary(self) -> time | None:
+        """Return the configured or learned UTC time of day of the boundary."""
+        if self._boundary is not None:
+            return self._boundary
+        if len(self._changes) < EPOCH_MIN_SAMPLES:
+            return None
+        # Circular mean, so changes on both sides of midnight average correctly
+        day = DAY.total_seconds()
+        angles = [seconds / day * 2 * math.pi for seconds in self._changes]
+        angle = math.atan2(
+            sum(math.sin(angle) for angle in angles),
+            sum(math.cos(angle) for angle in angles),
+        )
+        seconds = int(angle % (2 * math.pi) / (2 * math.pi) * day)
+        return time(seconds // 3600, seconds % 3600 // 60, seconds % 60)
+
+    def _next_interval(self, changed: bool, now: datetime) -> timedelta:
+        """Record whether fetched data changed and return the next interval."""
+        if changed:
+            self._changes.append(
+                (now - now.replace(hour=0, minute=0, second=0, microsecond=0))
+                .total_seconds()
+            )
+        if (boundary := self.boundary) is None:
+            return self.fast_interval
+
+        # The window opens one fast interval early to catch an early epoch
+        start = now.replace(
+            hour=boundary.hour,
+            minute=boundary.minute,
+            second=boundary.second,
+            microsecond=0,
+        ) - self.fast_interval + self.jitter
+        if start > now:
+            start -= DAY
+        if now < start + self.fast_interval + self.window:
+            return self.fast_interval
+        return max(self.fast_interval, min(self.slow_interval, start + DAY - now))
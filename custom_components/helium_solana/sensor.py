@@ -2,17 +2,24 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
+import asyncio
+from collections.abc import Iterable
 import logging
 
+from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .api.backend import BackendAPI
+from .api.backend import async_get_backend_api
+from .api.metrics import async_get_metrics
+from .api.price import async_get_price_api
+from .api.solana import async_get_solana_rpc
 from .const import (
     CONF_INTEGRATION,
-    CONF_WALLET,
+    CONF_MAX_CONCURRENCY,
+    CONF_RPC_URL,
     DOMAIN,
     INTEGRATION_GENERAL_STATS,
     INTEGRATION_GENERAL_TOKEN_PRICE,
@@ -23,25 +30,28 @@ from .const import (
     TOKEN_SOL,
 )
 from .coordinator import (
+    FLEET_CONCURRENCY,
     TOKEN_IDS,
+    HeliumFleetDataUpdateCoordinator,
     HeliumHotspotDataUpdateCoordinator,
     HeliumPriceDataUpdateCoordinator,
+    HeliumStakingDataUpdateCoordinator,
     HeliumStatsDataUpdateCoordinator,
     HeliumWalletDataUpdateCoordinator,
 )
+from .rewards import REWARD_FIELDS, REWARD_TYPES, SECTION_AGGREGATED, SECTION_HOTSPOTS
 from .sensors.HeliumStats import HeliumStats, get_stat_sensor_descriptions
 from .sensors.HotspotReward import HotspotReward
+from .sensors.MetricSensor import get_metric_sensors
 from .sensors.PriceSensor import PriceSensor
 from .sensors.StakingRewardsPosition import StakingRewardsPosition
 from .sensors.StakingRewardsToken import StakingRewardsToken
 from .sensors.WalletBalance import WalletBalance
+from .utility import get_wallets
 
 _LOGGER = logging.getLogger(__name__)
 
-SCAN_INTERVAL = timedelta(minutes=10)
-
-
-api_backend = BackendAPI()
+FLEET_NAMES = ("Helium wallet fleet", "Helium hotspot fleet", "Helium staking fleet")
 
 
 async def async_setup_entry(
@@ -52,16 +62,41 @@ async def async_setup_entry(
     """Setup Helium Solana sensors from a config entry."""
     config = hass.data[DOMAIN][config_entry.entry_id]
     integration = config.get(CONF_INTEGRATION)
-    wallet = config.get(CONF_WALLET)
-    sensors = await get_sensors(integration, wallet, hass)
-    async_add_entities(sensors, update_before_add=True)
+    wallets = get_wallets(config) if integration == INTEGRATION_WALLET else []
+    sensors = await get_sensors(
+        integration,
+        wallets,
+        hass,
+        config_entry,
+        async_add_entities,
+        config.get(CONF_RPC_URL),
+        config.get(CONF_MAX_CONCURRENCY, FLEET_CONCURRENCY),
+    )
+    # The coordinators created for the sensors added themselves to the metrics
+    metrics = async_get_metrics(hass).coordinators(config_entry.entry_id)
+    metric_sensors = get_metric_sensors(metrics)
+    async_remove_stale_metric_sensors(hass, config_entry, metric_sensors)
+    async_add_entities([*sensors, *metric_sensors])
+
+
+async def get_sensors(
+    integration: str,
+    wallets: list[str],
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    rpc_url: str | None = None,
+    concurrency: int = FLEET_CONCURRENCY,
+):
+    """Get sensors, with wallet balances from a Solana RPC node if given.
 
+    Several wallets are fetched by fleets, at most concurrency at a time.
+    """
+    api_backend = await async_get_backend_api(hass)
 
-async def get_sensors(integration: str, wallet: str, hass: HomeAssistant):
-    """Get sensors."""
     if integration == INTEGRATION_GENERAL_STATS:
         coordinator = HeliumStatsDataUpdateCoordinator(hass, api_backend)
-        await coordinator.async_config_entry_first_refresh()
+        await coordinator.async_config_entry_warm_start()
 
         return (
             HeliumStats(coordinator, description)
@@ -70,75 +105,263 @@ async def get_sensors(integration: str, wallet: str, hass: HomeAssistant):
         )
 
     if integration == INTEGRATION_GENERAL_TOKEN_PRICE:
-        coordinator = HeliumPriceDataUpdateCoordinator(hass)
-        await coordinator.async_config_entry_first_refresh()
+        coordinator = HeliumPriceDataUpdateCoordinator(
+            hass, await async_get_price_api(hass)
+        )
+        await coordinator.async_config_entry_warm_start()
 
         return (PriceSensor(coordinator, token_id) for token_id in TOKEN_IDS)
 
+    if integration != INTEGRATION_WALLET:
+        return []
+
+    rpc = await async_get_solana_rpc(hass, rpc_url) if rpc_url else None
+    coordinators = [
+        (
+            HeliumWalletDataUpdateCoordinator(hass, api_backend, wallet, rpc),
+            HeliumHotspotDataUpdateCoordinator(hass, api_backend, wallet),
+            HeliumStakingDataUpdateCoordinator(hass, api_backend, wallet),
+        )
+        for wallet in wallets
+    ]
+    if len(coordinators) == 1:
+        wallet_coordinator, hotspot_coordinator, staking_coordinator = coordinators[0]
+    else:
+        # Many wallets are updated on the timer of one fleet per kind of data
+        wallet_coordinator, hotspot_coordinator, staking_coordinator = (
+            HeliumFleetDataUpdateCoordinator(hass, name, list(members), concurrency)
+            for name, members in zip(FLEET_NAMES, zip(*coordinators))
+        )
+
+    # The fetches are independent, so setup only waits for the slowest one.
+    # Staking is optional and a failure there only skips its sensors.
+    results = await asyncio.gather(
+        wallet_coordinator.async_config_entry_warm_start(),
+        hotspot_coordinator.async_config_entry_warm_start(),
+        staking_coordinator.async_config_entry_warm_start(required=False),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
     sensors = []
+    for wallet, wallet_coordinators in zip(wallets, coordinators):
+        sensors.extend(
+            get_wallet_sensors(
+                hass, config_entry, async_add_entities, wallet, *wallet_coordinators
+            )
+        )
+    return sensors
+
+
+def get_wallet_sensors(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    wallet: str,
+    wallet_coordinator: HeliumWalletDataUpdateCoordinator,
+    hotspot_coordinator: HeliumHotspotDataUpdateCoordinator,
+    staking_coordinator: HeliumStakingDataUpdateCoordinator,
+) -> list[SensorEntity]:
+    """Get the sensors of a wallet, tracking its hotspots as they change."""
+    sensors: list[SensorEntity] = [
+        WalletBalance(wallet_coordinator, token)
+        for token in (TOKEN_HELIUM, TOKEN_IOT, TOKEN_MOBILE, TOKEN_SOL)
+    ]
 
-    if integration == INTEGRATION_WALLET:
-        coordinator = HeliumWalletDataUpdateCoordinator(hass, api_backend, wallet)
-        await coordinator.async_config_entry_first_refresh()
+    hotspot_sensors: dict[str, list[HotspotReward]] = {}
+    if rewards := hotspot_coordinator.data:
+        hotspot_sensors.update(
+            (
+                hotspot_index,
+                list(get_hotspot_sensors(hotspot_coordinator, hotspot_index)),
+            )
+            for hotspot_index in rewards.hotspots
+        )
+        sensors.extend(
+            sensor
+            for hotspot_sensor_list in hotspot_sensors.values()
+            for sensor in hotspot_sensor_list
+        )
+        sensors.extend(
+            HotspotReward(
+                hotspot_coordinator,
+                wallet,
+                [SECTION_AGGREGATED, token, field],
+                f"{reward_type.title()} Rewards",
+                token,
+            )
+            for token in rewards.aggregated
+            for reward_type, field in zip(REWARD_TYPES, REWARD_FIELDS)
+        )
+    async_track_hotspots(
+        hass, config_entry, hotspot_coordinator, hotspot_sensors, async_add_entities
+    )
 
+    if rewards := staking_coordinator.data:
+        sensors.extend(
+            StakingRewardsPosition(staking_coordinator, delegated_position_key)
+            for delegated_position_key in rewards["rewards"]
+        )
         sensors.extend(
-            WalletBalance(coordinator, token)
-            for token in (TOKEN_HELIUM, TOKEN_IOT, TOKEN_MOBILE, TOKEN_SOL)
+            StakingRewardsToken(staking_coordinator, token)
+            for token in rewards["rewards_aggregated"]
         )
 
-        coordinator = HeliumHotspotDataUpdateCoordinator(hass, api_backend, wallet)
-        await coordinator.async_config_entry_first_refresh()
-
-        if rewards := coordinator.data:
-            sensors.extend(
-                HotspotReward(
-                    coordinator,
-                    rewards["rewards"][hotspot_index]["name"],
-                    ["rewards", hotspot_index, f"{reward_type}_rewards"],
-                    f"{reward_type.title()} Rewards",
-                    rewards["rewards"][hotspot_index]["token"],
+    return sensors
+
+
+def get_hotspot_sensors(
+    coordinator: HeliumHotspotDataUpdateCoordinator, hotspot_index: str
+) -> Iterable[HotspotReward]:
+    """Get the reward sensors of a hotspot."""
+    index = coordinator.data.index
+    slot = index.hotspots[hotspot_index]
+    return (
+        HotspotReward(
+            coordinator,
+            index.names[slot],
+            [SECTION_HOTSPOTS, hotspot_index, field],
+            f"{reward_type.title()} Rewards",
+            index.tokens[slot],
+        )
+        for reward_type, field in zip(REWARD_TYPES, REWARD_FIELDS)
+    )
+
+
+@callback
+def async_track_hotspots(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    coordinator: HeliumHotspotDataUpdateCoordinator,
+    hotspot_sensors: dict[str, list[HotspotReward]],
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Add and remove hotspot reward sensors as hotspots join and leave a wallet.
+
+    Only the hotspots that were added or removed are touched, so the cost of an
+    update follows the change rather than the size of the fleet. The device of a
+    removed hotspot is removed with its last sensor.
+    """
+
+    @callback
+    def _async_update_hotspots() -> None:
+        if (data := coordinator.data) is None:
+            return
+        hotspots = data.hotspots.keys()
+        if hotspots == hotspot_sensors.keys():
+            return
+
+        if added := hotspots - hotspot_sensors.keys():
+            _LOGGER.debug("Adding sensors for new hotspots %s", added)
+            new_sensors = []
+            for hotspot_index in added:
+                hotspot_sensors[hotspot_index] = list(
+                    get_hotspot_sensors(coordinator, hotspot_index)
                 )
-                for hotspot_index in rewards["rewards"]
-                for reward_type in ("claimed", "unclaimed", "total")
+                new_sensors.extend(hotspot_sensors[hotspot_index])
+            async_add_entities(new_sensors)
+
+        if removed := hotspot_sensors.keys() - hotspots:
+            _LOGGER.debug("Removing sensors for hotspots %s", removed)
+            registry = er.async_get(hass)
+            device_ids = set()
+            for hotspot_index in removed:
+                for sensor in hotspot_sensors.pop(hotspot_index):
+                    if (entry := sensor.registry_entry) is not None:
+                        if entry.device_id is not None:
+                            device_ids.add(entry.device_id)
+                        registry.async_remove(sensor.entity_id)
+                    else:
+                        hass.async_create_task(sensor.async_remove())
+            async_remove_empty_devices(hass, config_entry, device_ids)
+
+    config_entry.async_on_unload(coordinator.async_add_listener(_async_update_hotspots))
+
+
+@callback
+def async_remove_empty_devices(
+    hass: HomeAssistant, config_entry: ConfigEntry, device_ids: Iterable[str]
+) -> None:
+    """Remove a config entry from devices it no longer has entities on."""
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+    for device_id in device_ids:
+        if any(
+            entry.config_entry_id == config_entry.entry_id
+            for entry in er.async_entries_for_device(
+                entity_registry, device_id, include_disabled_entities=True
             )
-            sensors.extend(
-                HotspotReward(
-                    coordinator,
-                    wallet,
-                    ["rewards_aggregated", token, f"{reward_type}_rewards"],
-                    f"{reward_type.title()} Rewards",
-                    token,
-                )
-                for token in rewards["rewards_aggregated"]
-                for reward_type in ("claimed", "unclaimed", "total")
+        ):
+            continue
+        # The device itself is removed when it has no config entry left
+        device_registry.async_update_device(
+            device_id, remove_config_entry_id=config_entry.entry_id
+        )
+
+
+@callback
+def async_remove_wallets(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    wallets: Iterable[str],
+    kept: Iterable[str],
+) -> None:
+    """Remove the entities and devices of wallets an entry no longer follows.
+
+    Entities and devices only carry the first four characters of their wallet,
+    so a wallet sharing them with a kept wallet is left alone.
+    """
+    kept_address4 = {wallet[:4] for wallet in kept}
+    prefixes: list[str] = []
+    staking_devices: set[str] = set()
+    device_registry = dr.async_get(hass)
+    for wallet in wallets:
+        if (address4 := wallet[:4]) in kept_address4:
+            continue
+        prefixes.extend(
+            (
+                f"helium.wallet.{address4}_",
+                f"helium.hotspot-reward.{address4}_",
+                f"helium.staking.reward.token.{address4}.",
             )
+        )
+        # Staking positions are only tied to their wallet by their device
+        if device := device_registry.async_get_device(
+            identifiers={(DOMAIN, f"helium.staking.rewards.{address4}")}
+        ):
+            staking_devices.add(device.id)
+    if not prefixes:
+        return
 
-        response = None
-        try:
-            response = await api_backend.get_data("staking-rewards/" + str(wallet))
-        except:
-            _LOGGER.exception("No staking rewards found")
-
-        if response and response.status_code == 200:
-            rewards = response.json()
-            for delegated_position_key in rewards["rewards"]:
-                sensors.append(
-                    StakingRewardsPosition(
-                        api_backend,
-                        wallet,
-                        delegated_position_key,
-                        rewards["rewards"][delegated_position_key],
-                        "mdi:hand-coin-outline",
-                    )
-                )
-                # pass
+    _LOGGER.debug("Removing the sensors of wallets %s", wallets)
+    entity_registry = er.async_get(hass)
+    device_ids = set()
+    for entry in er.async_entries_for_config_entry(
+        entity_registry, config_entry.entry_id
+    ):
+        if entry.unique_id.startswith(tuple(prefixes)) or (
+            entry.device_id in staking_devices
+        ):
+            if entry.device_id is not None:
+                device_ids.add(entry.device_id)
+            entity_registry.async_remove(entry.entity_id)
+    async_remove_empty_devices(hass, config_entry, device_ids)
 
-            for token in rewards["rewards_aggregated"]:
-                sensors.append(
-                    StakingRewardsToken(
-                        api_backend, wallet, token, "mdi:hand-coin-outline"
-                    )
-                )
-                # pass
 
-    return sensors
+@callback
+def async_remove_stale_metric_sensors(
+    hass: HomeAssistant, config_entry: ConfigEntry, metric_sensors: list[SensorEntity]
+) -> None:
+    """Remove the metric sensors of coordinators an entry no longer has.
+
+    Wallets are fetched by fleets once an entry has several, which renames the
+    coordinators the metric sensors are for.
+    """
+    unique_ids = {sensor.unique_id for sensor in metric_sensors}
+    prefix = f"helium.metrics.{config_entry.entry_id}."
+    registry = er.async_get(hass)
+    for entry in er.async_entries_for_config_entry(registry, config_entry.entry_id):
+        if entry.unique_id.startswith(prefix) and entry.unique_id not in unique_ids:
+            registry.async_remove(entry.entity_id)
@@ -3,16 +3,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from homeassistant.components.sensor import (
-    SensorEntity,
-    SensorEntityDescription,
-    SensorStateClass,
-)
+from homeassistant.components.sensor import SensorEntityDescription, SensorStateClass
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from ..const import DOMAIN
 from ..coordinator import HeliumStatsDataUpdateCoordinator
+from ..entity import HeliumCoordinatorEntity
 
 
 @dataclass(kw_only=True)
@@ -56,7 +52,7 @@ def get_stat_sensor_descriptions(
     )
 
 
-class HeliumStats(CoordinatorEntity[HeliumStatsDataUpdateCoordinator], SensorEntity):
+class HeliumStats(HeliumCoordinatorEntity[HeliumStatsDataUpdateCoordinator]):
     """Helium stats sensor entity."""
 
     entity_description: HeliumStatSensorEntityDescription
@@ -91,8 +87,3 @@ class HeliumStats(CoordinatorEntity[HeliumStatsDataUpdateCoordinator], SensorEnt
         if data := self.coordinator.data:
             desc = self.entity_description
             self._attr_native_value = data["stats"][desc.token.lower()][desc.key]
-
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._set_native_value()
-        return super()._handle_coordinator_update()
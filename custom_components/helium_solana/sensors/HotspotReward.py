@@ -3,26 +3,26 @@ from __future__ import annotations
 
 import logging
 
-from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.components.sensor import SensorStateClass
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from ..const import DOMAIN
 from ..coordinator import HeliumHotspotDataUpdateCoordinator
+from ..entity import HeliumCoordinatorEntity
+from ..rewards import HotspotRewardsIndex
 from ..utility import title_case_and_replace_hyphens
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class HotspotReward(
-    CoordinatorEntity[HeliumHotspotDataUpdateCoordinator], SensorEntity
-):
+class HotspotReward(HeliumCoordinatorEntity[HeliumHotspotDataUpdateCoordinator]):
     """Hotspot reward sensor entity."""
 
     _attr_has_entity_name = True
     _attr_icon = "mdi:hand-coin-outline"
     _attr_state_class = SensorStateClass.TOTAL_INCREASING
     _attr_suggested_display_precision = 2
+    _daily_statistics = True
 
     def __init__(
         self,
@@ -36,6 +36,8 @@ class HotspotReward(
         super().__init__(coordinator)
 
         self.path = path
+        self._index: HotspotRewardsIndex | None = None
+        self._slot: int | None = None
 
         if path[0] == "rewards_aggregated":
             device_id = f"helium.wallet.rewards.{identifier[:4]}"
@@ -56,14 +58,24 @@ class HotspotReward(
 
         self._set_native_value()
 
+    @property
+    def available(self) -> bool:
+        """Return if the hotspot is still part of the reward data."""
+        return super().available and self._get_slot() is not None
+
+    def _get_slot(self) -> int | None:
+        """Return the slot of the hotspot or token in the reward arrays.
+
+        The slot is only looked up again when the coordinator built a new index.
+        """
+        if (data := self.coordinator.data) is None:
+            return None
+        if data.index is not self._index:
+            self._index = data.index
+            self._slot = data.index.slot(self.path[0], self.path[1])
+        return self._slot
+
     def _set_native_value(self) -> None:
         """Set native value."""
-        if data := self.coordinator.data:
-            self._attr_native_value = (
-                data[self.path[0]][self.path[1]][self.path[2]] / 10**6
-            )
-
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._set_native_value()
-        return super()._handle_coordinator_update()
+        if (slot := self._get_slot()) is not None:
+            self._attr_native_value = self.coordinator.data.values[self.path[2]][slot]
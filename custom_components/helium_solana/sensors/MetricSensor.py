@@ -0,0 +1,131 @@
+"""Helium Solana metric sensor entities."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import slugify
+
+from ..api.backend import BackendAPI
+from ..const import DOMAIN
+from ..coordinator import HeliumDataUpdateCoordinator
+
+
+@dataclass(frozen=True, kw_only=True)
+class MetricSensorEntityDescription(SensorEntityDescription):
+    """Helium Solana metric sensor entity description."""
+
+    value_fn: Callable[[HeliumDataUpdateCoordinator], float | None]
+    exists_fn: Callable[[HeliumDataUpdateCoordinator], bool] = lambda _: True
+
+
+METRIC_SENSOR_DESCRIPTIONS = (
+    MetricSensorEntityDescription(
+        key="update_duration",
+        name="Update Duration",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda coordinator: coordinator.stats.last_duration,
+    ),
+    MetricSensorEntityDescription(
+        key="update_interval",
+        name="Update Interval",
+        icon="mdi:update",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        value_fn=lambda coordinator: (
+            coordinator.update_interval.total_seconds()
+            if coordinator.update_interval
+            else None
+        ),
+    ),
+    MetricSensorEntityDescription(
+        key="entities_written",
+        name="Entities Written",
+        icon="mdi:pencil-outline",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.stats.last_entities_written,
+    ),
+    MetricSensorEntityDescription(
+        key="cache_hit_ratio",
+        name="Cache Hit Ratio",
+        icon="mdi:cached",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda coordinator: coordinator.api.cache.hit_ratio * 100,
+        exists_fn=lambda coordinator: isinstance(
+            getattr(coordinator, "api", None), BackendAPI
+        ),
+    ),
+)
+
+
+def get_metric_sensors(
+    coordinators: list[HeliumDataUpdateCoordinator],
+) -> list[MetricSensor]:
+    """Get the metric sensors of the coordinators of a config entry.
+
+    Wallets updated by a fleet are left out, the fleet has the metrics.
+    """
+    return [
+        MetricSensor(coordinator, description)
+        for coordinator in coordinators
+        if coordinator.fleet is None
+        for description in METRIC_SENSOR_DESCRIPTIONS
+        if description.exists_fn(coordinator)
+    ]
+
+
+class MetricSensor(CoordinatorEntity[HeliumDataUpdateCoordinator], SensorEntity):
+    """Metric of a coordinator, disabled by default.
+
+    Not a HeliumCoordinatorEntity, so its own state writes are not counted in
+    the metrics it shows.
+    """
+
+    entity_description: MetricSensorEntityDescription
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: HeliumDataUpdateCoordinator,
+        entity_description: MetricSensorEntityDescription,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self.entity_description = entity_description
+        entry_id = coordinator.config_entry.entry_id
+        device_id = f"helium.metrics.{entry_id}"
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, device_id)},
+            name="Helium Solana Metrics",
+            manufacturer="Helium",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+        self._attr_name = f"{coordinator.name} {entity_description.name}"
+        self._attr_unique_id = (
+            f"{device_id}.{slugify(coordinator.name)}.{entity_description.key}"
+        )
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the metric."""
+        return self.entity_description.value_fn(self.coordinator)
@@ -3,16 +3,12 @@ from __future__ import annotations
 
 import logging
 
-from homeassistant.components.sensor import (
-    SensorDeviceClass,
-    SensorEntity,
-    SensorStateClass,
-)
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from ..const import CURRENCY_USD, DOMAIN
 from ..coordinator import HeliumPriceDataUpdateCoordinator
+from ..entity import HeliumCoordinatorEntity
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,7 +20,7 @@ TOKEN_ID_MAP = {
 }
 
 
-class PriceSensor(CoordinatorEntity[HeliumPriceDataUpdateCoordinator], SensorEntity):
+class PriceSensor(HeliumCoordinatorEntity[HeliumPriceDataUpdateCoordinator]):
     """Helium price sensor entity for Helium Solana tokens."""
 
     _attr_attribution = "Powered by CoinGecko"
@@ -60,8 +56,3 @@ class PriceSensor(CoordinatorEntity[HeliumPriceDataUpdateCoordinator], SensorEnt
                 value = data[currency.lower()]
             self._attr_native_unit_of_measurement = currency
             self._attr_native_value = value
-
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._set_native_value()
-        return super()._handle_coordinator_update()
@@ -1,97 +1,68 @@
-from typing import Any, Callable, Dict, Optional
-from homeassistant.helpers.entity import (
-    Entity,
-    DeviceInfo
-)
-import requests
-from ..const import (
-    DOMAIN
-)
+"""Staking rewards position sensor entity."""
+from __future__ import annotations
 
 import logging
-_LOGGER = logging.getLogger(__name__)
 
-class StakingRewardsPosition(Entity):
-    """Staking Reward"""
-    def __init__(self, api, wallet, delegated_position_key, data, icon):
-        super().__init__()
-        self.api = api
-        self.wallet = wallet
-        self.delegated_position_key = delegated_position_key
-        #self.data = data
-        self.path = ['rewards', delegated_position_key]
-        self.attributes = data
-        self._available = True
-        self._icon = icon
-        self._unique_id = 'helium.staking.reward.position.'+self.attributes['delegated_position_key']
-        self.uom = self.attributes['delegated_sub_dao'].upper()
+from homeassistant.helpers.entity import DeviceInfo
 
-        title = str(self.attributes['hnt_amount'])+' HNT '+self.attributes['lockup_type'].upper()+' '+self.attributes['duration_string']
-        self._name = 'Helium Staking Wallet '+wallet[:4]+' '+title
-        self.device_unique_id = "helium.staking.rewards."+wallet[:4]
-        self.device_name = "Helium Staking Wallet "+wallet[:4]
-        #self.device_name_user = "Helium Staking for Wallet "+wallet[:4]
+from ..const import DOMAIN
+from ..coordinator import HeliumStakingDataUpdateCoordinator
+from ..entity import HeliumCoordinatorEntity
 
-    @property
-    def name(self) -> str:
-        return self._name
+_LOGGER = logging.getLogger(__name__)
 
-    @property
-    def unique_id(self) -> str:
-        return self._unique_id
 
-    @property
-    def available(self) -> bool:
-        return self._available
+class StakingRewardsPosition(
+    HeliumCoordinatorEntity[HeliumStakingDataUpdateCoordinator]
+):
+    """Staking rewards sensor entity for a delegated position."""
 
-    @property
-    def state(self) -> Optional[str]:
-        return self._state
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:hand-coin-outline"
+    _attr_suggested_display_precision = 2
+    _daily_statistics = True
 
-    @property
-    def icon(self) -> str | None:
-        return self._icon
-    
-    @property
-    def should_poll(self):
-        return True
+    def __init__(
+        self,
+        coordinator: HeliumStakingDataUpdateCoordinator,
+        delegated_position_key: str,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._delegated_position_key = delegated_position_key
+        position = coordinator.data["rewards"][delegated_position_key]
+        address4 = coordinator.address[:4]
 
-    @property
-    def unit_of_measurement(self):
-        return self.uom
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"helium.staking.rewards.{address4}")},
+            name=f"Helium Staking Wallet {address4}",
+            manufacturer="Helium",
+        )
+        self._attr_name = (
+            f"{position['hnt_amount']} HNT {position['lockup_type'].upper()} "
+            f"{position['duration_string']}"
+        )
+        self._attr_native_unit_of_measurement = position["delegated_sub_dao"].upper()
+        self._attr_unique_id = (
+            f"helium.staking.reward.position.{position['delegated_position_key']}"
+        )
 
-    @property
-    def extra_state_attributes(self):
-        return self.attributes
+        self._set_native_value()
 
     @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, self.device_unique_id)
-            },
-            name=self.device_name,
-            manufacturer='Helium'
-        )
+    def available(self) -> bool:
+        """Return if the position is still part of the staking data."""
+        return super().available and self._position is not None
 
-    async def async_update(self):
-        try:
-            response = await self.api.get_data('staking-rewards/'+str(self.wallet))
-            if response.status_code != 200:
-                return
-            
-            value = response.json()
-            for key in self.path:
-                value = value[key]
-            
-            #value = int(value)
-            #value = round(value / (10 ** 6),2)
-            self._state = round(float(value['unclaimed_rewards']),2)
-            self.attributes = value
-            self._available = True
+    @property
+    def _position(self) -> dict | None:
+        """Return the delegated position data."""
+        if data := self.coordinator.data:
+            return data["rewards"].get(self._delegated_position_key)
+        return None
 
-        except (requests.exceptions.RequestException):
-            self._available = False
-            _LOGGER.exception("Error retrieving wallet balance from backend")
+    def _set_native_value(self) -> None:
+        """Set native value."""
+        if position := self._position:
+            self._attr_native_value = float(position["unclaimed_rewards"])
+            self._attr_extra_state_attributes = position
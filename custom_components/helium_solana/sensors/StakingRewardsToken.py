@@ -1,90 +1,48 @@
-from typing import Any, Callable, Dict, Optional
-from homeassistant.helpers.entity import (
-    Entity,
-    DeviceInfo
-)
-import requests
-from ..const import (
-    DOMAIN
-)
+"""Staking rewards token sensor entity."""
+from __future__ import annotations
 
 import logging
-_LOGGER = logging.getLogger(__name__)
-
-class StakingRewardsToken(Entity):
-    """Staking Reward"""
-    def __init__(self, api, wallet, token, icon):
-        super().__init__()
-        self.api = api
-        self.wallet = wallet
-        #self.data = data
-        self.token = token
-        self.path = ['rewards_aggregated', token]
-        self._available = True
-        self._icon = icon
-        self._unique_id = 'helium.staking.reward.token.'+wallet[:4]+'.'+self.token
-        self.uom = self.token.upper()
-        self._name = 'Helium Staking Wallet '+wallet[:4]+' Total '+self.uom
-        self.device_unique_id = "helium.staking.rewards."+wallet[:4]
-        self.device_name = "Helium Staking Wallet "+wallet[:4]
 
+from homeassistant.helpers.entity import DeviceInfo
 
-    @property
-    def name(self) -> str:
-        return self._name
+from ..const import DOMAIN
+from ..coordinator import HeliumStakingDataUpdateCoordinator
+from ..entity import HeliumCoordinatorEntity
 
-    @property
-    def unique_id(self) -> str:
-        return self._unique_id
+_LOGGER = logging.getLogger(__name__)
 
-    @property
-    def available(self) -> bool:
-        return self._available
 
-    @property
-    def state(self) -> Optional[str]:
-        return self._state
+class StakingRewardsToken(
+    HeliumCoordinatorEntity[HeliumStakingDataUpdateCoordinator]
+):
+    """Staking rewards sensor entity aggregated per token."""
 
-    @property
-    def icon(self) -> str | None:
-        return self._icon
-    
-    @property
-    def should_poll(self):
-        return True
+    _attr_has_entity_name = True
+    _attr_icon = "mdi:hand-coin-outline"
+    _attr_suggested_display_precision = 2
 
-    @property
-    def unit_of_measurement(self):
-        return self.uom
+    def __init__(
+        self, coordinator: HeliumStakingDataUpdateCoordinator, token: str
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._token = token
+        address4 = coordinator.address[:4]
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={
-                # Serial numbers are unique identifiers within a specific domain
-                (DOMAIN, self.device_unique_id)
-            },
-            name=self.device_name,
-            manufacturer='Helium'
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"helium.staking.rewards.{address4}")},
+            name=f"Helium Staking Wallet {address4}",
+            manufacturer="Helium",
         )
-
-    async def async_update(self):
-        try:
-            response = await self.api.get_data('staking-rewards/'+str(self.wallet))
-            if response.status_code != 200:
-                return
-            
-            value = response.json()
-            for key in self.path:
-                value = value[key]
-            
-            #value = int(value)
-            #value = round(value / (10 ** 6),2)
-            self._state = round(float(value['unclaimed_rewards']),2)
-            self.attributes = value
-            self._available = True
-
-        except (requests.exceptions.RequestException):
-            self._available = False
-            _LOGGER.exception("Error retrieving wallet balance from backend")
+        self._attr_name = f"Total {token.upper()}"
+        self._attr_native_unit_of_measurement = token.upper()
+        self._attr_unique_id = f"helium.staking.reward.token.{address4}.{token}"
+
+        self._set_native_value()
+
+    def _set_native_value(self) -> None:
+        """Set native value."""
+        if (data := self.coordinator.data) and (
+            rewards := data["rewards_aggregated"].get(self._token)
+        ):
+            self._attr_native_value = float(rewards["unclaimed_rewards"])
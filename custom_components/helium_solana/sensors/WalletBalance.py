@@ -3,22 +3,23 @@ from __future__ import annotations
 
 import logging
 
-from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.components.sensor import SensorStateClass
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from ..const import DOMAIN, TOKEN_SOL
 from ..coordinator import HeliumWalletDataUpdateCoordinator
+from ..entity import HeliumCoordinatorEntity
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class WalletBalance(CoordinatorEntity[HeliumWalletDataUpdateCoordinator], SensorEntity):
+class WalletBalance(HeliumCoordinatorEntity[HeliumWalletDataUpdateCoordinator]):
     """Helium wallet balance sensor entity for Helium Solana tokens."""
 
     _attr_has_entity_name = True
     _attr_icon = "mdi:wallet"
     _attr_state_class = SensorStateClass.TOTAL
+    _daily_statistics = True
 
     def __init__(
         self, coordinator: HeliumWalletDataUpdateCoordinator, token: str
@@ -44,8 +45,3 @@ class WalletBalance(CoordinatorEntity[HeliumWalletDataUpdateCoordinator], Sensor
         """Set native value."""
         if data := self.coordinator.data:
             self._attr_native_value = data["balance"][self._token.lower()]
-
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._set_native_value()
-        return super()._handle_coordinator_update()
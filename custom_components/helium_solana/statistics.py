@@ -0,0 +1,380 @@
+"""Daily reward and balance history in long-term statistics."""
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import logging
+from typing import Any
+
+from homeassistant.components.recorder import (
+    EVENT_RECORDER_HOURLY_STATISTICS_GENERATED,
+    get_instance,
+)
+from homeassistant.components.recorder.history import get_significant_states
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    StatisticsRow,
+    async_add_external_statistics,
+    get_last_statistics,
+    statistics_during_period,
+)
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util import slugify
+import homeassistant.util.dt as dt_util
+
+from .api.metrics import async_get_metrics
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_STATISTICS = f"{DOMAIN}_statistics"
+
+# Points added within this many seconds are written together
+FLUSH_DELAY = 5
+
+# Days of recorded states or statistics turned into a new series
+BACKFILL_DAYS = 30
+
+SUM_NONE = "none"
+SUM_TOTAL = "total"
+SUM_TOTAL_INCREASING = "total_increasing"
+
+
+@dataclass(frozen=True)
+class StatisticSeries:
+    """Daily series of a sensor in long-term statistics.
+
+    A series with a sum follows the total of the sensor like the recorder
+    does, with a decrease of a total increasing series counted as a reset.
+    """
+
+    statistic_id: str
+    name: str
+    unit: str | None
+    sum_mode: str = SUM_NONE
+
+    @classmethod
+    def for_sensor(
+        cls, unique_id: str, name: str, unit: str | None, sum_mode: str
+    ) -> StatisticSeries:
+        """Return the series of a sensor, identified by its unique ID."""
+        return cls(f"{DOMAIN}:{slugify(unique_id)}", name, unit, sum_mode)
+
+    @property
+    def metadata(self) -> StatisticMetaData:
+        """Return the metadata of the statistic."""
+        return StatisticMetaData(
+            has_mean=False,
+            has_sum=self.sum_mode != SUM_NONE,
+            name=self.name,
+            source=DOMAIN,
+            statistic_id=self.statistic_id,
+            unit_of_measurement=self.unit,
+        )
+
+    def next_sum(
+        self, last_state: float | None, last_sum: float, state: float
+    ) -> float:
+        """Return the sum after the state changed from the last state."""
+        if last_state is None:
+            return last_sum
+        if self.sum_mode == SUM_TOTAL_INCREASING and state < last_state:
+            return last_sum + state
+        return last_sum + state - last_state
+
+
+def day_start(moment: datetime) -> datetime:
+    """Return the start of the local day of a moment, on a whole UTC hour."""
+    start = dt_util.as_utc(dt_util.start_of_local_day(dt_util.as_local(moment)))
+    return start.replace(minute=0, second=0, microsecond=0)
+
+
+def daily_points(states: Iterable[State | dict[str, Any]]) -> dict[datetime, float]:
+    """Return the last numeric state of every day of a state history."""
+    points: dict[datetime, float] = {}
+    for state in states:
+        if not isinstance(state, State):
+            continue
+        try:
+            value = float(state.state)
+        except ValueError:
+            continue
+        points[day_start(state.last_updated)] = value
+    return points
+
+
+class StatisticsImporter:
+    """Writes the daily values of sensors to long-term statistics in bulk.
+
+    Values are queued as points and written together FLUSH_DELAY after the
+    first one, so a coordinator update lands in one batch of writes, with one
+    call per statistic however many days it holds. The first time a series is
+    seen, the states recorded for it over the last BACKFILL_DAYS are added as
+    points. Points are compared with the last row the recorder already has for
+    the statistic, so only new days, and today when it changed, are written.
+
+    Sensors with a state class already have statistics the recorder compiles.
+    Their series is derived from those instead: the daily rows of all of them
+    are read in one query once the recorder compiled an hour, and copied with
+    the recorder's state and sum.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._series: dict[str, StatisticSeries] = {}
+        self._pending: defaultdict[str, dict[datetime, float]] = defaultdict(dict)
+        self._backfill: dict[str, str] = {}
+        # Entity of every series derived from the statistics of the recorder
+        self._derived: dict[str, str] = {}
+        self._derive = False
+        # Start timestamp, state and sum of the last row of every statistic
+        self._last: dict[str, tuple[float, float | None, float]] = {}
+        self._cancel_flush: Any | None = None
+        # Flushes run one at a time, so each starts from the rows of the last
+        self._lock = asyncio.Lock()
+        self.flushes = 0
+        self.written = 0
+        self.skipped = 0
+        self.backfilled = 0
+
+    @callback
+    def async_add_point(
+        self, series: StatisticSeries, value: float, moment: datetime | None = None
+    ) -> None:
+        """Queue the value of a series for the day of a moment, now by default."""
+        self._series[series.statistic_id] = series
+        start = day_start(moment or dt_util.utcnow())
+        self._pending[series.statistic_id][start] = value
+        self._async_schedule_flush()
+
+    @callback
+    def async_backfill(self, series: StatisticSeries, entity_id: str) -> None:
+        """Queue the recorded states of a sensor the first time its series is seen."""
+        if series.statistic_id in self._series:
+            return
+        self._series[series.statistic_id] = series
+        self._backfill[series.statistic_id] = entity_id
+        self._async_schedule_flush()
+
+    @callback
+    def async_derive(self, series: StatisticSeries, entity_id: str) -> None:
+        """Derive a series from the statistics the recorder compiles for a sensor."""
+        self._series[series.statistic_id] = series
+        self._derived[series.statistic_id] = entity_id
+        self._derive = True
+        self._async_schedule_flush()
+
+    @callback
+    def async_statistics_generated(self, _event: Event) -> None:
+        """Derive the series again once the recorder compiled an hour."""
+        if self._derived:
+            self._derive = True
+            self._async_schedule_flush()
+
+    @callback
+    def _async_schedule_flush(self) -> None:
+        if self._cancel_flush is None:
+            self._cancel_flush = async_call_later(
+                self.hass, FLUSH_DELAY, self._async_flush_later
+            )
+
+    async def _async_flush_later(self, _now: datetime) -> None:
+        self._cancel_flush = None
+        await self.async_flush()
+
+    async def async_stop(self, _event: Event) -> None:
+        """Write the queued points before the recorder stops."""
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Write the queued points that are new to the recorder."""
+        async with self._lock:
+            await self._async_flush()
+
+    async def _async_flush(self) -> None:
+        pending, self._pending = self._pending, defaultdict(dict)
+        backfill, self._backfill = self._backfill, {}
+        derived = dict(self._derived) if self._derive else {}
+        self._derive = False
+        if not pending and not backfill and not derived:
+            return
+        recorder = get_instance(self.hass)
+        if backfill:
+            history = await recorder.async_add_executor_job(
+                self._recorded_points, backfill
+            )
+            for statistic_id, points in history.items():
+                self.backfilled += len(points)
+                # Values added since are newer than what the recorder holds
+                pending[statistic_id] = {**points, **pending[statistic_id]}
+        if unknown := [
+            statistic_id
+            for statistic_id in (*pending, *derived)
+            if statistic_id not in self._last
+        ]:
+            self._last.update(
+                await recorder.async_add_executor_job(self._last_rows, unknown)
+            )
+        recorded: dict[str, list[StatisticsRow]] = {}
+        if derived:
+            recorded = await recorder.async_add_executor_job(
+                self._recorded_rows, derived
+            )
+
+        self.flushes += 1
+        written = 0
+        for statistic_id, points in pending.items():
+            series = self._series[statistic_id]
+            if rows := self._new_rows(series, points):
+                async_add_external_statistics(self.hass, series.metadata, rows)
+                written += len(rows)
+            self.skipped += len(points) - len(rows)
+        for statistic_id, entity_id in derived.items():
+            series = self._series[statistic_id]
+            days = recorded.get(entity_id, [])
+            if rows := self._derived_rows(series, days):
+                async_add_external_statistics(self.hass, series.metadata, rows)
+                written += len(rows)
+            self.skipped += len(days) - len(rows)
+        self.written += written
+        _LOGGER.debug(
+            "Wrote %s statistic rows of %s series",
+            written,
+            len(pending) + len(derived),
+        )
+
+    def _new_rows(
+        self, series: StatisticSeries, points: Mapping[datetime, float]
+    ) -> list[StatisticData]:
+        """Return the rows of the points after the last row, or changing it."""
+        last_start, last_state, last_sum = self._last.get(
+            series.statistic_id, (0.0, None, 0.0)
+        )
+        rows = []
+        for start in sorted(points):
+            state = points[start]
+            timestamp = start.timestamp()
+            if timestamp < last_start or (
+                timestamp == last_start and state == last_state
+            ):
+                continue
+            row = StatisticData(start=start, state=state)
+            if series.sum_mode != SUM_NONE:
+                last_sum = series.next_sum(last_state, last_sum, state)
+                row["sum"] = last_sum
+            rows.append(row)
+            last_start, last_state = timestamp, state
+        self._last[series.statistic_id] = (last_start, last_state, last_sum)
+        return rows
+
+    def _derived_rows(
+        self, series: StatisticSeries, days: list[StatisticsRow]
+    ) -> list[StatisticData]:
+        """Return the rows of the recorder's days after the last row, or changing it."""
+        last_start, last_state, last_sum = self._last.get(
+            series.statistic_id, (0.0, None, 0.0)
+        )
+        rows = []
+        for day in days:
+            start = day_start(dt_util.utc_from_timestamp(day["start"]))
+            timestamp = start.timestamp()
+            state, total = day.get("state"), day.get("sum") or 0.0
+            if timestamp < last_start or (
+                timestamp == last_start and (state, total) == (last_state, last_sum)
+            ):
+                continue
+            row = StatisticData(start=start, state=state)
+            if series.sum_mode != SUM_NONE:
+                row["sum"] = total
+            rows.append(row)
+            last_start, last_state, last_sum = timestamp, state, total
+        self._last[series.statistic_id] = (last_start, last_state, last_sum)
+        return rows
+
+    def _last_rows(
+        self, statistic_ids: list[str]
+    ) -> dict[str, tuple[float, float | None, float]]:
+        """Return the last row of statistics, in the recorder thread."""
+        last = {}
+        for statistic_id in statistic_ids:
+            rows = get_last_statistics(
+                self.hass, 1, statistic_id, False, {"state", "sum"}
+            )
+            if row := next(iter(rows.get(statistic_id, ())), None):
+                last[statistic_id] = (row["start"], row["state"], row["sum"] or 0.0)
+        return last
+
+    def _recorded_points(
+        self, entity_ids: Mapping[str, str]
+    ) -> dict[str, dict[datetime, float]]:
+        """Return the daily points of recorded states, in the recorder thread."""
+        states = get_significant_states(
+            self.hass,
+            dt_util.utcnow() - timedelta(days=BACKFILL_DAYS),
+            entity_ids=list(entity_ids.values()),
+            significant_changes_only=False,
+            no_attributes=True,
+        )
+        return {
+            statistic_id: points
+            for statistic_id, entity_id in entity_ids.items()
+            if (points := daily_points(states.get(entity_id, ())))
+        }
+
+    def _recorded_rows(
+        self, entity_ids: Mapping[str, str]
+    ) -> dict[str, list[StatisticsRow]]:
+        """Return the daily statistics of sensors since their last row, in one query."""
+        oldest = day_start(dt_util.utcnow() - timedelta(days=BACKFILL_DAYS))
+        start = min(
+            (
+                dt_util.utc_from_timestamp(self._last[statistic_id][0])
+                if statistic_id in self._last
+                else oldest
+            )
+            for statistic_id in entity_ids
+        )
+        return statistics_during_period(
+            self.hass,
+            start,
+            None,
+            set(entity_ids.values()),
+            "day",
+            None,
+            {"state", "sum"},
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters of the importer."""
+        return {
+            "series": len(self._series),
+            "flushes": self.flushes,
+            "written": self.written,
+            "skipped": self.skipped,
+            "backfilled": self.backfilled,
+        }
+
+
+@singleton(DATA_STATISTICS)
+@callback
+def async_get_statistics(hass: HomeAssistant) -> StatisticsImporter | None:
+    """Get the statistics importer shared by all sensors, none without a recorder."""
+    if "recorder" not in hass.config.components:
+        return None
+    importer = StatisticsImporter(hass)
+    async_get_metrics(hass).async_add_source("statistics", importer.as_dict)
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, importer.async_stop)
+    hass.bus.async_listen(
+        EVENT_RECORDER_HOURLY_STATISTICS_GENERATED, importer.async_statistics_generated
+    )
+    return importer
@@ -0,0 +1,100 @@
+"""Fixtures for Helium Solana benchmarks.
+
+Results are compared to the baselines in baselines.json, which are written by
+running the benchmarks with --benchmark-update on a quiet machine.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+import json
+from pathlib import Path
+
+import pytest
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+# Allowed growth over the baseline per metric, as a factor and an absolute slack
+TOLERANCES = {
+    "setup_time": (1.5, 0.1),
+    "refresh_time": (1.5, 0.05),
+    "changed_refresh_time": (1.5, 0.05),
+    "peak_memory": (1.25, 512 * 1024),
+    "retained_memory": (1.25, 512 * 1024),
+    "raw_memory": (1.25, 64 * 1024),
+    "compact_memory": (1.25, 64 * 1024),
+    "raw_read_time": (1.5, 0.005),
+    "compact_read_time": (1.5, 0.005),
+}
+# Entity writes are exact, any growth is a regression
+DEFAULT_TOLERANCE = (1.0, 0)
+
+
+class Baselines:
+    """Baseline results of the benchmarks."""
+
+    def __init__(self, path: Path) -> None:
+        """Initialize from the stored baselines, if any."""
+        self.path = path
+        self.results: dict[str, dict[str, float]] = (
+            json.loads(path.read_text()) if path.exists() else {}
+        )
+        self.measured: dict[str, dict[str, float]] = {}
+
+    def regressions(self, name: str, results: dict[str, float]) -> list[str]:
+        """Return the results of a benchmark that regressed from its baseline."""
+        baseline = self.results.get(name, {})
+        regressions = []
+        for metric, value in results.items():
+            if (expected := baseline.get(metric)) is None:
+                continue
+            factor, slack = TOLERANCES.get(metric, DEFAULT_TOLERANCE)
+            if value > expected * factor + slack:
+                regressions.append(f"{metric}: {value} over baseline {expected}")
+        return regressions
+
+    def save(self) -> None:
+        """Store the measured results as the new baselines."""
+        self.results.update(self.measured)
+        self.path.write_text(json.dumps(self.results, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture(scope="session")
+def baselines(pytestconfig: pytest.Config):
+    """Return the baselines, stored again at the end when updating them."""
+    baselines = Baselines(BASELINES)
+    yield baselines
+    if pytestconfig.getoption("--benchmark-update") and baselines.measured:
+        baselines.save()
+
+
+@pytest.fixture
+def check_baseline(
+    request: pytest.FixtureRequest, baselines: Baselines
+) -> Callable[[dict[str, float]], None]:
+    """Return a check of the results of the benchmark against its baseline."""
+    name = request.node.name
+
+    def _check(results: dict[str, float]) -> None:
+        baselines.measured[name] = results
+        request.node.user_properties.extend(results.items())
+        if request.config.getoption("--benchmark-update"):
+            return
+        assert not (regressions := baselines.regressions(name, results)), regressions
+
+    return _check
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config) -> None:
+    """Show the results of the benchmarks that ran."""
+    reports = [
+        report
+        for report in terminalreporter.getreports("passed")
+        + terminalreporter.getreports("failed")
+        if report.when == "call" and report.user_properties
+    ]
+    if not reports:
+        return
+    terminalreporter.section("benchmarks")
+    for report in reports:
+        results = ", ".join(f"{key}={value}" for key, value in report.user_properties)
+        terminalreporter.write_line(f"{report.head_line}: {results}")
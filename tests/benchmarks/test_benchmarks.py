@@ -0,0 +1,196 @@
+"""Benchmark Helium Solana against a local stand-in at scale."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import random
+import time
+import tracemalloc
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.helium_solana.api.backend import DATA_BACKEND_API
+from custom_components.helium_solana.api.metrics import async_get_metrics
+from custom_components.helium_solana.const import (
+    CONF_INTEGRATION,
+    CONF_VERSION,
+    CONF_WALLET,
+    DOMAIN,
+    INTEGRATION_GENERAL_STATS,
+    INTEGRATION_GENERAL_TOKEN_PRICE,
+    INTEGRATION_WALLET,
+)
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, callback
+
+from ..stand_in import HeliumStandIn
+
+pytestmark = pytest.mark.benchmark
+
+SCENARIOS: dict[str, dict[str, Any]] = {
+    "small": {"hotspots": 1, "positions": 1},
+    "medium": {"hotspots": 500, "positions": 50},
+    "large": {"hotspots": 10_000, "positions": 500},
+    "slow": {"hotspots": 500, "positions": 50, "latency": 0.2},
+    "flaky": {"hotspots": 500, "positions": 50, "error_rate": 0.1},
+}
+
+
+@pytest.fixture(params=list(SCENARIOS))
+async def scaled_stand_in(
+    request: pytest.FixtureRequest, hass: HomeAssistant, socket_enabled: None
+):
+    """Start a stand-in serving a scenario, with the integration pointed at it."""
+    server = HeliumStandIn(**SCENARIOS[request.param])
+    await server.start()
+    # Retry delays are drawn at random, seeded to be the same every run
+    random.seed(0)
+    with (
+        patch("custom_components.helium_solana.api.backend.BACKEND_URL", server.url),
+        patch(
+            "custom_components.helium_solana.api.price.COINGECKO_PRICE_URL",
+            server.price_url,
+        ),
+    ):
+        yield server
+    await server.close()
+
+
+def add_entry(hass: HomeAssistant, integration: str) -> MockConfigEntry:
+    """Add a config entry of an integration type."""
+    data = {CONF_VERSION: 2, CONF_INTEGRATION: integration}
+    if integration == INTEGRATION_WALLET:
+        data[CONF_WALLET] = "abcdefgh"
+    entry = MockConfigEntry(domain=DOMAIN, title=integration, version=2, data=data)
+    entry.add_to_hass(hass)
+    return entry
+
+
+@callback
+def count_state_writes(hass: HomeAssistant) -> Callable[[], int]:
+    """Count state writes, returning a callback that reads and resets the count."""
+    writes = 0
+
+    @callback
+    def _async_count(event: Event) -> None:
+        nonlocal writes
+        writes += 1
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, _async_count)
+
+    def _take() -> int:
+        nonlocal writes
+        count, writes = writes, 0
+        return count
+
+    return _take
+
+
+async def timed(coro: Awaitable[Any]) -> float:
+    """Return the seconds an awaitable took."""
+    start = time.perf_counter()
+    await coro
+    return round(time.perf_counter() - start, 4)
+
+
+async def async_setup(hass: HomeAssistant, entry: MockConfigEntry) -> None:
+    """Set up a config entry and wait for it to settle."""
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_wallet_setup_and_refresh(
+    hass: HomeAssistant,
+    scaled_stand_in: HeliumStandIn,
+    check_baseline: Callable[[dict[str, float]], None],
+) -> None:
+    """Benchmark setting up a wallet entry and refreshing its coordinators.
+
+    The first refresh gets the same payloads and should write nothing, the
+    second gets the rewards of a new epoch.
+    """
+    entry = add_entry(hass, INTEGRATION_WALLET)
+    take_writes = count_state_writes(hass)
+
+    setup_time = await timed(async_setup(hass, entry))
+    assert entry.state is ConfigEntryState.LOADED
+    setup_writes = take_writes()
+
+    api = hass.data[DATA_BACKEND_API]
+    api.cache.ttl = api.cache.stale_ttl = 0
+    coordinators = async_get_metrics(hass).coordinators(entry.entry_id)
+
+    async def _async_refresh() -> None:
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in coordinators)
+        )
+        await hass.async_block_till_done()
+
+    refresh_time = await timed(_async_refresh())
+    refresh_writes = take_writes()
+    scaled_stand_in.epoch += 1
+    changed_refresh_time = await timed(_async_refresh())
+    changed_refresh_writes = take_writes()
+
+    check_baseline(
+        {
+            "setup_time": setup_time,
+            "setup_writes": setup_writes,
+            "refresh_time": refresh_time,
+            "refresh_writes": refresh_writes,
+            "changed_refresh_time": changed_refresh_time,
+            "changed_refresh_writes": changed_refresh_writes,
+        }
+    )
+
+
+async def test_wallet_setup_memory(
+    hass: HomeAssistant,
+    scaled_stand_in: HeliumStandIn,
+    check_baseline: Callable[[dict[str, float]], None],
+) -> None:
+    """Benchmark the memory of setting up a wallet entry.
+
+    Traced apart from the timings, as tracing slows everything down. The
+    stand-in runs in the same process, so its payloads are included.
+    """
+    entry = add_entry(hass, INTEGRATION_WALLET)
+    tracemalloc.start()
+    try:
+        await async_setup(hass, entry)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert entry.state is ConfigEntryState.LOADED
+
+    check_baseline({"peak_memory": peak, "retained_memory": retained})
+
+
+@pytest.mark.parametrize(
+    "integration", [INTEGRATION_GENERAL_STATS, INTEGRATION_GENERAL_TOKEN_PRICE]
+)
+async def test_general_setup(
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    check_baseline: Callable[[dict[str, float]], None],
+    integration: str,
+) -> None:
+    """Benchmark setting up the stats and price entries."""
+    entry = add_entry(hass, integration)
+    take_writes = count_state_writes(hass)
+
+    with (
+        patch("custom_components.helium_solana.api.backend.BACKEND_URL", stand_in.url),
+        patch(
+            "custom_components.helium_solana.api.price.COINGECKO_PRICE_URL",
+            stand_in.price_url,
+        ),
+    ):
+        setup_time = await timed(async_setup(hass, entry))
+    assert entry.state is ConfigEntryState.LOADED
+
+    check_baseline({"setup_time": setup_time, "setup_writes": take_writes()})
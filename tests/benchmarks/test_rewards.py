@@ -0,0 +1,82 @@
+"""Benchmark the compact hotspot rewards against the raw payload."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import gc
+import time
+import tracemalloc
+from typing import Any
+
+import pytest
+
+from custom_components.helium_solana.rewards import (
+    REWARD_FIELDS,
+    SECTION_HOTSPOTS,
+    HotspotRewards,
+)
+
+from ..stand_in import hotspot_rewards_payload
+
+pytestmark = pytest.mark.benchmark
+
+# Reads are timed this many times, keeping the fastest
+READ_REPEAT = 5
+
+
+def _measure(build: Callable[[], Any]) -> tuple[Any, int]:
+    """Return what a build returns, and the memory it retained."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def _best_time(read: Callable[[], None], repeat: int = READ_REPEAT) -> float:
+    """Return the fastest of several runs of a read, the least disturbed one."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+@pytest.mark.parametrize("hotspots", [1_000, 10_000])
+def test_compact_rewards(
+    hotspots: int, check_baseline: Callable[[dict[str, float]], None]
+) -> None:
+    """Compare the memory and the reads of every sensor, raw and compact."""
+    raw, raw_memory = _measure(lambda: hotspot_rewards_payload(hotspots))
+    compact, compact_memory = _measure(lambda: HotspotRewards.from_payload(raw))
+    paths = [
+        (SECTION_HOTSPOTS, key, field)
+        for key in raw["rewards"]
+        for field in REWARD_FIELDS
+    ]
+    slots = [
+        (field, compact.index.slot(section, key)) for section, key, field in paths
+    ]
+
+    def _read_raw() -> None:
+        for section, key, field in paths:
+            raw[section][key][field] / 10**6
+
+    def _read_compact() -> None:
+        values = compact.values
+        for field, slot in slots:
+            values[field][slot]
+
+    raw_read_time = _best_time(_read_raw)
+    compact_read_time = _best_time(_read_compact)
+
+    assert compact_memory < raw_memory
+    check_baseline(
+        {
+            "raw_memory": raw_memory,
+            "compact_memory": compact_memory,
+            "raw_read_time": round(raw_read_time, 5),
+            "compact_read_time": round(compact_read_time, 5),
+        }
+    )
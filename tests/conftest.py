@@ -0,0 +1,102 @@
+"""Fixtures for Helium Solana tests."""
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.helium_solana.api.backend import BackendAPI
+from custom_components.helium_solana.api.client import HttpClient
+from custom_components.helium_solana.api.retry import RetryPolicy
+from custom_components.helium_solana.api.transport import async_get_transport
+from custom_components.helium_solana.const import (
+    CONF_INTEGRATION,
+    CONF_VERSION,
+    CONF_WALLET,
+    DOMAIN,
+    INTEGRATION_WALLET,
+)
+from homeassistant.core import HomeAssistant
+
+from .stand_in import HeliumStandIn
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the benchmark options."""
+    parser.addoption("--benchmark", action="store_true", help="Run the benchmarks")
+    parser.addoption(
+        "--benchmark-update",
+        action="store_true",
+        help="Run the benchmarks and store the results as the new baselines",
+    )
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    """Skip the benchmarks unless asked to run them."""
+    if config.getoption("--benchmark") or config.getoption("--benchmark-update"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks only run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable custom integrations in all tests."""
+    yield
+
+
+@pytest.fixture
+async def stand_in(hass: HomeAssistant, socket_enabled: None):
+    """Start a local stand-in for the Helium backend and CoinGecko."""
+    server = HeliumStandIn()
+    await server.start()
+    yield server
+    await server.close()
+
+
+@pytest.fixture
+async def http_client(hass: HomeAssistant) -> HttpClient:
+    """Return an HTTP client using the shared client session."""
+    return HttpClient(async_get_transport(hass))
+
+
+@pytest.fixture
+def backend_api(
+    hass: HomeAssistant, http_client: HttpClient, stand_in: HeliumStandIn
+) -> BackendAPI:
+    """Return a backend API talking to the stand-in server."""
+    return BackendAPI(
+        http_client,
+        stand_in.url,
+        retry_policy=RetryPolicy(base_delay=0.01),
+        create_task=hass.async_create_background_task,
+    )
+
+
+@pytest.fixture
+def wallet_entry(hass: HomeAssistant) -> MockConfigEntry:
+    """Return a wallet config entry."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Wallet abcd",
+        version=2,
+        data={
+            CONF_VERSION: 2,
+            CONF_INTEGRATION: INTEGRATION_WALLET,
+            CONF_WALLET: "abcdefgh",
+        },
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+def mock_backend_url(stand_in: HeliumStandIn):
+    """Point the shared backend API at the stand-in server."""
+    with patch(
+        "custom_components.helium_solana.api.backend.BACKEND_URL", stand_in.url
+    ):
+        yield
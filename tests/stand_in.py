@@ -0,0 +1,324 @@
+"""Local stand-in for the Helium backend and CoinGecko."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+import hashlib
+import json
+import random
+from typing import Any
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from custom_components.helium_solana.api.solana import LAMPORTS_PER_SOL, token_accounts
+
+
+def wallet_payload(address: str) -> dict[str, Any]:
+    """Return a wallet payload."""
+    return {
+        "address": address,
+        "balance": {"hnt": 1.5, "iot": 1000.0, "mobile": 2000.0, "solana": 0.05},
+    }
+
+
+def hotspot_rewards_payload(hotspots: int = 1, epoch: int = 0) -> dict[str, Any]:
+    """Return a hotspot rewards payload, with rewards growing every epoch."""
+    rewards = {
+        f"hotspot-{index}": {
+            "name": f"hotspot-{index}",
+            "token": "iot",
+            "claimed_rewards": 1_000_000 * index,
+            "unclaimed_rewards": 500_000 + 1_000 * epoch,
+            "total_rewards": 1_000_000 * index + 500_000 + 1_000 * epoch,
+        }
+        for index in range(hotspots)
+    }
+    return {
+        "rewards": rewards,
+        "rewards_aggregated": {
+            "iot": {
+                "claimed_rewards": sum(r["claimed_rewards"] for r in rewards.values()),
+                "unclaimed_rewards": sum(
+                    r["unclaimed_rewards"] for r in rewards.values()
+                ),
+                "total_rewards": sum(r["total_rewards"] for r in rewards.values()),
+            }
+        },
+    }
+
+
+def staking_rewards_payload(positions: int = 1, epoch: int = 0) -> dict[str, Any]:
+    """Return a staking rewards payload, with rewards growing every epoch."""
+    rewards = {
+        f"position-{index}": {
+            "delegated_position_key": f"position-{index}",
+            "delegated_sub_dao": "iot",
+            "hnt_amount": 100 + index,
+            "lockup_type": "cliff",
+            "duration_string": "6 months",
+            "unclaimed_rewards": 12.5 + epoch,
+        }
+        for index in range(positions)
+    }
+    return {
+        "rewards": rewards,
+        "rewards_aggregated": (
+            {"iot": {"unclaimed_rewards": (12.5 + epoch) * positions}}
+            if positions
+            else {}
+        ),
+    }
+
+
+def helium_stats_payload() -> dict[str, Any]:
+    """Return a Helium stats payload."""
+    stats = {
+        "total_hotspots": 1000,
+        "active_hotspots": 900,
+        "total_cities": 100,
+        "total_countries": 10,
+        "daily_average_rewards": 12.3,
+    }
+    return {"stats": {"iot": dict(stats), "mobile": dict(stats)}}
+
+
+def price_payload() -> dict[str, Any]:
+    """Return a CoinGecko simple price payload."""
+    return {
+        token_id: {"usd": 1.0, "eur": 0.9}
+        for token_id in ("helium", "helium-iot", "helium-mobile", "wrapped-solana")
+    }
+
+
+def _etag(body: str) -> str:
+    """Return the ETag of a response body."""
+    return f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+
+
+class HeliumStandIn:
+    """Stand-in server for the Helium backend and CoinGecko price API."""
+
+    def __init__(
+        self,
+        hotspots: int = 1,
+        positions: int = 1,
+        latency: float = 0,
+        error_rate: float = 0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize."""
+        self.hotspots = hotspots
+        self.positions = positions
+        # Rewards of the current epoch, bumped to change the reward payloads
+        self.epoch = 0
+        self.latency = latency
+        # Share of requests answered with a 503, drawn from a seeded generator
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.errors: dict[str, int] = {}
+        # Number of upcoming requests to a path answered with a 503
+        self.transient_errors: Counter[str] = Counter()
+        self.retry_after: str | None = None
+        # Responses carry an ETag, and matching conditional requests get a 304
+        self.etags = True
+        # Bodies are compressed when the client accepts it
+        self.compress = False
+        self.not_modified: Counter[str] = Counter()
+        # Paths that never respond until the server is closed
+        self.stalled: set[str] = set()
+        self._release = asyncio.Event()
+        self.requests: Counter[str] = Counter()
+        # Balances served by the JSON-RPC endpoint, by wallet
+        self.rpc_wallets: dict[str, dict[str, float]] = {}
+        self.rpc_calls: Counter[str] = Counter()
+        # The batch endpoint answers a 404, like a backend without it, when off
+        self.batch_support = True
+        # Paths requested through the batch endpoint
+        self.batched: Counter[str] = Counter()
+        self.connections: set[int] = set()
+        self.server = TestServer(self._create_app())
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the server."""
+        return str(self.server.make_url("")).rstrip("/")
+
+    @property
+    def rpc_url(self) -> str:
+        """Return the Solana JSON-RPC URL of the server."""
+        return f"{self.url}/rpc"
+
+    @property
+    def price_url(self) -> str:
+        """Return the CoinGecko simple price URL of the server."""
+        return f"{self.url}/api/v3/simple/price"
+
+    async def start(self) -> None:
+        """Start the server."""
+        await self.server.start_server()
+
+    async def close(self) -> None:
+        """Stop the server."""
+        self._release.set()
+        await self.server.close()
+
+    def _create_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/wallet/{address}", self._wallet)
+        app.router.add_get("/hotspot-rewards2/{address}", self._hotspot_rewards)
+        app.router.add_get("/staking-rewards/{address}", self._staking_rewards)
+        app.router.add_get("/heliumstats", self._helium_stats)
+        app.router.add_get("/api/v3/simple/price", self._price)
+        app.router.add_post("/rpc", self._rpc)
+        app.router.add_post("/batch", self._batch)
+        return app
+
+    async def _respond(self, request: web.Request, payload: Any) -> web.Response:
+        self.requests[request.path] += 1
+        self.connections.add(id(request.transport))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if request.path in self.stalled:
+            await self._release.wait()
+        if self.transient_errors[request.path] > 0:
+            self.transient_errors[request.path] -= 1
+            return web.json_response({"error": "stand-in error"}, status=503)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return web.json_response({"error": "stand-in error"}, status=503)
+        if status := self.errors.get(request.path):
+            headers = {}
+            if status == 429 and self.retry_after is not None:
+                headers["Retry-After"] = self.retry_after
+            return web.json_response(
+                {"error": "stand-in error"}, status=status, headers=headers
+            )
+        body = json.dumps(payload)
+        headers = {}
+        if self.etags:
+            headers["ETag"] = _etag(body)
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                self.not_modified[request.path] += 1
+                return web.Response(status=304, headers=headers)
+        response = web.json_response(text=body, headers=headers)
+        if self.compress:
+            response.enable_compression()
+        return response
+
+    async def _wallet(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            request, wallet_payload(request.match_info["address"])
+        )
+
+    async def _hotspot_rewards(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            request, hotspot_rewards_payload(self.hotspots, self.epoch)
+        )
+
+    async def _staking_rewards(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            request, staking_rewards_payload(self.positions, self.epoch)
+        )
+
+    async def _helium_stats(self, request: web.Request) -> web.Response:
+        return await self._respond(request, helium_stats_payload())
+
+    async def _price(self, request: web.Request) -> web.Response:
+        return await self._respond(request, price_payload())
+
+    def _payload(self, path: str) -> Any | None:
+        """Return the payload of a backend path, None if there is none."""
+        endpoint, _, address = path.partition("/")
+        if endpoint == "heliumstats" and not address:
+            return helium_stats_payload()
+        if not address:
+            return None
+        if endpoint == "wallet":
+            return wallet_payload(address)
+        if endpoint == "hotspot-rewards2":
+            return hotspot_rewards_payload(self.hotspots, self.epoch)
+        if endpoint == "staking-rewards":
+            return staking_rewards_payload(self.positions, self.epoch)
+        return None
+
+    async def _batch(self, request: web.Request) -> web.Response:
+        """Answer many backend paths in one response, keyed by path.
+
+        Paths sent with the ETag of their payload get a 304, paths set up to
+        fail get their error status, and unknown paths a 404.
+        """
+        if not self.batch_support:
+            self.requests[request.path] += 1
+            return web.json_response({"error": "not found"}, status=404)
+        responses = {}
+        for item in (await request.json())["requests"]:
+            path = item["path"]
+            self.batched[path] += 1
+            if (payload := self._payload(path)) is None:
+                responses[path] = {"status": 404}
+            elif status := self.errors.get(f"/{path}"):
+                responses[path] = {"status": status}
+            elif not self.etags:
+                responses[path] = {"status": 200, "body": payload}
+            elif item.get("etag") == (etag := _etag(json.dumps(payload))):
+                self.not_modified[f"/{path}"] += 1
+                responses[path] = {"status": 304, "etag": etag}
+            else:
+                responses[path] = {"status": 200, "etag": etag, "body": payload}
+        return await self._respond(request, {"responses": responses})
+
+    async def _rpc(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        calls = body if isinstance(body, list) else [body]
+        accounts = {
+            address: (wallet, token)
+            for wallet in self.rpc_wallets
+            for token, address in token_accounts(wallet).items()
+        }
+        results = []
+        for call in calls:
+            self.rpc_calls[call["method"]] += 1
+            if call["method"] == "getBalance":
+                balance = self.rpc_wallets.get(call["params"][0], {})
+                value: Any = int(balance.get("solana", 0) * LAMPORTS_PER_SOL)
+            else:
+                value = [
+                    self._token_account(*accounts[address])
+                    if address in accounts
+                    else None
+                    for address in call["params"][0]
+                ]
+            results.append(
+                {
+                    "jsonrpc": "2.0",
+                    "id": call["id"],
+                    "result": {"context": {"slot": 1}, "value": value},
+                }
+            )
+        return await self._respond(
+            request, results if isinstance(body, list) else results[0]
+        )
+
+    def _token_account(self, wallet: str, token: str) -> dict[str, Any]:
+        amount = self.rpc_wallets[wallet].get(token, 0)
+        return {
+            "data": {
+                "parsed": {
+                    "info": {
+                        "owner": wallet,
+                        "tokenAmount": {
+                            "amount": str(int(amount * 10**6)),
+                            "decimals": 6,
+                            "uiAmount": amount,
+                            "uiAmountString": str(amount),
+                        },
+                    },
+                    "type": "account",
+                },
+                "program": "spl-token",
+                "space": 165,
+            },
+            "executable": False,
+            "lamports": 2039280,
+            "owner": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA",
+        }
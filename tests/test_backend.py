@@ -0,0 +1,433 @@
+"""Test the backend API."""
+import asyncio
+from datetime import timedelta
+import time
+from unittest.mock import patch
+
+from aiohttp import ClientResponseError, ClientTimeout, ServerTimeoutError
+import pytest
+
+from custom_components.helium_solana.api.backend import BackendAPI, NotFound
+from custom_components.helium_solana.api.client import HttpClient
+from custom_components.helium_solana.api.price import PriceAPI
+from custom_components.helium_solana.api.retry import (
+    STATE_CLOSED,
+    STATE_OPEN,
+    CircuitOpen,
+    RetryPolicy,
+)
+from custom_components.helium_solana.api.snapshot import PayloadSnapshot
+from custom_components.helium_solana.api.transport import async_get_transport
+from custom_components.helium_solana.coordinator import (
+    HOTSPOT_REWARDS_DECODER,
+    STAKING_REWARDS_DECODER,
+    HeliumPriceDataUpdateCoordinator,
+    HeliumStakingDataUpdateCoordinator,
+    HeliumWalletDataUpdateCoordinator,
+)
+from homeassistant.core import HomeAssistant
+
+from .stand_in import HeliumStandIn
+
+
+async def test_get_data_reuses_connection(
+    http_client: HttpClient, stand_in: HeliumStandIn
+) -> None:
+    """Test sequential fetches share one keep-alive connection."""
+    api = BackendAPI(http_client, stand_in.url, cache_ttl=-1)
+
+    with patch("asyncio.to_thread") as mock_to_thread:
+        for _ in range(5):
+            data = await api.get_data("wallet/abcd")
+            assert data["balance"]["hnt"] == 1.5
+
+    mock_to_thread.assert_not_called()
+    assert stand_in.requests["/wallet/abcd"] == 5
+    assert len(stand_in.connections) == 1
+
+
+async def test_get_data_caches_decoded_payload(
+    backend_api: BackendAPI, stand_in: HeliumStandIn
+) -> None:
+    """Test repeated fetches within the TTL reuse the decoded payload."""
+    first = await backend_api.get_data("staking-rewards/abcd")
+    second = await backend_api.get_data("staking-rewards/abcd")
+
+    assert first is second
+    assert stand_in.requests["/staking-rewards/abcd"] == 1
+    assert backend_api.cache.as_dict()["hits"] == 1
+    assert backend_api.cache.as_dict()["misses"] == 1
+
+
+async def test_get_data_coalesces_concurrent_requests(
+    backend_api: BackendAPI, stand_in: HeliumStandIn
+) -> None:
+    """Test concurrent callers for the same key share one request."""
+    stand_in.latency = 0.1
+
+    results = await asyncio.gather(
+        *(backend_api.get_data("staking-rewards/abcd") for _ in range(20))
+    )
+
+    assert all(result is results[0] for result in results)
+    assert stand_in.requests["/staking-rewards/abcd"] == 1
+    assert backend_api.coalesced == 19
+
+
+async def test_get_data_coalesced_error(
+    backend_api: BackendAPI, stand_in: HeliumStandIn
+) -> None:
+    """Test an error is passed to every coalesced caller."""
+    stand_in.latency = 0.1
+    stand_in.errors["/wallet/abcd"] = 500
+
+    results = await asyncio.gather(
+        *(backend_api.get_data("wallet/abcd") for _ in range(5)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ClientResponseError) for result in results)
+    assert stand_in.requests["/wallet/abcd"] == backend_api.retry_policy.attempts
+
+    stand_in.errors.clear()
+    assert (await backend_api.get_data("wallet/abcd"))["address"] == "abcd"
+
+
+async def test_get_data_stale_while_revalidate(
+    hass: HomeAssistant, http_client: HttpClient, stand_in: HeliumStandIn
+) -> None:
+    """Test stale data is served while one refresh runs in the background."""
+    api = BackendAPI(
+        http_client,
+        stand_in.url,
+        cache_ttl=0,
+        cache_stale_ttl=600,
+        create_task=hass.async_create_background_task,
+    )
+    await api.get_data("wallet/abcd")
+    stand_in.latency = 0.2
+
+    start = time.monotonic()
+    results = [await api.get_data("wallet/abcd") for _ in range(3)]
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.2
+    assert all(result["address"] == "abcd" for result in results)
+    assert api.served_stale == 3
+    assert api.background_refreshes == 1
+
+    # The refresh is a background task of Home Assistant
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert stand_in.requests["/wallet/abcd"] == 2
+    assert api.background_refresh_failures == 0
+
+
+async def test_price_coordinator(
+    hass: HomeAssistant, http_client: HttpClient, stand_in: HeliumStandIn
+) -> None:
+    """Test the price coordinator fetches through the HTTP client."""
+    coordinator = HeliumPriceDataUpdateCoordinator(
+        hass, PriceAPI(http_client, stand_in.price_url)
+    )
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert coordinator.data["helium"]["usd"] == 1.0
+
+
+async def test_request_read_timeout(
+    hass: HomeAssistant, stand_in: HeliumStandIn
+) -> None:
+    """Test a server that never responds fails the request at the read timeout."""
+    client = HttpClient(
+        async_get_transport(hass),
+        timeout=ClientTimeout(total=None, sock_connect=1, sock_read=0.1),
+    )
+    stand_in.stalled.add("/wallet/abcd")
+
+    start = time.monotonic()
+    with pytest.raises(ServerTimeoutError):
+        await client.async_request(f"{stand_in.url}/wallet/abcd")
+
+    assert time.monotonic() - start < 1
+
+
+async def test_cancelled_callers_cancel_request(
+    backend_api: BackendAPI, stand_in: HeliumStandIn
+) -> None:
+    """Test a shared request is cancelled once all of its callers are."""
+    stand_in.stalled.add("/wallet/abcd")
+    callers = [
+        asyncio.create_task(backend_api.get_data("wallet/abcd")) for _ in range(2)
+    ]
+    await asyncio.sleep(0.05)
+
+    callers[0].cancel()
+    await asyncio.sleep(0)
+    assert "wallet/abcd" in backend_api._inflight
+
+    callers[1].cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0.01)
+    assert "wallet/abcd" not in backend_api._inflight
+    assert backend_api._inflight.cancelled == 1
+
+
+async def test_coordinator_update_deadline(
+    hass: HomeAssistant, backend_api: BackendAPI, stand_in: HeliumStandIn
+) -> None:
+    """Test an update against a server that never responds ends at its deadline."""
+    coordinator = HeliumWalletDataUpdateCoordinator(hass, backend_api, "abcd")
+    coordinator.update_deadline = timedelta(seconds=0.1)
+    stand_in.stalled.add("/wallet/abcd")
+
+    start = time.monotonic()
+    await coordinator.async_refresh()
+
+    assert time.monotonic() - start < 1
+    assert not coordinator.last_update_success
+    await asyncio.sleep(0.01)
+    assert len(backend_api._inflight) == 0
+    # Failed updates back off
+    assert coordinator.update_interval >= timedelta(minutes=20)
+
+
+async def test_get_data_retries_transient_errors(
+    backend_api: BackendAPI, stand_in: HeliumStandIn
+) -> None:
+    """Test transient server errors are retried."""
+    stand_in.transient_errors["/wallet/abcd"] = 2
+
+    assert (await backend_api.get_data("wallet/abcd"))["address"] == "abcd"
+    assert stand_in.requests["/wallet/abcd"] == 3
+    assert backend_api.retries == 2
+    assert backend_api.as_dict()["breakers"]["127.0.0.1"]["state"] == STATE_CLOSED
+
+
+async def test_circuit_breaker(
+    hass: HomeAssistant, http_client: HttpClient, stand_in: HeliumStandIn
+) -> None:
+    """Test an open circuit fails fast, serves last good data and probes once."""
+    snapshot = PayloadSnapshot(hass, "test")
+    snapshot.async_set("wallet/cached", {"address": "cached"})
+    api = BackendAPI(
+        http_client,
+        stand_in.url,
+        cache_ttl=-1,
+        snapshot=snapshot,
+        retry_policy=RetryPolicy(attempts=1),
+        breaker_threshold=2,
+        breaker_reset_timeout=0.1,
+    )
+    stand_in.errors["/wallet/abcd"] = 500
+    stand_in.errors["/wallet/cached"] = 500
+    for _ in range(2):
+        with pytest.raises(ClientResponseError):
+            await api.get_data("wallet/abcd")
+    breaker = api.breaker("127.0.0.1")
+    assert breaker.state == STATE_OPEN
+
+    with pytest.raises(CircuitOpen):
+        await api.get_data("wallet/abcd")
+    assert await api.get_data("wallet/cached") == {"address": "cached"}
+    assert stand_in.requests["/wallet/abcd"] == 2
+    assert stand_in.requests["/wallet/cached"] == 0
+    assert api.served_open == 1
+
+    # A single probe fails and opens the circuit again
+    await asyncio.sleep(0.1)
+    results = await asyncio.gather(
+        api.get_data("wallet/abcd"), api.get_data("wallet/efgh"), return_exceptions=True
+    )
+    assert {type(result) for result in results} == {ClientResponseError, CircuitOpen}
+    assert breaker.state == STATE_OPEN
+    assert breaker.probes == 1
+
+    # A successful probe closes it
+    stand_in.errors.clear()
+    await asyncio.sleep(0.1)
+    assert (await api.get_data("wallet/abcd"))["address"] == "abcd"
+    assert breaker.state == STATE_CLOSED
+    assert breaker.as_dict()["opened"] == 2
+
+
+async def test_not_found_is_cached(
+    hass: HomeAssistant, http_client: HttpClient, stand_in: HeliumStandIn
+) -> None:
+    """Test a wallet without staking costs one request per negative TTL."""
+    api = BackendAPI(http_client, stand_in.url, cache_ttl=-1, negative_ttl=600)
+    stand_in.errors["/staking-rewards/abcd"] = 404
+
+    for _ in range(3):
+        with pytest.raises(NotFound):
+            await api.get_data("staking-rewards/abcd")
+    coordinator = HeliumStakingDataUpdateCoordinator(hass, api, "abcd")
+    await coordinator.async_refresh()
+
+    assert stand_in.requests["/staking-rewards/abcd"] == 1
+    assert api.negative_cache.hits == 3
+    assert coordinator.last_update_success
+    assert coordinator.data == {"rewards": {}, "rewards_aggregated": {}}
+
+    api.negative_cache.ttl = api.negative_cache.stale_ttl = -1
+    with pytest.raises(NotFound):
+        await api.get_data("staking-rewards/abcd")
+    assert stand_in.requests["/staking-rewards/abcd"] == 2
+
+
+async def test_empty_payload_is_cached(
+    http_client: HttpClient, stand_in: HeliumStandIn
+) -> None:
+    """Test an empty payload is kept for the negative TTL."""
+    api = BackendAPI(http_client, stand_in.url, cache_ttl=-1, negative_ttl=600)
+    stand_in.positions = 0
+
+    for _ in range(3):
+        data = await api.get_data("staking-rewards/abcd")
+        assert data == {"rewards": {}, "rewards_aggregated": {}}
+
+    assert stand_in.requests["/staking-rewards/abcd"] == 1
+    assert len(api.cache) == 0
+    assert len(api.negative_cache) == 1
+
+
+async def test_conditional_get_reuses_payload(
+    http_client: HttpClient, stand_in: HeliumStandIn
+) -> None:
+    """Test an expired payload is revalidated and reused on a 304."""
+    api = BackendAPI(http_client, stand_in.url, cache_ttl=-1)
+
+    first = await api.get_data("staking-rewards/abcd", decoder=STAKING_REWARDS_DECODER)
+    second = await api.get_data("staking-rewards/abcd", decoder=STAKING_REWARDS_DECODER)
+
+    assert second is first
+    assert stand_in.not_modified["/staking-rewards/abcd"] == 1
+    stats = api.as_dict()["endpoints"]["staking-rewards"]
+    assert stats["not_modified_ratio"] == 0.5
+    assert stats["bytes_saved"] == stats["bytes_decoded"] > 0
+
+
+async def test_compressed_transfer(
+    backend_api: BackendAPI, stand_in: HeliumStandIn
+) -> None:
+    """Test bodies are transferred compressed and the savings are counted."""
+    stand_in.compress = True
+    stand_in.hotspots = 200
+
+    data = await backend_api.get_data("hotspot-rewards2/abcd")
+
+    assert len(data["rewards"]) == 200
+    stats = backend_api.endpoints["hotspot-rewards2"]
+    assert stats.bytes_received < stats.bytes_decoded
+    assert stats.bytes_saved == stats.bytes_decoded - stats.bytes_received
+
+
+async def test_price_conditional_get(
+    http_client: HttpClient, stand_in: HeliumStandIn
+) -> None:
+    """Test prices are revalidated and reused on a 304."""
+    api = PriceAPI(http_client, stand_in.price_url, cache_ttl=-1)
+
+    first = await api.get_prices(["helium"], ["usd"])
+    second = await api.get_prices(["helium"], ["usd"])
+
+    assert second is first
+    assert api.stats.not_modified == 1
+    assert stand_in.requests["/api/v3/simple/price"] == 2
+
+
+BATCH_WALLETS = ("abcd", "efgh", "ijkl")
+
+
+def batch_paths() -> dict:
+    """Return every path of the batch wallets with its decoder."""
+    paths = {}
+    for wallet in BATCH_WALLETS:
+        paths[f"wallet/{wallet}"] = None
+        paths[f"hotspot-rewards2/{wallet}"] = HOTSPOT_REWARDS_DECODER
+        paths[f"staking-rewards/{wallet}"] = STAKING_REWARDS_DECODER
+    return paths
+
+
+async def test_batch_prefetch(
+    hass: HomeAssistant, http_client: HttpClient, stand_in: HeliumStandIn
+) -> None:
+    """Test concurrent prefetches share one request that fills the cache."""
+    stand_in.hotspots = 3
+    stand_in.errors["/staking-rewards/efgh"] = 404
+    stand_in.errors["/wallet/ijkl"] = 500
+    api = BackendAPI(
+        http_client,
+        stand_in.url,
+        retry_policy=RetryPolicy(attempts=1),
+        create_task=hass.async_create_background_task,
+    )
+    paths = batch_paths()
+
+    await asyncio.gather(
+        *(api.async_prefetch({path: decoder}) for path, decoder in paths.items())
+    )
+
+    assert stand_in.requests["/batch"] == 1
+    assert sum(stand_in.batched.values()) == 9
+    hotspots = await api.get_data(
+        "hotspot-rewards2/abcd", decoder=HOTSPOT_REWARDS_DECODER
+    )
+    assert hotspots == await BackendAPI(http_client, stand_in.url).get_data(
+        "hotspot-rewards2/abcd", decoder=HOTSPOT_REWARDS_DECODER
+    )
+    with pytest.raises(NotFound):
+        await api.get_data("staking-rewards/efgh")
+    # A path failing within the batch is requested on its own
+    with pytest.raises(ClientResponseError):
+        await api.get_data("wallet/ijkl")
+    for path in paths.keys() - {"staking-rewards/efgh", "wallet/ijkl"}:
+        await api.get_data(path, decoder=paths[path])
+    # The batch, the hotspots compared, and the failed wallet
+    assert sum(stand_in.requests.values()) == 3
+    assert api.as_dict()["batch"] == {
+        "supported": True,
+        "batches": 1,
+        "paths": 9,
+        "failures": 0,
+    }
+
+
+async def test_batch_revalidates(
+    hass: HomeAssistant, http_client: HttpClient, stand_in: HeliumStandIn
+) -> None:
+    """Test expired payloads are revalidated in a batch and reused on a 304."""
+    api = BackendAPI(
+        http_client,
+        stand_in.url,
+        cache_ttl=-1,
+        create_task=hass.async_create_background_task,
+    )
+    await api.async_prefetch(batch_paths())
+    first = api.cache.peek("staking-rewards/abcd").data
+
+    await api.async_prefetch(batch_paths())
+
+    assert stand_in.requests["/batch"] == 2
+    assert stand_in.not_modified["/staking-rewards/abcd"] == 1
+    assert api.cache.peek("staking-rewards/abcd").data is first
+
+
+async def test_batch_fallback(
+    hass: HomeAssistant, http_client: HttpClient, stand_in: HeliumStandIn
+) -> None:
+    """Test paths are requested on their own without batch support."""
+    stand_in.batch_support = False
+    api = BackendAPI(
+        http_client, stand_in.url, create_task=hass.async_create_background_task
+    )
+
+    await api.async_prefetch(batch_paths())
+    await api.async_prefetch(batch_paths())
+    for path, decoder in batch_paths().items():
+        await api.get_data(path, decoder=decoder)
+
+    assert stand_in.requests["/batch"] == 1
+    assert not api.batch_supported
+    assert sum(stand_in.requests.values()) == 1 + 9
@@ -0,0 +1,72 @@
+"""Test the payload cache."""
+from custom_components.helium_solana.api.cache import PayloadCache
+
+
+def test_ttl_expiry() -> None:
+    """Test entries expire after the TTL."""
+    cache = PayloadCache(ttl=10)
+    cache.set("a", {"value": 1}, 10, now=0)
+
+    assert cache.get("a", now=5).data == {"value": 1}
+    assert cache.get("a", now=11) is None
+    assert cache.as_dict() == {
+        "entries": 0,
+        "bytes": 0,
+        "hits": 1,
+        "misses": 1,
+        "hit_ratio": 0.5,
+        "evictions": 0,
+        "expirations": 1,
+        "oversized": 0,
+    }
+
+
+def test_lru_eviction_by_entries() -> None:
+    """Test the least recently used entry is evicted over the entry limit."""
+    cache = PayloadCache(ttl=10, max_entries=2)
+    cache.set("a", 1, 1, now=0)
+    cache.set("b", 2, 1, now=0)
+    cache.get("a", now=0)
+    cache.set("c", 3, 1, now=0)
+
+    assert cache.get("b", now=0) is None
+    assert cache.get("a", now=0).data == 1
+    assert cache.evictions == 1
+
+
+def test_lru_eviction_by_bytes() -> None:
+    """Test entries are evicted over the byte budget."""
+    cache = PayloadCache(ttl=10, max_bytes=100)
+    cache.set("a", 1, 60, now=0)
+    cache.set("b", 2, 60, now=0)
+    cache.set("c", 3, 200, now=0)
+
+    assert len(cache) == 1
+    assert cache.bytes == 60
+    assert cache.get("b", now=0).data == 2
+    assert cache.evictions == 1
+
+
+def test_oversized_payload() -> None:
+    """Test a payload larger than the byte budget is counted and not cached."""
+    cache = PayloadCache(ttl=10, max_bytes=100)
+    cache.set("a", 1, 60, now=0)
+    cache.set("b", 2, 200, now=0)
+
+    assert cache.get("b", now=0) is None
+    # The entries already cached are kept
+    assert cache.get("a", now=0).data == 1
+    assert cache.oversized == 1
+    assert cache.evictions == 0
+    assert cache.as_dict()["oversized"] == 1
+
+
+def test_stale_lookup() -> None:
+    """Test entries past the TTL are only returned as stale until the stale TTL."""
+    cache = PayloadCache(ttl=10, stale_ttl=30)
+    cache.set("a", 1, 1, now=0)
+
+    assert cache.get("a", now=20) is None
+    assert cache.get("a", now=20, stale=True).data == 1
+    assert cache.get("a", now=31, stale=True) is None
+    assert cache.expirations == 1
@@ -0,0 +1,121 @@
+"""Test the Helium Solana config flow."""
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.helium_solana.config_flow import parse_wallets
+from custom_components.helium_solana.const import (
+    CONF_INTEGRATION,
+    CONF_MAX_CONCURRENCY,
+    CONF_VERSION,
+    CONF_WALLET,
+    CONF_WALLETS,
+    DOMAIN,
+    INTEGRATION_WALLET,
+)
+from homeassistant import config_entries
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+
+def test_parse_wallets() -> None:
+    """Test wallets are split on commas and whitespace, without duplicates."""
+    assert parse_wallets(" abcd, efgh;ijkl\nabcd ,") == ["abcd", "efgh", "ijkl"]
+    assert parse_wallets(" , ") == []
+
+
+async def test_multi_wallet_flow(hass: HomeAssistant) -> None:
+    """Test a wallet entry is created from a list of wallets."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_INTEGRATION: INTEGRATION_WALLET}
+    )
+    assert result["step_id"] == "wallet"
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_WALLET: ","}
+    )
+    assert result["errors"] == {CONF_WALLET: "no_wallet"}
+
+    with patch(
+        "custom_components.helium_solana.async_setup_entry", return_value=True
+    ) as mock_setup_entry:
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_WALLET: "abcdefgh, efghijkl"}
+        )
+        await hass.async_block_till_done()
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert len(mock_setup_entry.mock_calls) == 1
+    assert result["data"][CONF_WALLET] == "abcdefgh"
+    assert result["data"][CONF_WALLETS] == ["abcdefgh", "efghijkl"]
+    assert result["title"].endswith("abcd +1")
+
+
+async def test_options_flow(
+    hass: HomeAssistant, wallet_entry: MockConfigEntry
+) -> None:
+    """Test the wallets and concurrency of a wallet entry are options."""
+    result = await hass.config_entries.options.async_init(wallet_entry.entry_id)
+    assert result["step_id"] == "init"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {CONF_WALLETS: "abcdefgh efghijkl", CONF_MAX_CONCURRENCY: 2},
+    )
+
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert wallet_entry.options == {
+        CONF_WALLETS: ["abcdefgh", "efghijkl"],
+        CONF_MAX_CONCURRENCY: 2,
+    }
+
+
+async def test_wallet_flow_aborts_on_configured_wallet(
+    hass: HomeAssistant, wallet_entry: MockConfigEntry
+) -> None:
+    """Test a wallet of another entry, in its data or options, is not added again."""
+    hass.config_entries.async_update_entry(
+        wallet_entry, options={CONF_WALLETS: ["abcdefgh", "efghijkl"]}
+    )
+
+    for wallets in ("ijklmnop, abcdefgh", "ijklmnop efghijkl"):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": config_entries.SOURCE_USER}
+        )
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_INTEGRATION: INTEGRATION_WALLET}
+        )
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_WALLET: wallets}
+        )
+
+        assert result["type"] is FlowResultType.ABORT
+        assert result["reason"] == "already_configured"
+
+
+async def test_options_flow_rejects_configured_wallet(
+    hass: HomeAssistant, wallet_entry: MockConfigEntry
+) -> None:
+    """Test the options of an entry do not take a wallet of another entry."""
+    other = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={
+            CONF_VERSION: 2,
+            CONF_INTEGRATION: INTEGRATION_WALLET,
+            CONF_WALLET: "ijklmnop",
+        },
+    )
+    other.add_to_hass(hass)
+    result = await hass.config_entries.options.async_init(wallet_entry.entry_id)
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {CONF_WALLETS: "abcdefgh ijklmnop", CONF_MAX_CONCURRENCY: 2},
+    )
+
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {CONF_WALLETS: "wallet_configured"}
@@ -0,0 +1,133 @@
+"""Test Helium Solana diagnostics."""
+import json
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.helium_solana.const import (
+    CONF_INTEGRATION,
+    CONF_MAX_CONCURRENCY,
+    CONF_RPC_URL,
+    CONF_VERSION,
+    CONF_WALLET,
+    CONF_WALLETS,
+    DOMAIN,
+    INTEGRATION_WALLET,
+)
+from custom_components.helium_solana.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .stand_in import HeliumStandIn
+
+# A Solana address, so its token accounts can be derived
+SOLANA_WALLET = "hntyVP6YFm1Hg25TN9WGLqM12b8TQmcknKrdu1oxWux"
+
+
+async def test_diagnostics(
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test diagnostics show the shared APIs and the entry's coordinators."""
+    stand_in.transient_errors["/wallet/abcdefgh"] = 1
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, wallet_entry)
+
+    assert diagnostics["entry"]["wallet"] == "**REDACTED**"
+    backend = diagnostics["backend"]
+    assert backend["retries"] == 1
+    assert backend["cache"]["entries"] == 3
+    assert [breaker["state"] for breaker in backend["breakers"].values()] == [
+        "closed"
+    ]
+    assert "price" not in diagnostics
+    coordinators = diagnostics["coordinators"]
+    assert set(coordinators) == {"Helium wallet", "Helium hotspot", "Helium staking"}
+    wallet = coordinators["Helium wallet"]
+    assert wallet["updates"] == 1
+    assert wallet["duration"]["count"] == 1
+    assert wallet["update_interval"] == wallet["schedule"]["interval"]
+    assert backend["endpoints"]["wallet"]["latency"]["count"] == 1
+
+
+async def test_diagnostics_redact_entry(hass: HomeAssistant) -> None:
+    """Test the wallets and the RPC URL of an entry are redacted."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        data={
+            CONF_VERSION: 2,
+            CONF_INTEGRATION: INTEGRATION_WALLET,
+            CONF_WALLET: "abcdefgh",
+            CONF_WALLETS: ["abcdefgh", "efghijkl"],
+            CONF_RPC_URL: "https://rpc.example.com/?api-key=secret",
+        },
+        options={CONF_WALLETS: ["abcdefgh", "ijklmnop"], CONF_MAX_CONCURRENCY: 2},
+    )
+    entry.add_to_hass(hass)
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"] == {
+        CONF_VERSION: 2,
+        CONF_INTEGRATION: INTEGRATION_WALLET,
+        CONF_WALLET: "**REDACTED**",
+        CONF_WALLETS: "**REDACTED**",
+        CONF_RPC_URL: "**REDACTED**",
+    }
+    assert diagnostics["options"] == {
+        CONF_WALLETS: "**REDACTED**",
+        CONF_MAX_CONCURRENCY: 2,
+    }
+
+
+async def test_diagnostics_redact_rpc_metrics(
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test the RPC URL shows nowhere in the metrics of the diagnostics."""
+    rpc_url = f"{stand_in.rpc_url}?api-key=secret"
+    hass.config_entries.async_update_entry(
+        wallet_entry,
+        data={**wallet_entry.data, CONF_WALLET: SOLANA_WALLET, CONF_RPC_URL: rpc_url},
+    )
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, wallet_entry)
+
+    assert diagnostics["solana_rpc"]["rpc_1"]["batches"] == 1
+    serialized = json.dumps(diagnostics)
+    assert rpc_url not in serialized
+    assert "secret" not in serialized
+
+
+async def test_metric_sensors_disabled_by_default(
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test the metric sensors are diagnostic and disabled by default."""
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    metrics = [
+        entry
+        for entry in er.async_entries_for_config_entry(registry, wallet_entry.entry_id)
+        if entry.unique_id.startswith("helium.metrics.")
+    ]
+    assert len(metrics) == 12
+    assert all(
+        entry.disabled_by is er.RegistryEntryDisabler.INTEGRATION for entry in metrics
+    )
+    assert all(entry.entity_category is EntityCategory.DIAGNOSTIC for entry in metrics)
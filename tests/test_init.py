@@ -1,7 +1,6 @@
 """Test component setup."""
-from homeassistant.setup import async_setup_component
-
 from custom_components.helium_solana.const import DOMAIN
+from homeassistant.setup import async_setup_component
 
 
 async def test_async_setup(hass):
@@ -0,0 +1,127 @@
+"""Test per host rate limiting."""
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from custom_components.helium_solana.api.client import HttpClient
+from custom_components.helium_solana.api.limiter import (
+    DEFAULT_RETRY_AFTER,
+    HostLimit,
+    RateLimited,
+    RateLimiter,
+    parse_retry_after,
+)
+from custom_components.helium_solana.api.price import PriceAPI
+from custom_components.helium_solana.api.snapshot import PayloadSnapshot
+from custom_components.helium_solana.api.transport import async_get_transport
+from homeassistant.core import HomeAssistant
+
+from .stand_in import HeliumStandIn
+
+TOKEN_IDS = ("helium", "helium-iot")
+PRICE_PATH = "/api/v3/simple/price"
+
+
+def test_parse_retry_after() -> None:
+    """Test Retry-After in seconds and as an HTTP date."""
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Thu, 01 Jan 2026 00:01:00 GMT", 1767225600) == 60
+    assert parse_retry_after("soon") == DEFAULT_RETRY_AFTER
+    assert parse_retry_after(None) == DEFAULT_RETRY_AFTER
+
+
+async def test_callers_queue_for_tokens() -> None:
+    """Test callers past the burst queue and are let through at the rate."""
+    limit = HostLimit("example.com", rate=20, burst=1)
+
+    start = time.monotonic()
+    await asyncio.gather(*(limit.acquire() for _ in range(3)))
+
+    assert time.monotonic() - start >= 0.09
+    assert limit.requests == 3
+    assert limit.queued == 2
+
+
+@pytest.fixture
+async def price_api(hass: HomeAssistant, stand_in: HeliumStandIn) -> PriceAPI:
+    """Return a price API talking to the stand-in server with a limiter."""
+    client = HttpClient(async_get_transport(hass), RateLimiter())
+    return PriceAPI(client, stand_in.price_url, cache_ttl=0)
+
+
+async def test_throttled_prices_serve_last_good(
+    price_api: PriceAPI, stand_in: HeliumStandIn
+) -> None:
+    """Test a 429 blocks the host and the last good prices are served."""
+    prices = await price_api.get_prices(TOKEN_IDS, ["usd"])
+
+    stand_in.errors[PRICE_PATH] = 429
+    stand_in.retry_after = "120"
+    assert await price_api.get_prices(TOKEN_IDS, ["usd"]) == prices
+    # No request is made while the Retry-After runs
+    assert await price_api.get_prices(TOKEN_IDS, ["usd"]) == prices
+
+    assert stand_in.requests[PRICE_PATH] == 2
+    assert price_api.served_throttled == 2
+    host = price_api._client.limiter.host("127.0.0.1")
+    assert host.throttled == 1
+    assert host.rejected == 1
+    assert host.blocked_for() > 100
+
+
+async def test_throttled_prices_without_last_good(
+    price_api: PriceAPI, stand_in: HeliumStandIn
+) -> None:
+    """Test throttling fails the request when there are no prices yet."""
+    stand_in.errors[PRICE_PATH] = 429
+
+    with pytest.raises(RateLimited) as err:
+        await price_api.get_prices(TOKEN_IDS, ["usd"])
+
+    assert err.value.retry_after == DEFAULT_RETRY_AFTER
+
+
+async def test_throttled_prices_after_restart(
+    hass: HomeAssistant, hass_storage: dict[str, Any], stand_in: HeliumStandIn
+) -> None:
+    """Test the prices saved before a restart are served while throttled."""
+    prices = {"helium": {"usd": 4.2}, "helium-iot": {"usd": 0.001}}
+    hass_storage["helium_solana.price"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": "helium_solana.price",
+        "data": {
+            "ids=helium,helium-iot&vs_currencies=usd": {
+                "data": prices,
+                "time": time.time() - 3600,
+            }
+        },
+    }
+    snapshot = PayloadSnapshot(hass, "price")
+    await snapshot.async_load()
+    client = HttpClient(async_get_transport(hass), RateLimiter())
+    price_api = PriceAPI(client, stand_in.price_url, cache_ttl=60, snapshot=snapshot)
+    stand_in.errors[PRICE_PATH] = 429
+
+    assert await price_api.get_prices(TOKEN_IDS, ["usd"]) == prices
+
+    # The restored prices were too old to serve without asking first
+    assert stand_in.requests[PRICE_PATH] == 1
+    assert price_api.served_throttled == 1
+
+
+async def test_concurrent_price_requests_coalesce(
+    price_api: PriceAPI, stand_in: HeliumStandIn
+) -> None:
+    """Test concurrent consumers share one request."""
+    stand_in.latency = 0.1
+
+    results = await asyncio.gather(
+        *(price_api.get_prices(TOKEN_IDS, ["usd", "eur"]) for _ in range(5))
+    )
+
+    assert all(result == results[0] for result in results)
+    assert stand_in.requests[PRICE_PATH] == 1
+    assert price_api.coalesced == 4
@@ -0,0 +1,36 @@
+"""Test the Helium Solana metrics."""
+from custom_components.helium_solana.api.metrics import Histogram, UpdateStats
+
+
+def test_histogram() -> None:
+    """Test quantiles are bounded by their bucket and the largest value."""
+    histogram = Histogram((0.1, 1, 10))
+    for value in (0.05, 0.05, 0.5, 2, 20):
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 1
+    assert histogram.quantile(0.95) == 20
+    assert histogram.as_dict() == {
+        "count": 5,
+        "mean": 4.52,
+        "p50": 1,
+        "p95": 20,
+        "max": 20,
+        "buckets": {"le_0.1": 2, "le_1": 1, "le_10": 1, "le_inf": 1},
+    }
+
+
+def test_update_stats_cycles() -> None:
+    """Test state writes are counted per listener update."""
+    stats = UpdateStats()
+    stats.start_cycle()
+    for written in (True, True, False):
+        stats.record_write(written)
+    stats.end_cycle()
+    stats.start_cycle()
+    stats.record_write(False)
+    stats.end_cycle()
+
+    assert stats.last_entities_written == 0
+    assert stats.as_dict()["entities_written_per_cycle"] == 1.0
+    assert stats.entities_skipped == 2
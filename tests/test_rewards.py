@@ -0,0 +1,34 @@
+"""Test the compact hotspot rewards."""
+from custom_components.helium_solana.rewards import (
+    SECTION_AGGREGATED,
+    SECTION_HOTSPOTS,
+    HotspotRewards,
+)
+
+from .stand_in import hotspot_rewards_payload
+
+
+def test_from_payload() -> None:
+    """Test a payload is normalized into slots and token values."""
+    rewards = HotspotRewards.from_payload(hotspot_rewards_payload(3))
+
+    slot = rewards.index.slot(SECTION_HOTSPOTS, "hotspot-2")
+    assert rewards.values["claimed_rewards"][slot] == 2.0
+    assert rewards.index.names[slot] == "hotspot-2"
+    slot = rewards.index.slot(SECTION_AGGREGATED, "iot")
+    assert rewards.values["total_rewards"][slot] == 4.5
+    assert rewards.index.slot(SECTION_HOTSPOTS, "hotspot-3") is None
+
+
+def test_index_reused_for_same_hotspots() -> None:
+    """Test the index is only rebuilt when the hotspots change."""
+    first = HotspotRewards.from_payload(hotspot_rewards_payload(3))
+    payload = hotspot_rewards_payload(3)
+    payload["rewards"] = dict(reversed(payload["rewards"].items()))
+    second = HotspotRewards.from_payload(payload, first)
+    third = HotspotRewards.from_payload(hotspot_rewards_payload(4), second)
+
+    assert second.index is first.index
+    assert second == first
+    assert third.index is not second.index
+    assert third != second
@@ -0,0 +1,111 @@
+"""Test fetch scheduling."""
+from datetime import datetime, time, timedelta, timezone
+
+from custom_components.helium_solana.schedule import (
+    ADAPTIVE_MAX_INTERVAL,
+    EPOCH_FAST_INTERVAL,
+    EPOCH_SLOW_INTERVAL,
+    MAX_BACKOFF,
+    AdaptiveSchedule,
+    EpochSchedule,
+)
+
+INTERVAL = timedelta(minutes=10)
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_epoch_schedule_with_boundary() -> None:
+    """Test fast polling after the boundary and slow polling between them."""
+    schedule = EpochSchedule(boundary=time(1, 0))
+    day = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    assert schedule.next_interval(False, day.replace(hour=0, minute=55)) == (
+        EPOCH_FAST_INTERVAL
+    )
+    assert schedule.next_interval(False, day.replace(hour=1, minute=30)) == (
+        EPOCH_FAST_INTERVAL
+    )
+    assert schedule.next_interval(False, day.replace(hour=12)) == EPOCH_SLOW_INTERVAL
+    # Never sleeps past the start of the next window
+    assert schedule.next_interval(False, day.replace(minute=20)) == timedelta(
+        minutes=30
+    )
+
+
+def test_epoch_schedule_catches_late_epoch() -> None:
+    """Test an epoch landing outside the window is seen within the slow interval."""
+    schedule = EpochSchedule(boundary=time(1, 0))
+    epoch = NOW.replace(hour=6, minute=17)
+    now = NOW.replace(hour=2)
+
+    while now < epoch:
+        now += schedule.next_interval(False, now)
+
+    assert now - epoch < EPOCH_SLOW_INTERVAL <= timedelta(hours=1)
+
+
+def test_epoch_schedule_learns_boundary() -> None:
+    """Test the boundary is learned from changes and cuts the fetch rate."""
+    schedule = EpochSchedule()
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    end = now + timedelta(days=7)
+    fetches_per_day: dict[int, int] = {}
+
+    while now < end:
+        changed = now.day > 1 and now.hour == 23 and 50 <= now.minute
+        fetches_per_day[now.day] = fetches_per_day.get(now.day, 0) + 1
+        now += schedule.next_interval(changed, now)
+
+    boundary = schedule.boundary
+    assert boundary is not None
+    assert abs(boundary.hour * 60 + boundary.minute - (23 * 60 + 55)) < 10
+    assert fetches_per_day[1] == 144
+    assert fetches_per_day[7] < 144 / 4
+
+
+def test_jitter_spreads_entries() -> None:
+    """Test the first fetch is delayed by a stable fraction of the interval."""
+    first = [
+        AdaptiveSchedule(INTERVAL, f"entry{entry}:Helium wallet").next_interval(
+            True, NOW
+        )
+        for entry in range(50)
+    ]
+
+    assert all(INTERVAL <= interval < INTERVAL * 2 for interval in first)
+    # Entries are spread across the interval instead of firing in lockstep
+    minutes = {int((interval - INTERVAL).total_seconds() // 60) for interval in first}
+    assert len(minutes) == 10
+    # The same key always gets the same jitter
+    assert AdaptiveSchedule(INTERVAL, "entry0:Helium wallet").next_interval(
+        True, NOW
+    ) == first[0]
+
+
+def test_adaptive_schedule() -> None:
+    """Test the interval widens while data is unchanged and narrows on changes."""
+    schedule = AdaptiveSchedule(INTERVAL)
+
+    assert schedule.next_interval(False, NOW) == INTERVAL * 1.5
+    for _ in range(10):
+        schedule.next_interval(False, NOW)
+    assert schedule.interval == ADAPTIVE_MAX_INTERVAL
+    assert schedule.next_interval(True, NOW) == ADAPTIVE_MAX_INTERVAL / 2
+    for _ in range(10):
+        schedule.next_interval(True, NOW)
+    assert schedule.interval == INTERVAL
+
+
+def test_backoff_on_errors() -> None:
+    """Test failed fetches back off up to the maximum and reset on success."""
+    schedule = EpochSchedule(boundary=time(1, 0))
+
+    assert schedule.failed_interval(NOW) == EPOCH_FAST_INTERVAL * 2
+    assert schedule.failed_interval(NOW) == EPOCH_FAST_INTERVAL * 4
+    for _ in range(10):
+        schedule.failed_interval(NOW)
+    assert schedule.interval == MAX_BACKOFF
+    assert schedule.as_dict()["failures"] == 12
+
+    assert schedule.next_interval(False, NOW.replace(hour=1)) == EPOCH_FAST_INTERVAL
+    assert schedule.failures == 0
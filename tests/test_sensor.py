@@ -0,0 +1,373 @@
+"""Test the sensor platform."""
+from datetime import timedelta
+import time
+from typing import Any
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.helium_solana.api.backend import DATA_BACKEND_API
+from custom_components.helium_solana.api.metrics import async_get_metrics
+from custom_components.helium_solana.const import (
+    CONF_MAX_CONCURRENCY,
+    CONF_WALLETS,
+    DOMAIN,
+)
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE, EVENT_STATE_CHANGED
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+import homeassistant.util.dt as dt_util
+
+from .stand_in import (
+    HeliumStandIn,
+    hotspot_rewards_payload,
+    staking_rewards_payload,
+    wallet_payload,
+)
+
+
+async def test_wallet_staking_sensors(
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test staking sensors share one coordinator fetch."""
+    stand_in.positions = 40
+
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert wallet_entry.state is ConfigEntryState.LOADED
+    assert stand_in.requests["/staking-rewards/abcdefgh"] == 1
+
+    registry = er.async_get(hass)
+    entries = er.async_entries_for_config_entry(registry, wallet_entry.entry_id)
+    staking = [
+        entry for entry in entries if entry.unique_id.startswith("helium.staking.")
+    ]
+    assert len(staking) == 41
+
+    state = hass.states.get(
+        registry.async_get_entity_id(
+            "sensor", "helium_solana", "helium.staking.reward.token.abcd.iot"
+        )
+    )
+    assert float(state.state) == 500.0
+
+
+async def test_wallet_setup_fetches_concurrently(
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test wallet setup time tracks the slowest endpoint, not the sum."""
+    stand_in.latency = 0.5
+
+    start = time.monotonic()
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done()
+    elapsed = time.monotonic() - start
+
+    assert wallet_entry.state is ConfigEntryState.LOADED
+    assert elapsed < 1.0
+
+
+async def test_wallet_setup_without_staking(
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test a failing staking endpoint does not hold up the balance sensors."""
+    stand_in.errors["/staking-rewards/abcdefgh"] = 500
+
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert wallet_entry.state is ConfigEntryState.LOADED
+    registry = er.async_get(hass)
+    entries = er.async_entries_for_config_entry(registry, wallet_entry.entry_id)
+    assert not any(entry.unique_id.startswith("helium.staking.") for entry in entries)
+    assert any(entry.unique_id == "helium.wallet.abcd_hnt" for entry in entries)
+
+
+async def test_wallet_warm_start(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test entities are created from saved data without waiting on the network."""
+    wallet = wallet_payload("abcdefgh")
+    wallet["balance"]["hnt"] = 42.0
+    now = time.time()
+    hass_storage["helium_solana.backend"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": "helium_solana.backend",
+        "data": {
+            "wallet/abcdefgh": {"data": wallet, "time": now},
+            "hotspot-rewards2/abcdefgh": {
+                "data": hotspot_rewards_payload(),
+                "time": now,
+            },
+            "staking-rewards/abcdefgh": {
+                "data": staking_rewards_payload(),
+                "time": now,
+            },
+        },
+    }
+    stand_in.latency = 5
+
+    start = time.monotonic()
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    elapsed = time.monotonic() - start
+
+    assert wallet_entry.state is ConfigEntryState.LOADED
+    assert elapsed < 1
+    registry = er.async_get(hass)
+    entity_id = registry.async_get_entity_id(
+        "sensor", "helium_solana", "helium.wallet.abcd_hnt"
+    )
+    assert hass.states.get(entity_id).state == "42.0"
+
+
+async def test_snapshot_prunes_unused_keys(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test the saved data of wallets no coordinator uses is dropped."""
+    hass_storage["helium_solana.backend"] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": "helium_solana.backend",
+        "data": {
+            "wallet/removed": {"data": wallet_payload("removed"), "time": time.time()}
+        },
+    }
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done()
+
+    async def _async_saved() -> set[str]:
+        # Delayed saves are written right away on the final write
+        hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+        await hass.async_block_till_done()
+        return set(hass_storage["helium_solana.backend"]["data"])
+
+    assert await _async_saved() == {
+        "wallet/abcdefgh",
+        "hotspot-rewards2/abcdefgh",
+        "staking-rewards/abcdefgh",
+    }
+
+    assert await hass.config_entries.async_unload(wallet_entry.entry_id)
+    assert await _async_saved() == set()
+
+
+async def test_unchanged_refresh_skips_state_writes(
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test a refresh with an unchanged payload does not write any state."""
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done()
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    # Past the jittered first update interval
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(hours=1))
+    await hass.async_block_till_done()
+
+    assert events == []
+
+
+async def test_hotspot_sensors_follow_wallet(
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test hotspot sensors are added and removed as hotspots change."""
+    stand_in.hotspots = 3
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done()
+    # Refreshes get the payload of the stand-in, instead of a stale one
+    cache = hass.data[DATA_BACKEND_API].cache
+    cache.ttl = cache.stale_ttl = 0
+    registry = er.async_get(hass)
+    device_registry = dr.async_get(hass)
+
+    def hotspot_unique_ids() -> set[str]:
+        return {
+            entry.unique_id
+            for entry in er.async_entries_for_config_entry(
+                registry, wallet_entry.entry_id
+            )
+            if entry.unique_id.startswith("helium.hotspot-reward.abcd_rewards_hotspot-")
+        }
+
+    assert len(hotspot_unique_ids()) == 9
+    assert device_registry.async_get_device(
+        identifiers={(DOMAIN, "helium.hotspot.rewards.hotspot-2")}
+    )
+
+    stand_in.hotspots = 2
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(hours=1))
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert len(hotspot_unique_ids()) == 6
+    assert "helium.hotspot-reward.abcd_rewards_hotspot-2_total_rewards" not in (
+        hotspot_unique_ids()
+    )
+    assert not device_registry.async_get_device(
+        identifiers={(DOMAIN, "helium.hotspot.rewards.hotspot-2")}
+    )
+    assert device_registry.async_get_device(
+        identifiers={(DOMAIN, "helium.hotspot.rewards.hotspot-1")}
+    )
+
+    stand_in.hotspots = 4
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(hours=2))
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert len(hotspot_unique_ids()) == 12
+
+
+WALLETS = ["abcdefgh", "efghijkl", "ijklmnop"]
+
+
+async def test_multi_wallet_entry(
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test the wallets of an entry are fetched by fleets, failing on their own."""
+    stand_in.positions = 0
+    stand_in.errors["/wallet/efghijkl"] = 400
+    hass.config_entries.async_update_entry(
+        wallet_entry, data={**wallet_entry.data, CONF_WALLETS: WALLETS}
+    )
+
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert wallet_entry.state is ConfigEntryState.LOADED
+    # The fleets share one batch, and only the failed wallet is fetched alone
+    assert stand_in.requests["/batch"] == 1
+    assert sum(stand_in.batched.values()) == 9
+    assert sum(stand_in.requests.values()) == 2
+    assert stand_in.requests["/wallet/efghijkl"] == 1
+    registry = er.async_get(hass)
+
+    def wallet_state(address4: str) -> str:
+        entity_id = registry.async_get_entity_id(
+            "sensor", "helium_solana", f"helium.wallet.{address4}_hnt"
+        )
+        return hass.states.get(entity_id).state
+
+    assert wallet_state("abcd") == "1.5"
+    assert wallet_state("efgh") == "unavailable"
+    assert wallet_state("ijkl") == "1.5"
+
+    # The fleets update every wallet on their own timer
+    del stand_in.errors["/wallet/efghijkl"]
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(hours=1))
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert wallet_state("efgh") == "1.5"
+    coordinators = async_get_metrics(hass).coordinators(wallet_entry.entry_id)
+    fleets = [
+        coordinator for coordinator in coordinators if coordinator.fleet is None
+    ]
+    assert [fleet.name for fleet in fleets] == [
+        "Helium wallet fleet",
+        "Helium hotspot fleet",
+        "Helium staking fleet",
+    ]
+
+
+async def test_multi_wallet_concurrency(
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test at most max concurrency wallets are fetched at the same time."""
+    stand_in.latency = 0.2
+    stand_in.batch_support = False
+    hass.config_entries.async_update_entry(
+        wallet_entry, options={CONF_WALLETS: WALLETS, CONF_MAX_CONCURRENCY: 2}
+    )
+
+    start = time.monotonic()
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done()
+    elapsed = time.monotonic() - start
+
+    assert wallet_entry.state is ConfigEntryState.LOADED
+    # Three wallets two at a time take two rounds, the fleets run side by side
+    assert 0.4 <= elapsed < 0.8
+
+
+async def test_removed_wallet_leaves_no_entities(
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test the entities and devices of a wallet go when the options drop it."""
+    hass.config_entries.async_update_entry(
+        wallet_entry, options={CONF_WALLETS: WALLETS[:2]}
+    )
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    entity_registry = er.async_get(hass)
+    device_registry = dr.async_get(hass)
+
+    def unique_ids() -> set[str]:
+        return {
+            entry.unique_id
+            for entry in er.async_entries_for_config_entry(
+                entity_registry, wallet_entry.entry_id
+            )
+        }
+
+    def device_identifiers() -> set[str]:
+        return {
+            identifier
+            for device in dr.async_entries_for_config_entry(
+                device_registry, wallet_entry.entry_id
+            )
+            for _, identifier in device.identifiers
+        }
+
+    assert "helium.wallet.efgh_hnt" in unique_ids()
+    assert "helium.staking.rewards.efgh" in device_identifiers()
+
+    hass.config_entries.async_update_entry(
+        wallet_entry, options={CONF_WALLETS: WALLETS[:1]}
+    )
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert wallet_entry.state is ConfigEntryState.LOADED
+    assert "helium.wallet.abcd_hnt" in unique_ids()
+    assert not [unique_id for unique_id in unique_ids() if "efgh" in unique_id]
+    assert not [
+        identifier for identifier in device_identifiers() if "efgh" in identifier
+    ]
+    # The metric sensors of the fleets went with them
+    assert not [unique_id for unique_id in unique_ids() if "fleet" in unique_id]
+    # The hotspot the wallets shared keeps its device
+    assert "helium.hotspot.rewards.hotspot-0" in device_identifiers()
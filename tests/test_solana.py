@@ -0,0 +1,98 @@
+"""Test Helium Solana balances from a Solana JSON-RPC node."""
+import asyncio
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.helium_solana.api.client import HttpClient
+from custom_components.helium_solana.api.solana import (
+    SolanaRPC,
+    b58decode,
+    b58encode,
+    is_on_curve,
+    token_accounts,
+)
+from custom_components.helium_solana.api.transport import async_get_transport
+from custom_components.helium_solana.const import CONF_RPC_URL, CONF_WALLET
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .stand_in import HeliumStandIn
+
+WALLETS = (
+    "hntyVP6YFm1Hg25TN9WGLqM12b8TQmcknKrdu1oxWux",
+    "iotEVVZLEywoTn1QdwNPddxPWszn3zFhEot3MfL9fns",
+    "mb1eu7TzEc71KxDpsmsKoucSSuuoGLv1drys1oP2jh6",
+)
+
+
+def test_token_accounts() -> None:
+    """Test token accounts are program derived addresses off the curve."""
+    assert b58encode(b58decode(WALLETS[0])) == WALLETS[0]
+    assert is_on_curve(bytes(32))
+
+    accounts = token_accounts(WALLETS[0])
+
+    assert list(accounts) == ["hnt", "iot", "mobile"]
+    assert len(set(accounts.values())) == 3
+    assert not any(is_on_curve(b58decode(address)) for address in accounts.values())
+    assert token_accounts(WALLETS[0]) == accounts
+
+
+async def test_wallets_share_a_batch(
+    hass: HomeAssistant, stand_in: HeliumStandIn
+) -> None:
+    """Test concurrent wallets are read in a single batch request."""
+    for index, wallet in enumerate(WALLETS[:2]):
+        stand_in.rpc_wallets[wallet] = {"hnt": 1.5 + index, "iot": 10.0, "solana": 0.5}
+    rpc = SolanaRPC(
+        HttpClient(async_get_transport(hass)),
+        stand_in.rpc_url,
+        create_task=hass.async_create_background_task,
+    )
+
+    balances = await asyncio.gather(*(rpc.get_balances(wallet) for wallet in WALLETS))
+
+    assert stand_in.requests["/rpc"] == 1
+    assert stand_in.rpc_calls == {"getMultipleAccounts": 1, "getBalance": 3}
+    assert balances[1] == {
+        "address": WALLETS[1],
+        "balance": {"hnt": 2.5, "iot": 10.0, "mobile": 0.0, "solana": 0.5},
+    }
+    # Wallets without token accounts have nothing
+    assert balances[2]["balance"] == {
+        "hnt": 0.0,
+        "iot": 0.0,
+        "mobile": 0.0,
+        "solana": 0.0,
+    }
+    assert rpc.as_dict()["wallets_per_batch"] == 3
+
+
+async def test_wallet_balances_from_rpc(
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test a wallet entry with an RPC URL reads its balances from the chain."""
+    stand_in.rpc_wallets[WALLETS[0]] = {"hnt": 7.0}
+    hass.config_entries.async_update_entry(
+        wallet_entry,
+        data={
+            **wallet_entry.data,
+            CONF_WALLET: WALLETS[0],
+            CONF_RPC_URL: stand_in.rpc_url,
+        },
+    )
+
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert stand_in.requests[f"/wallet/{WALLETS[0]}"] == 0
+    assert stand_in.requests["/rpc"] == 1
+    registry = er.async_get(hass)
+    entity_id = registry.async_get_entity_id(
+        "sensor", "helium_solana", "helium.wallet.hnty_hnt"
+    )
+    state = hass.states.get(entity_id)
+    assert float(state.state) == 7.0
@@ -0,0 +1,245 @@
+"""Test the Helium Solana long-term statistics."""
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+    do_adhoc_statistics,
+)
+from pytest_homeassistant_custom_component.typing import RecorderInstanceGenerator
+
+from custom_components.helium_solana.api.backend import DATA_BACKEND_API
+from custom_components.helium_solana.statistics import (
+    FLUSH_DELAY,
+    SUM_TOTAL,
+    SUM_TOTAL_INCREASING,
+    StatisticSeries,
+    async_get_statistics,
+    daily_points,
+    day_start,
+)
+from homeassistant.components.recorder import (
+    EVENT_RECORDER_HOURLY_STATISTICS_GENERATED,
+    Recorder,
+    get_instance,
+)
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_import_statistics,
+    statistics_during_period,
+)
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers import entity_registry as er
+import homeassistant.util.dt as dt_util
+
+from .stand_in import HeliumStandIn
+
+
+@pytest.fixture(autouse=True)
+async def mock_recorder_before_hass(
+    async_setup_recorder_instance: RecorderInstanceGenerator,
+) -> None:
+    """Set up the recorder database before Home Assistant."""
+
+
+async def async_get_rows(hass: HomeAssistant, statistic_id: str) -> list[Any]:
+    """Return the rows of a statistic once the recorder wrote them."""
+    await async_wait_recording_done(hass)
+    rows = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        dt_util.utcnow() - timedelta(days=40),
+        None,
+        {statistic_id},
+        "hour",
+        None,
+        {"state", "sum"},
+    )
+    return rows.get(statistic_id, [])
+
+
+def test_daily_points() -> None:
+    """Test the last numeric state of every day is kept."""
+    now = day_start(dt_util.utcnow()) + timedelta(hours=12)
+    states = [
+        State("sensor.balance", "1.0", last_updated=now - timedelta(days=2)),
+        State("sensor.balance", "1.5", last_updated=now - timedelta(days=1, hours=1)),
+        State("sensor.balance", "2.0", last_updated=now - timedelta(days=1)),
+        State("sensor.balance", "unavailable", last_updated=now),
+    ]
+
+    assert daily_points(states) == {
+        day_start(now - timedelta(days=2)): 1.0,
+        day_start(now - timedelta(days=1)): 2.0,
+    }
+
+
+async def test_import_deduplicates(
+    recorder_mock: Recorder, hass: HomeAssistant
+) -> None:
+    """Test days already imported are skipped, and the sum carries on."""
+    importer = async_get_statistics(hass)
+    series = StatisticSeries.for_sensor(
+        "helium.test", "Test Rewards", "IOT", SUM_TOTAL_INCREASING
+    )
+    now = dt_util.utcnow()
+    history = {now - timedelta(days=3): 1.0, now - timedelta(days=2): 2.0}
+    history[now - timedelta(days=1)] = 0.5
+
+    for moment, value in history.items():
+        importer.async_add_point(series, value, moment)
+    await importer.async_flush()
+
+    rows = await async_get_rows(hass, series.statistic_id)
+    assert [(row["state"], row["sum"]) for row in rows] == [
+        (1.0, 0.0),
+        (2.0, 1.0),
+        # A decrease of a total increasing series is a reset
+        (0.5, 1.5),
+    ]
+
+    for moment, value in history.items():
+        importer.async_add_point(series, value, moment)
+    importer.async_add_point(series, 0.75)
+    await importer.async_flush()
+
+    rows = await async_get_rows(hass, series.statistic_id)
+    assert [(row["state"], row["sum"]) for row in rows][-1] == (0.75, 1.75)
+    assert importer.as_dict() == {
+        "series": 1,
+        "flushes": 2,
+        "written": 4,
+        "skipped": 3,
+        "backfilled": 0,
+    }
+
+
+async def test_derive_from_recorder(
+    recorder_mock: Recorder, hass: HomeAssistant
+) -> None:
+    """Test a series derived from the recorder's statistics copies its days."""
+    importer = async_get_statistics(hass)
+    series = StatisticSeries.for_sensor("helium.test", "Test Balance", "HNT", SUM_TOTAL)
+    today = day_start(dt_util.utcnow())
+    hours = [today - timedelta(days=2) + timedelta(hours=hour) for hour in range(6)]
+    hours += [today - timedelta(days=1), today]
+    metadata = StatisticMetaData(
+        has_mean=False,
+        has_sum=True,
+        name=None,
+        source="recorder",
+        statistic_id="sensor.test_balance",
+        unit_of_measurement="HNT",
+    )
+    async_import_statistics(
+        hass,
+        metadata,
+        [
+            StatisticData(start=start, state=index, sum=index * 2)
+            for index, start in enumerate(hours)
+        ],
+    )
+    await async_wait_recording_done(hass)
+
+    importer.async_derive(series, "sensor.test_balance")
+    await importer.async_flush()
+
+    rows = await async_get_rows(hass, series.statistic_id)
+    # The last hour of every day
+    assert [(row["state"], row["sum"]) for row in rows] == [
+        (5.0, 10.0),
+        (6.0, 12.0),
+        (7.0, 14.0),
+    ]
+
+    async_import_statistics(
+        hass,
+        metadata,
+        [StatisticData(start=today + timedelta(hours=1), state=8.0, sum=16.0)],
+    )
+    await async_wait_recording_done(hass)
+    hass.bus.async_fire(EVENT_RECORDER_HOURLY_STATISTICS_GENERATED)
+    await importer.async_flush()
+
+    rows = await async_get_rows(hass, series.statistic_id)
+    assert [(row["state"], row["sum"]) for row in rows][-1] == (8.0, 16.0)
+    assert len(rows) == 3
+    # Only today was read again, and it changed
+    assert importer.as_dict() == {
+        "series": 1,
+        "flushes": 2,
+        "written": 4,
+        "skipped": 0,
+        "backfilled": 0,
+    }
+
+
+async def test_wallet_statistics(
+    recorder_mock: Recorder,
+    hass: HomeAssistant,
+    stand_in: HeliumStandIn,
+    mock_backend_url: None,
+    wallet_entry: MockConfigEntry,
+) -> None:
+    """Test the sensors of a wallet keep their daily value in statistics."""
+    stand_in.hotspots = 2
+    assert await hass.config_entries.async_setup(wallet_entry.entry_id)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    statistic_id = (
+        "helium_solana:helium_hotspot_reward_abcd_rewards_hotspot_1_total_rewards"
+    )
+    entity_id = er.async_get(hass).async_get_entity_id(
+        "sensor",
+        "helium_solana",
+        "helium.hotspot-reward.abcd_rewards_hotspot-1_total_rewards",
+    )
+    # The last five minutes of an hour, with the next hour on the same day
+    start = dt_util.utcnow().replace(minute=55, second=0, microsecond=0)
+    while day_start(start) != day_start(start + timedelta(hours=1)):
+        start += timedelta(hours=1)
+
+    async def _async_compile(start: datetime) -> None:
+        """Compile the statistics of an hour, then derive the series from them."""
+        do_adhoc_statistics(hass, start=start)
+        await async_wait_recording_done(hass)
+        hass.bus.async_fire(EVENT_RECORDER_HOURLY_STATISTICS_GENERATED)
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=FLUSH_DELAY)
+        )
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    await _async_compile(start)
+
+    rows = await async_get_rows(hass, statistic_id)
+    state = hass.states.get(entity_id)
+    first = float(state.state)
+    # The recorder keeps compiling statistics of its own for the sensor
+    assert state.attributes["state_class"] == "total_increasing"
+    assert await async_get_rows(hass, entity_id)
+    assert [(row["state"], row["sum"]) for row in rows] == [(first, 0.0)]
+    assert await async_get_rows(hass, "helium_solana:helium_wallet_abcd_hnt")
+    importer = async_get_statistics(hass)
+    written = importer.written
+
+    # The rewards of a new epoch change the row of today
+    stand_in.epoch += 1
+    # Refreshes get the payload of the stand-in, instead of a stale one
+    cache = hass.data[DATA_BACKEND_API].cache
+    cache.ttl = cache.stale_ttl = 0
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(hours=1))
+    await hass.async_block_till_done(wait_background_tasks=True)
+    await _async_compile(start + timedelta(hours=1))
+
+    rows = await async_get_rows(hass, statistic_id)
+    second = float(hass.states.get(entity_id).state)
+    assert second > first
+    assert len(rows) == 1
+    assert rows[0]["state"] == second
+    assert round(rows[0]["sum"], 6) == round(second - first, 6)
+    # Only the sensors whose day changed were written again
+    assert 0 < importer.written - written < written
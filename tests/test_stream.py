@@ -0,0 +1,84 @@
+"""Test the streaming reward payload decoder."""
+import json
+import time
+import tracemalloc
+
+import pytest
+
+from custom_components.helium_solana.api.stream import RecordStreamDecoder
+from custom_components.helium_solana.rewards import REWARD_FIELDS
+
+from .stand_in import hotspot_rewards_payload
+
+HOTSPOT_FIELDS = ("name", "token", *REWARD_FIELDS)
+
+
+def _decode(body: bytes, chunk_size: int) -> dict:
+    decoder = RecordStreamDecoder({"rewards": HOTSPOT_FIELDS})
+    for start in range(0, len(body), chunk_size):
+        decoder.feed(body[start : start + chunk_size])
+    return decoder.finish()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_decode_in_chunks(chunk_size: int) -> None:
+    """Test a payload split at any point decodes to the same records."""
+    payload = hotspot_rewards_payload(5)
+    for record in payload["rewards"].values():
+        record["location"] = {"lat": 1.5, "tags": ["}", '"{']}
+    payload["count"] = 12345
+    body = json.dumps(payload).encode()
+
+    result = _decode(body, chunk_size)
+
+    expected = hotspot_rewards_payload(5)
+    expected["count"] = 12345
+    assert result == expected
+
+
+def test_decode_decoded_payload() -> None:
+    """Test a payload decoded whole keeps what streaming it would."""
+    payload = hotspot_rewards_payload(5)
+    for record in payload["rewards"].values():
+        record["location"] = {"lat": 1.5}
+
+    result = RecordStreamDecoder({"rewards": HOTSPOT_FIELDS}).decode(payload)
+
+    assert result == _decode(json.dumps(payload).encode(), 64 * 1024)
+    assert result == hotspot_rewards_payload(5)
+
+
+def test_decode_invalid_payload() -> None:
+    """Test a truncated payload is an error."""
+    with pytest.raises(ValueError):
+        _decode(b'{"rewards": {"a": {"name": 1', 4)
+
+
+def test_benchmark_streaming_decode() -> None:
+    """Compare peak memory and longest blocking call of both decode paths."""
+    body = json.dumps(hotspot_rewards_payload(10_000)).encode()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    json.loads(body)
+    full_block = time.perf_counter() - start
+    full_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    decoder = RecordStreamDecoder({"rewards": HOTSPOT_FIELDS})
+    stream_block = 0.0
+    for offset in range(0, len(body), 64 * 1024):
+        start = time.perf_counter()
+        decoder.feed(body[offset : offset + 64 * 1024])
+        stream_block = max(stream_block, time.perf_counter() - start)
+    decoder.finish()
+    stream_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    print(
+        f"{len(body) / 1024:.0f} KiB body: "
+        f"full {full_peak / 1024:.0f} KiB peak {full_block * 1000:.1f} ms block, "
+        f"streamed {stream_peak / 1024:.0f} KiB peak {stream_block * 1000:.1f} ms block"
+    )
+    assert stream_peak < full_peak
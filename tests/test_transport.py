@@ -0,0 +1,78 @@
+"""Test the Helium Solana record and replay transports."""
+from pathlib import Path
+import time
+
+from aiohttp import ClientConnectionError
+import pytest
+
+from custom_components.helium_solana.api.backend import BackendAPI
+from custom_components.helium_solana.api.client import HttpClient
+from custom_components.helium_solana.api.retry import RetryPolicy
+from custom_components.helium_solana.api.transport import (
+    RecordingTransport,
+    ReplayTransport,
+    async_get_transport,
+)
+from custom_components.helium_solana.coordinator import HOTSPOT_REWARDS_DECODER
+from homeassistant.core import HomeAssistant
+
+from .stand_in import HeliumStandIn
+
+
+async def test_record_and_replay(
+    hass: HomeAssistant, stand_in: HeliumStandIn, tmp_path: Path
+) -> None:
+    """Test recorded responses are replayed without reaching the server."""
+    stand_in.hotspots = 3
+    recorder = RecordingTransport(async_get_transport(hass))
+    api = BackendAPI(HttpClient(recorder), stand_in.url)
+    wallet = await api.get_data("wallet/abcd")
+    rewards = await api.get_data(
+        "hotspot-rewards2/abcd", decoder=HOTSPOT_REWARDS_DECODER
+    )
+    archive = tmp_path / "archive.json.gz"
+    await hass.async_add_executor_job(recorder.save, archive)
+    requests = sum(stand_in.requests.values())
+
+    replay = await hass.async_add_executor_job(
+        ReplayTransport.from_archive, archive, 0
+    )
+    replayed = BackendAPI(
+        HttpClient(replay),
+        stand_in.url,
+        cache_ttl=0,
+        retry_policy=RetryPolicy(attempts=1),
+    )
+
+    assert await replayed.get_data("wallet/abcd") == wallet
+    assert (
+        await replayed.get_data(
+            "hotspot-rewards2/abcd", decoder=HOTSPOT_REWARDS_DECODER
+        )
+        == rewards
+    )
+    # The expired payload is revalidated, and the replay answers with a 304
+    assert await replayed.get_data("wallet/abcd") == wallet
+    assert replay.not_modified == 1
+    with pytest.raises(ClientConnectionError):
+        await replayed.get_data("wallet/unknown")
+    assert replay.unmatched == 1
+    assert sum(stand_in.requests.values()) == requests
+
+
+async def test_replay_latency(hass: HomeAssistant, stand_in: HeliumStandIn) -> None:
+    """Test replayed latencies are scaled."""
+    stand_in.latency = 0.2
+    recorder = RecordingTransport(async_get_transport(hass))
+    await HttpClient(recorder).async_request(f"{stand_in.url}/wallet/abcd")
+    assert recorder.exchanges[0].latency >= 0.2
+
+    async def _async_replay(scale: float) -> float:
+        client = HttpClient(ReplayTransport(recorder.exchanges, scale))
+        start = time.monotonic()
+        response = await client.async_request(f"{stand_in.url}/wallet/abcd")
+        assert response.json()["address"] == "abcd"
+        return time.monotonic() - start
+
+    assert await _async_replay(0.5) >= 0.1
+    assert await _async_replay(0) < 0.05